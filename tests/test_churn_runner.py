@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from vectordb_bench.backend.clients.api import MetricType
+from vectordb_bench.backend.runner.churn_runner import LiveSet, live_ground_truth
+
+
+class TestLiveSet:
+    def test_ops(self):
+        live = LiveSet(10)
+        live.insert(np.arange(5))
+        # id 1 takes the embedding of row 7, row 1 is no longer held
+        live.update(np.array([1]), np.array([7]))
+        live.delete(np.array([0, 3]))
+
+        assert live.count == 3
+        assert sorted(live.ids[: live.count]) == [1, 2, 4]
+        assert live.source.tolist() == [-1, 7, 2, -1, 4, -1, -1, -1, -1, -1]
+        assert live.owner.tolist() == [-1, -1, 2, -1, 4, -1, -1, 1, -1, -1]
+        sample = live.sample(3, np.random.default_rng(0))
+        assert sorted(sample) == [1, 2, 4]
+
+        # an id deleted after an update releases the row of the update
+        live.delete(np.array([1]))
+        assert live.owner[7] == -1
+        assert sorted(live.ids[: live.count]) == [2, 4]
+
+
+@pytest.mark.parametrize("metric_type", [MetricType.L2, MetricType.COSINE, MetricType.IP])
+def test_live_ground_truth(metric_type: MetricType):
+    rng = np.random.default_rng(7)
+    train = rng.normal(size=(300, 8)).astype(np.float32)
+    queries = rng.normal(size=(5, 8)).astype(np.float32)
+    batches = [pd.DataFrame({"id": range(i, i + 100), "emb": list(train[i : i + 100])}) for i in range(0, 300, 100)]
+
+    live = LiveSet(300)
+    live.insert(np.arange(200))
+    live.update(np.arange(50), np.arange(200, 250))
+    live.delete(np.arange(150, 200))
+
+    gt = live_ground_truth(batches, queries, live, k=10, metric_type=metric_type)
+
+    # brute force over the embeddings the live ids hold
+    ids = live.ids[: live.count]
+    emb = train[live.source[ids]]
+    if metric_type == MetricType.L2:
+        scores = -((queries[:, np.newaxis, :] - emb[np.newaxis, :, :]) ** 2).sum(axis=2)
+    elif metric_type == MetricType.COSINE:
+        scores = (queries / np.linalg.norm(queries, axis=1)[:, np.newaxis]) @ (
+            emb / np.linalg.norm(emb, axis=1)[:, np.newaxis]
+        ).T
+    else:
+        scores = queries @ emb.T
+    expected = ids[np.argsort(-scores, axis=1)[:, :10]].tolist()
+    assert gt == expected
@@ -1,6 +1,8 @@
-from vectordb_bench.backend.dataset import Dataset
+from vectordb_bench.backend.dataset import Dataset, DataSetIterator
 import logging
+import polars as pl
 import pytest
+from vectordb_bench import config
 from pydantic import ValidationError
 from vectordb_bench.backend.data_source import DatasetSource
 
@@ -24,6 +26,31 @@ class TestDataSet:
         with pytest.raises(ValidationError):
             Dataset.COHERE.get(9999)
 
+    def test_iter_partitions(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "DATASET_LOCAL_DIR", tmp_path)
+        monkeypatch.setattr(config, "NUM_PER_BATCH", 4)
+        cohere = Dataset.COHERE.manager(100_000)
+        cohere.train_files = ["train-0.parquet", "train-1.parquet"]
+        cohere.data_dir.mkdir(parents=True)
+        for i, file_name in enumerate(cohere.train_files):
+            ids = list(range(i * 25, (i + 1) * 25))
+            df = pl.DataFrame({"id": ids, "emb": [[float(j)] * 2 for j in ids]})
+            df.write_parquet(cohere.data_dir / file_name, row_group_size=10)
+
+        # every row is read by exactly one of the workers
+        partitions = [
+            [i for df in DataSetIterator(cohere, worker, 3) for i in df["id"]] for worker in range(3)
+        ]
+        assert all(len(p) > 0 for p in partitions)
+        assert sorted(sum(partitions, [])) == list(range(50))
+        assert [i for df in cohere for i in df["id"]] == list(range(50))
+
+        # whole row groups are skipped, then the first rows of the next one
+        assert [i for df in DataSetIterator(cohere, skip_rows=13) for i in df["id"]] == list(range(13, 50))
+        assert [i for df in DataSetIterator(cohere, skip_rows=30) for i in df["id"]] == list(range(30, 50))
+        skipped = [i for df in DataSetIterator(cohere, 1, 3, skip_rows=12) for i in df["id"]]
+        assert skipped == partitions[1][12:]
+
     def test_iter_cohere(self):
         cohere_10m = Dataset.COHERE.manager(10_000_000)
         cohere_10m.prepare()
@@ -0,0 +1,75 @@
+import time
+
+import numpy as np
+
+from vectordb_bench.backend.clients import DB
+from vectordb_bench.backend.clients.test.config import TestIndexConfig
+from vectordb_bench.backend.runner.freshness import FreshnessProbe
+
+
+class VisibleAfter:
+    """inserted ids are returned by search `lag` seconds after their insert"""
+
+    def __init__(self, lag: float | None):
+        self.lag = lag
+        self.inserted = {}
+        self.deleted = []
+
+    def insert_embeddings(self, embeddings: np.ndarray, metadata: np.ndarray, **__) -> tuple[int, None]:
+        for i in metadata:
+            self.inserted[int(i)] = time.perf_counter()
+        return len(metadata), None
+
+    def search_embedding(self, query: np.ndarray, k: int = 100, **__) -> list[int]:
+        if self.lag is None:
+            return []
+        now = time.perf_counter()
+        return [i for i, t in self.inserted.items() if now - t >= self.lag][:k]
+
+    def delete_embeddings(self, ids: list[int]) -> tuple[int, None]:
+        self.deleted.extend(ids)
+        return len(ids), None
+
+
+def make_probe(monkeypatch, lag: float | None, **kwargs) -> tuple[FreshnessProbe, VisibleAfter]:
+    db = DB.Test.init_cls(dim=4, db_config={}, db_case_config=TestIndexConfig())
+    fake = VisibleAfter(lag)
+    for name in ("insert_embeddings", "search_embedding", "delete_embeddings"):
+        monkeypatch.setattr(db, name, getattr(fake, name))
+    probe = FreshnessProbe(db, time.perf_counter(), sentinel_id_start=1000, poll_interval=0.005, **kwargs)
+    return probe, fake
+
+
+def test_lag(monkeypatch):
+    probe, fake = make_probe(monkeypatch, lag=0.05, interval=0.01)
+    probe.start()
+    for _ in range(30):
+        probe.offer(np.ones(4))
+        time.sleep(0.02)
+    probe.stop()
+    res = probe.result()
+
+    assert res["st_freshness_probe_count"] > 0
+    assert res["st_freshness_timeout_count"] == 0
+    assert 0.05 <= res["st_freshness_lag_p50"] <= res["st_freshness_lag_p99"] < 0.1
+    assert min(fake.inserted) == 1000
+    # found sentinels are deleted, not to be returned by the streaming search
+    assert fake.deleted == list(fake.inserted)
+    timeline = res["st_freshness_timeline"]
+    assert len(timeline["time"]) == len(timeline["lag_p99"]) > 0
+    assert min(timeline["lag_p50"]) > 0
+
+
+def test_timeout(monkeypatch):
+    probe, fake = make_probe(monkeypatch, lag=None, interval=0.01, timeout=0.05)
+    probe.start()
+    probe.offer(np.ones(4))
+    time.sleep(0.2)
+    probe.stop()
+    res = probe.result()
+
+    assert res["st_freshness_probe_count"] == 0
+    assert res["st_freshness_timeout_count"] == 1
+    assert res["st_freshness_timeline"]["time"] == []
+    # a sentinel is probed once per offered embedding
+    assert list(fake.inserted) == [1000]
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from vectordb_bench.backend.clients.api import MetricType
+from vectordb_bench.backend.runner.ground_truth import ExactTopK
+
+
+@pytest.mark.parametrize("metric_type", [MetricType.L2, MetricType.COSINE, MetricType.IP])
+def test_exact_top_k(metric_type: MetricType):
+    rng = np.random.default_rng(3)
+    train = rng.normal(size=(250, 8)).astype(np.float32)
+    queries = rng.normal(size=(4, 8)).astype(np.float32)
+    if metric_type == MetricType.COSINE:
+        train = train / np.linalg.norm(train, axis=1)[:, np.newaxis]
+
+    def expected(rows: int) -> list[list[int]]:
+        if metric_type == MetricType.L2:
+            dist = ((queries[:, np.newaxis] - train[np.newaxis, :rows]) ** 2).sum(axis=2)
+        else:
+            normed = queries / np.linalg.norm(queries, axis=1)[:, np.newaxis]
+            dist = -(normed if metric_type == MetricType.COSINE else queries) @ train[:rows].T
+        return np.argsort(dist, axis=1, kind="stable")[:, :10].tolist()
+
+    top_k = ExactTopK(queries, k=10, metric_type=metric_type)
+    # a growing collection, the ground truth follows the rows added so far
+    top_k.add(train[:5], np.arange(5))
+    assert [sorted(r) for r in top_k.result()] == [list(range(5))] * 4
+    for start in range(5, 250, 35):
+        end = min(start + 35, 250)
+        top_k.add(train[start:end], np.arange(start, end))
+        assert top_k.result() == expected(end)
+    top_k.add(train[:0], np.arange(0))
+    assert top_k.result() == expected(250)
@@ -0,0 +1,158 @@
+import logging
+import pickle
+
+import numpy as np
+import pytest
+
+from vectordb_bench.backend.runner.histogram import InsertTimeline, LatencyHistogram, LatencyTimeline
+
+log = logging.getLogger(__name__)
+
+
+class TestLatencyHistogram:
+    @pytest.mark.parametrize("significant_digits", [2, 3, 4])
+    def test_percentile_precision(self, significant_digits):
+        latencies = np.random.default_rng(42).lognormal(mean=-6, sigma=1, size=20_000)
+        hist = LatencyHistogram(significant_digits=significant_digits)
+        hist.record_many(latencies)
+
+        assert len(hist) == len(latencies)
+        for p in [50, 90, 99, 99.9, 99.99, 100]:
+            expected = np.percentile(latencies, p, method="inverted_cdf")
+            log.info(f"p{p}: {hist.percentile(p)}, expected: {expected}")
+            assert hist.percentile(p) == pytest.approx(expected, rel=10**-significant_digits, abs=1e-9)
+        assert hist.mean() == pytest.approx(np.mean(latencies), rel=1e-6)
+        assert hist.max() == pytest.approx(np.max(latencies), abs=1e-9)
+
+    def test_record_and_record_many(self):
+        latencies = [0.0001, 0.002, 0.03, 0.4, 5.0]
+        one_by_one, batch = LatencyHistogram(), LatencyHistogram()
+        for latency in latencies:
+            one_by_one.record(latency)
+        batch.record_many(latencies)
+
+        assert np.array_equal(one_by_one.counts, batch.counts)
+        assert one_by_one.sum() == batch.sum()
+
+    def test_merge_and_pickle(self):
+        latencies = np.random.default_rng(7).uniform(0.001, 0.1, size=10_000)
+        parts = [LatencyHistogram() for _ in range(4)]
+        for part, chunk in zip(parts, np.array_split(latencies, 4), strict=True):
+            part.record_many(chunk)
+        parts = [pickle.loads(pickle.dumps(p)) for p in parts]
+
+        whole = LatencyHistogram()
+        whole.record_many(latencies)
+        merged = LatencyHistogram.merge_all(parts)
+
+        assert len(merged) == len(whole)
+        assert np.array_equal(merged.counts, whole.counts)
+        assert merged.percentile(99) == whole.percentile(99)
+        assert merged.min() == whole.min()
+
+    def test_empty_and_clamp(self):
+        hist = LatencyHistogram(highest_trackable_s=10)
+        assert hist.percentile(99) == 0.0
+        assert hist.mean() == 0.0
+
+        hist.record(100)
+        assert hist.max() == 10
+        with pytest.raises(ValueError):
+            hist.merge(LatencyHistogram(significant_digits=2))
+
+
+class TestLatencyTimeline:
+    def test_windows(self):
+        timeline = LatencyTimeline(start=100.0, duration=2.5, window=1.0)
+        for i in range(10):
+            timeline.record(100.0 + i * 0.1, 0.001)
+        timeline.record(101.5, 0.002)
+        # completed after the duration, counted in the last window
+        timeline.record(103.0, 0.004)
+
+        res = timeline.to_dict()
+        assert res["time"] == [1.0, 2.0, 2.5]
+        assert res["qps"] == [10, 1, 2]
+        assert res["latency_p99"][0] == pytest.approx(0.001, rel=0.01)
+        assert res["latency_p99"][2] == pytest.approx(0.004, rel=0.01)
+
+    def test_merge(self):
+        t1 = LatencyTimeline(start=0, duration=3, window=1.0)
+        t2 = LatencyTimeline(start=0, duration=3, window=1.0)
+        t1.record(0.5, 0.001)
+        t2.record(0.5, 0.003)
+        t2.record(2.5, 0.002)
+
+        merged = LatencyTimeline.merge_all([t1, pickle.loads(pickle.dumps(t2))]).to_dict()
+        assert merged["qps"] == [2, 0, 1]
+        assert merged["latency_avg"][0] == pytest.approx(0.002)
+        assert merged["latency_p99"][1] == 0
+        # inputs are not modified
+        assert t1.to_dict()["qps"] == [1, 0, 0]
+
+        with pytest.raises(ValueError):
+            t1.merge(LatencyTimeline(start=0, duration=3, window=0.5))
+
+
+class TestInsertTimeline:
+    def test_windows(self):
+        timeline = InsertTimeline(start=100.0, window=1.0, max_windows=4)
+        timeline.record(100.5, 0.01, rows=100)
+        timeline.record(102.5, 0.03, rows=300)
+
+        res = timeline.to_dict()
+        assert res["time"] == [1.0, 2.0, 2.5]
+        assert res["rows_per_second"] == [100, 0, 600]
+        assert res["latency_p99"][1] == 0
+        assert res["latency_p50"][2] == pytest.approx(0.03, rel=0.01)
+
+        # past max_windows, the windows double
+        timeline.record(105.5, 0.02, rows=200)
+        res = timeline.to_dict()
+        assert timeline.window == 2.0
+        assert res["time"] == [2.0, 4.0, 5.5]
+        assert res["rows_per_second"] == [50, 150, pytest.approx(200 / 1.5, abs=1e-3)]
+
+    def test_merge(self):
+        t1 = InsertTimeline(start=0, window=1.0, max_windows=4)
+        t2 = InsertTimeline(start=0, window=1.0, max_windows=4)
+        t1.record(0.5, 0.01, rows=10)
+        t2.record(0.5, 0.03, rows=30)
+        t2.record(6.5, 0.02, rows=20)
+        assert t2.window == 2.0
+
+        merged = InsertTimeline.merge_all([t1, pickle.loads(pickle.dumps(t2))])
+        assert merged.window == 2.0
+        res = merged.to_dict()
+        assert res["time"] == [2.0, 4.0, 6.0, 6.5]
+        assert res["rows_per_second"] == [20, 0, 0, 40]
+        assert res["latency_avg"][0] == pytest.approx(0.02, rel=0.01)
+        # inputs are not modified, the last window ends at the last batch
+        assert t1.to_dict() == {
+            "time": [0.5],
+            "rows_per_second": [20],
+            "latency_p99": [pytest.approx(0.01, rel=0.01)],
+            "latency_p50": [pytest.approx(0.01, rel=0.01)],
+            "latency_avg": [pytest.approx(0.01, rel=0.01)],
+        }
+
+    def test_offered(self):
+        timeline = InsertTimeline(start=0, window=1.0, max_windows=4)
+        for i in range(4):
+            timeline.record_offered(i * 0.5, rows=100, backlog=i + 1)
+        timeline.record(0.2, 0.2, rows=100)
+        timeline.record(2.5, 1.0, rows=300)
+
+        res = timeline.to_dict()
+        assert res["time"] == [1.0, 2.0, 2.5]
+        assert res["offered_rows_per_second"] == [200, 200, 0]
+        assert res["rows_per_second"] == [100, 0, 600]
+        assert res["backlog"] == [2, 4, 0]
+        # 400 rows sent in 1.5s, inserted in 2.5s
+        assert timeline.offered_rate == pytest.approx(400 / 1.5)
+        assert timeline.achieved_rate == pytest.approx(400 / 2.5)
+
+        # the backlog of merged windows is their largest
+        timeline.record_offered(4.5, rows=100, backlog=1)
+        assert timeline.window == 2.0
+        assert timeline.to_dict()["backlog"][:2] == [4, 0]
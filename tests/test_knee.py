@@ -0,0 +1,51 @@
+from vectordb_bench.backend.runner.knee import KneeSearch
+
+
+def run_levels(levels: KneeSearch, qps_curve, p99_curve=lambda c: 0.01) -> list[int]:
+    explored = []
+    for conc in levels:
+        explored.append(conc)
+        levels.record(conc, qps_curve(conc), p99_curve(conc))
+    return explored
+
+
+def saturate_at(knee: int):
+    return lambda c: 100.0 * min(c, knee)
+
+
+class TestKneeSearch:
+    def test_grow_then_bisect(self):
+        levels = KneeSearch(start=1, max_concurrency=256, min_gain=0.05)
+        explored = run_levels(levels, saturate_at(20))
+
+        # doubling stops after the first step without gain
+        assert explored[:7] == [1, 2, 4, 8, 16, 32, 64]
+        # bisection between 16 and 32 narrows down to the saturation point
+        assert all(16 < c < 32 for c in explored[7:])
+        assert levels.knee in (20, 21, 22)
+        assert len(explored) == len(set(explored))
+
+    def test_max_concurrency(self):
+        levels = KneeSearch(start=1, max_concurrency=10, min_gain=0.05)
+        explored = run_levels(levels, lambda c: 100.0 * c)
+        assert explored[:5] == [1, 2, 4, 8, 10]
+        assert max(explored) == 10
+        assert levels.knee == 10
+
+    def test_latency_limit(self):
+        levels = KneeSearch(start=1, max_concurrency=256, min_gain=0.05, max_p99=0.1)
+        explored = run_levels(levels, lambda c: 100.0 * c, p99_curve=lambda c: c / 100)
+
+        # 16 exceeds the limit and stops the growth, the knee is the best level within the limit
+        assert explored[:5] == [1, 2, 4, 8, 16]
+        assert 8 <= levels.knee <= 10
+        assert levels.results[levels.knee][1] <= 0.1
+
+    def test_no_level_within_limit(self):
+        levels = KneeSearch(start=4, max_concurrency=256, min_gain=0.05, max_p99=0.001)
+        assert run_levels(levels, saturate_at(20)) == [4]
+        assert levels.knee is None
+
+    def test_failed_level_stops(self):
+        levels = KneeSearch(start=1, max_concurrency=256, min_gain=0.05)
+        assert list(levels) == [1]
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from vectordb_bench.metric import calc_ndcg, calc_recall, calc_search_quality, get_ideal_dcg, id_matrix
+
+
+class TestSearchQuality:
+    def test_same_as_per_query(self):
+        rng = np.random.default_rng(7)
+        k = 10
+        ground_truth = [rng.permutation(50)[:20].tolist() for _ in range(100)]
+        # some queries return fewer than k results, some return ids twice
+        results = [rng.integers(0, 30, size=rng.integers(0, k + 1)).tolist() for _ in range(100)]
+
+        quality = calc_search_quality(id_matrix(results, k), id_matrix(ground_truth, k), k)
+        ideal_dcg = get_ideal_dcg(k)
+        assert quality["recall"] == pytest.approx(
+            np.mean([calc_recall(k, gt[:k], r) for gt, r in zip(ground_truth, results, strict=True)])
+        )
+        assert quality["ndcg"] == pytest.approx(
+            np.mean([calc_ndcg(gt[:k], r, ideal_dcg) for gt, r in zip(ground_truth, results, strict=True)])
+        )
+
+    def test_mrr_and_precision(self):
+        ground_truth = id_matrix([[1, 2, 3, 4], [5, 6, 7, 8]], 4)
+        results = id_matrix([[9, 2, 1], [10, 11, 12, 13]], 4)
+
+        quality = calc_search_quality(results, ground_truth, 4)
+        assert quality["recall"] == pytest.approx((2 / 4 + 0) / 2)
+        assert quality["precision"] == pytest.approx((2 / 3 + 0) / 2)
+        assert quality["mrr"] == pytest.approx((1 / 2 + 0) / 2)
+
+    def test_padding_never_matches(self):
+        ground_truth = id_matrix([[1, 2]], 4)
+        results = id_matrix([[1]], 4)
+        assert calc_search_quality(results, ground_truth, 4)["recall"] == pytest.approx(1 / 4)
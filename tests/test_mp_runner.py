@@ -0,0 +1,204 @@
+import asyncio
+import logging
+import pickle
+import time
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+from vectordb_bench.backend.clients import DB
+from vectordb_bench.backend.clients.test.config import TestIndexConfig
+from vectordb_bench.backend.runner.async_runner import AsyncSearchRunner
+from vectordb_bench.backend.runner.mp_runner import MultiProcessingSearchRunner
+from vectordb_bench.backend.runner.shared_query import SharedQueryMatrix
+from vectordb_bench.models import ArrivalPattern
+
+log = logging.getLogger(__name__)
+
+
+def get_runner(runner_cls: type = MultiProcessingSearchRunner, **kwargs) -> MultiProcessingSearchRunner:
+    db = DB.Test.init_cls(dim=4, db_config={}, db_case_config=TestIndexConfig())
+    return runner_cls(db=db, test_data=[[0.1, 0.2, 0.3, 0.4]] * 10, k=10, **kwargs)
+
+
+class TestMultiProcessingSearchRunner:
+    @pytest.mark.parametrize("arrival_pattern", [ArrivalPattern.CONSTANT, ArrivalPattern.POISSON])
+    def test_search_by_rate(self, arrival_pattern):
+        runner = get_runner(duration=2, target_qps=100, arrival_pattern=arrival_pattern)
+        count, dur, latencies, timeline, missed = runner.search_by_rate(100)
+        log.info(f"count={count}, dur={dur}")
+
+        assert len(latencies) == count
+        assert missed == 0
+        # the Test client never falls behind, so achieved rate follows the offered rate
+        assert 140 <= count <= 260
+        assert latencies.min() >= 0
+
+        timeline = timeline.to_dict()
+        assert timeline["time"] == [1.0, 2.0]
+        assert sum(timeline["qps"]) == pytest.approx(count)
+
+    def test_search_by_rate_missed(self):
+        runner = get_runner(duration=1, target_qps=100, arrival_pattern=ArrivalPattern.CONSTANT)
+        # a server that takes 0.5s per query falls behind the 100 qps schedule
+        runner._send_request = lambda _: time.sleep(0.5)
+        count, _, latencies, _, missed = runner.search_by_rate(100)
+
+        assert count == 2
+        assert 90 <= missed <= 100
+        # the unsent queries are recorded with their wait until the end of the search
+        assert len(latencies) == count + missed
+        assert latencies.max() <= 1.0
+
+    def test_shared_test_data(self):
+        runner = get_runner()
+        assert isinstance(runner.test_data, SharedQueryMatrix)
+
+        # only the shared memory handle is pickled, not the queries
+        attached = pickle.loads(pickle.dumps(runner.test_data))
+        assert len(pickle.dumps(runner.test_data)) < 1024
+        assert len(attached) == 10
+        assert attached[3].dtype == np.float32
+        assert np.array_equal(attached[3], runner.test_data[3])
+
+    def test_reuse_search_processes(self):
+        runner = get_runner(duration=1, concurrencies=[1, 2])
+        try:
+            max_qps, failed_rate, _ = runner.run_by_dur(1)
+            assert max_qps > 0
+            assert failed_rate == 0
+            pids = [p.pid for p in runner._pool._processes]
+
+            # the next call searches in the same processes instead of starting new ones
+            runner.run_by_dur(1)
+            assert [p.pid for p in runner._pool._processes] == pids
+        finally:
+            runner.stop()
+        assert runner._pool is None
+
+    def test_threads_per_process(self):
+        runner = get_runner(duration=1, concurrencies=[1, 5], threads_per_process=2)
+        assert runner._pool_size(5) == 3
+
+        max_qps, conc_num_list, conc_qps_list, *_ = runner.run()
+        assert conc_num_list == [1, 5]
+        assert max_qps == max(conc_qps_list) > 0
+
+    def test_thread_runners(self):
+        runner = get_runner(threads_per_process=3)
+        with runner.init_worker():
+            assert len({id(r.db) for r in runner._thread_runners}) == 3
+            res = runner.search_in_threads(2, "search_by_dur", 0.2)
+            assert len(res) == 2
+            assert all(success > 0 and failed == 0 for success, failed, _ in res)
+        assert runner._thread_runners == []
+
+    def test_run_all_concurrencies(self):
+        runner = get_runner(duration=1, concurrencies=[1, 2])
+        max_qps, conc_num_list, conc_qps_list, *_ = runner.run()
+        assert conc_num_list == [1, 2]
+        assert max_qps == max(conc_qps_list) > 0
+        assert runner._pool is None
+
+    def test_adaptive_concurrency(self):
+        runner = get_runner(duration=1, concurrencies=[1], adaptive=True, adaptive_max_concurrency=2, warmup_queries=5)
+        max_qps, conc_num_list, conc_qps_list, *_, conc_knee, conc_warmup = runner.run()
+        assert conc_num_list == [1, 2]
+        assert max_qps == max(conc_qps_list) > 0
+        assert conc_knee in conc_num_list
+        # the pool is started once for the largest concurrency, each process warms up once
+        assert conc_warmup["count"] == 10
+        assert runner._pool is None
+
+    def test_slo_stops_concurrency_ramp(self):
+        runner = get_runner(duration=1, concurrencies=[1, 2, 4], slo_latency=0.0)
+        _, conc_num_list, *_ = runner.run()
+        # the first level already breaks a zero budget
+        assert conc_num_list == [1]
+
+    def test_slo_rate_ramp(self):
+        runner = get_runner(duration=1, concurrencies=[1, 2], target_qps=50, slo_latency=0.0)
+        _, conc_num_list, _, _, _, _, conc_offered_qps_list, conc_missed_list, *_ = runner.run()
+        assert conc_num_list == [2]
+        assert conc_offered_qps_list == [50]
+        assert conc_missed_list == [0]
+
+    def test_warmup(self):
+        runner = get_runner(duration=1, concurrencies=[1, 2], threads_per_process=2, warmup_queries=5)
+        *_, conc_warmup = runner.run()
+        # every thread of the pool warms up once on its fresh connection
+        assert conc_warmup["count"] == 10
+        assert conc_warmup["latency_p99"] >= 0
+
+    def test_no_warmup(self):
+        runner = get_runner(duration=1, concurrencies=[1])
+        *_, conc_warmup = runner.run()
+        assert conc_warmup == {}
+
+    def test_batch_search(self):
+        runner = get_runner(duration=0.5, batch_size=4)
+        with runner.init_worker():
+            count, _, latencies, _ = runner.search_in_threads(1, "search")[0]
+        # counts are in queries, latencies in requests
+        assert count == len(latencies) * 4 > 0
+
+    def test_shared_batch(self):
+        queries = SharedQueryMatrix(np.arange(20, dtype=np.float32).reshape(10, 2))
+        assert queries.batch(2, 3).tolist() == [[4, 5], [6, 7], [8, 9]]
+        # wraps around the end
+        assert queries.batch(8, 3).tolist() == [[16, 17], [18, 19], [0, 1]]
+
+
+class TestAsyncSearchRunner:
+    def test_search_async(self):
+        runner = get_runner(AsyncSearchRunner, processes=1, duration=1)
+        with runner.init_worker():
+            count, dur, latencies, _ = runner.search_async(coroutines=8)
+        assert count > 0
+        assert len(latencies) == count
+        assert dur >= 1
+
+    def test_async_client_per_process(self):
+        runner = get_runner(AsyncSearchRunner, processes=2, duration=0.2, concurrencies=[2, 5])
+        entered = []
+
+        @asynccontextmanager
+        async def async_init(concurrency: int):
+            entered.append((asyncio.get_running_loop(), concurrency))
+            yield
+            entered.append(None)
+
+        runner.db.async_init = async_init
+        with runner.init_worker():
+            # the levels search on the same loop and client, connected once
+            runner.search_async(coroutines=2)
+            runner.search_async(coroutines=4)
+            assert len(entered) == 1
+        # 5 coroutines in 2 processes, at most 3 in one of them
+        assert entered[0][1] == 3
+        assert entered[1] is None
+
+    def test_split_coroutines(self):
+        runner = get_runner(AsyncSearchRunner, processes=2, duration=1, concurrencies=[1, 5])
+        assert runner._pool_size(5) == 2
+
+        max_qps, conc_num_list, conc_qps_list, *_ = runner.run()
+        assert conc_num_list == [1, 5]
+        assert max_qps == max(conc_qps_list) > 0
+
+    def test_warmup_coroutines(self):
+        runner = get_runner(AsyncSearchRunner, processes=1, duration=1, warmup_queries=3)
+        with runner.init_worker():
+            runner.warmup_async(coroutines=4)
+            runner.search_async(coroutines=4)
+        assert len(runner.pop_warmup_latencies()) == 12
+        assert len(runner.pop_warmup_latencies()) == 0
+
+    def test_qps_excludes_warmup(self):
+        runner = get_runner(AsyncSearchRunner, processes=1, duration=1, concurrencies=[2], warmup_duration=1)
+        max_qps, _, conc_qps_list, *_, conc_timeline, _, conc_warmup = runner.run()
+        # the timeline has one 1s window, its qps is the count of the measured search
+        count = sum(conc_timeline[0]["qps"])
+        assert conc_warmup["count"] > 0
+        assert max_qps == conc_qps_list[0] == pytest.approx(count, rel=0.1)
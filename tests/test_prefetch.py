@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+from vectordb_bench.backend.runner.prefetch import Prefetcher
+
+
+def slow_double(x: int) -> int:
+    time.sleep(0.01)
+    return x * 2
+
+
+class TestPrefetcher:
+    @pytest.mark.parametrize("depth", [0, 1, 4])
+    def test_order(self, depth: int):
+        items = Prefetcher(range(20), slow_double, depth)
+        assert list(items) == [x * 2 for x in range(20)]
+        assert items.stats["count"] == 20
+        assert items.stats["prepare_time"] >= 0.2
+
+    def test_overlap(self):
+        items = Prefetcher(range(10), slow_double, depth=4)
+        for _ in items:
+            # a slow consumer finds the next items ready
+            time.sleep(0.03)
+        assert items.stats["wait_time"] < items.stats["prepare_time"]
+        assert items.stats["queue_depth_avg"] > 1
+
+    def test_error(self):
+        def fail(x: int) -> int:
+            if x == 3:
+                msg = "bad batch"
+                raise ValueError(msg)
+            return x
+
+        items = Prefetcher(range(10), fail, depth=2)
+        with pytest.raises(ValueError, match="bad batch"):
+            list(items)
+
+    def test_stop_early(self):
+        items = Prefetcher(range(100), slow_double, depth=2)
+        for x in items:
+            if x == 4:
+                break
+        assert items.stats["count"] == 3
@@ -0,0 +1,65 @@
+import queue
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from vectordb_bench import config
+from vectordb_bench.backend.clients import DB
+from vectordb_bench.backend.clients.api import MetricType
+from vectordb_bench.backend.clients.test.config import TestIndexConfig
+from vectordb_bench.backend.runner.read_write_runner import ReadWriteRunner
+
+
+class InMemoryDataset:
+    """train batches, test queries and metric of a DatasetManager"""
+
+    def __init__(self, train: np.ndarray, test: np.ndarray):
+        self.train = train
+        self.test_data = test.tolist()
+        self.gt_data = [list(range(10))] * len(test)
+        self.data = SimpleNamespace(size=len(train), metric_type=MetricType.L2)
+
+    def __iter__(self):
+        # picklable, the runner is pickled into the search processes
+        return iter(
+            [
+                pd.DataFrame({"id": range(i, i + 100), "emb": list(self.train[i : i + 100])})
+                for i in range(0, len(self.train), 100)
+            ]
+        )
+
+
+def test_run_search_continuously(monkeypatch):
+    monkeypatch.setattr(config, "STREAMING_SEARCH_WINDOW", 0.5)
+    monkeypatch.setattr(config, "STREAMING_RECALL_QUERIES", 3)
+    rng = np.random.default_rng(0)
+    # the Test client returns ids 0-9, the nearest rows of every query
+    train = rng.normal(size=(300, 4)).astype(np.float32) + 100
+    train[:10] = rng.normal(size=(10, 4)) * 0.01
+    dataset = InMemoryDataset(train, rng.normal(size=(5, 4)) * 0.01)
+    db = DB.Test.init_cls(dim=4, db_config={}, db_case_config=TestIndexConfig())
+    runner = ReadWriteRunner(
+        db,
+        dataset,
+        insert_rate=100,
+        k=10,
+        concurrencies=(1, 2),
+        continuous_search=True,
+        continuous_search_qps=100,
+    )
+
+    q = queue.Queue()
+    for sig in [False, False, True]:
+        q.put(sig)
+    timeline = runner.run_search_continuously(q)
+
+    # every signal is read after the first window
+    assert timeline["inserted_rows"] == [300]
+    assert timeline["recall"] == [1.0]
+    assert 30 <= timeline["qps"][0] <= 150
+    assert len(timeline["time"]) == len(timeline["latency_p99"]) == 1
+    assert runner._pool is None
+
+    q.put(None)
+    assert runner.run_search_continuously(q) is None
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from vectordb_bench.backend.runner.util import get_data
+
+
+class TestGetData:
+    def get_df(self) -> pd.DataFrame:
+        return pd.DataFrame({"id": [3, 1, 2], "emb": [np.array([3.0, 4.0], dtype=np.float32)] * 3})
+
+    def test_lists(self):
+        embeddings, ids = get_data(self.get_df(), normalize=False)
+        assert ids == [3, 1, 2]
+        assert embeddings == [[3.0, 4.0]] * 3
+
+    def test_ndarray(self):
+        embeddings, ids = get_data(self.get_df(), normalize=True, ndarray=True)
+        assert ids.dtype == np.int64
+        assert ids.tolist() == [3, 1, 2]
+        assert embeddings.dtype == np.float32
+        assert embeddings.shape == (3, 2)
+        assert embeddings.flags.c_contiguous
+        assert np.allclose(embeddings, [[0.6, 0.8]] * 3)
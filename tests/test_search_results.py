@@ -0,0 +1,47 @@
+import numpy as np
+import polars as pl
+import pytest
+
+from vectordb_bench.backend.runner import search_results
+from vectordb_bench.backend.runner.search_results import read_search_results, rescore, write_search_results
+
+
+class TestSearchResults:
+    def test_write_and_read(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(search_results, "ROW_GROUP_SIZE", 3)
+        result_ids = np.arange(40, dtype=np.int64).reshape(10, 4)
+        result_ids[2, 3] = -1
+        latencies = np.linspace(0.001, 0.01, 10)
+
+        path = tmp_path / "results" / "search_results.parquet"
+        write_search_results(path, result_ids, latencies, {"k": 4})
+        ids, lat, metadata = read_search_results(path)
+        assert np.array_equal(ids, result_ids)
+        assert np.array_equal(lat, latencies)
+        assert metadata == {"k": 4}
+
+    def test_rescore(self, tmp_path):
+        gt_file = tmp_path / "neighbors.parquet"
+        pl.DataFrame({"neighbors_id": [[0, 1, 2, 3], [4, 5, 6, 7]]}).write_parquet(gt_file)
+        result_ids = np.array([[0, 1, 10, 11], [4, 12, 13, 14]], dtype=np.int64)
+
+        path, other = tmp_path / "a.parquet", tmp_path / "b.parquet"
+        write_search_results(path, result_ids, np.ones(2), {"k": 4, "ground_truth": str(gt_file)})
+        write_search_results(other, np.array([[0, 10, 8, 7], [4, 12, 8, 7]]), np.ones(2), {"k": 4})
+
+        scores = rescore(path, k_list=[1], compare=other)
+        assert scores["k"] == 4
+        assert scores["recall"] == pytest.approx((2 / 4 + 1 / 4) / 2)
+        assert scores["quality_at_k"]["1"]["recall"] == 1.0
+        assert scores["latency_p99"] == 1.0
+        assert scores["overlap"] == pytest.approx((2 / 4 + 2 / 4) / 2)
+
+        # a corrected ground truth file instead of the one of the benchmark run
+        pl.DataFrame({"neighbors_id": [[9, 1, 2, 3], [9, 5, 6, 7]]}).write_parquet(tmp_path / "fixed.parquet")
+        assert rescore(path, ground_truth=tmp_path / "fixed.parquet")["recall"] == pytest.approx((1 / 4 + 0) / 2)
+
+        # only the 4 searched results per query can be scored
+        with pytest.raises(ValueError, match="exceed the 4 results"):
+            rescore(path, k=10)
+        with pytest.raises(ValueError, match=r"\[5\]"):
+            rescore(path, k_list=[1, 5])
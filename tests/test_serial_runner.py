@@ -0,0 +1,175 @@
+import time
+
+import polars as pl
+import pytest
+
+from vectordb_bench import config
+from vectordb_bench.backend.clients import DB, api
+from vectordb_bench.backend.clients.test.config import TestIndexConfig
+from vectordb_bench.backend.dataset import Dataset, DatasetManager
+from vectordb_bench.backend.runner.checkpoint import LoadCheckpoint
+from vectordb_bench.backend.runner.search_results import read_search_results
+from vectordb_bench.backend.runner.serial_runner import SerialInsertRunner, SerialSearchRunner
+
+
+def get_runner(
+    batch_size: int,
+    k_list: list[int] | None = None,
+    ground_truth: list[list[int]] | None = None,
+) -> SerialSearchRunner:
+    db = DB.Test.init_cls(dim=4, db_config={}, db_case_config=TestIndexConfig())
+    return SerialSearchRunner(
+        db=db,
+        test_data=[[0.1, 0.2, 0.3, 0.4]] * 10,
+        ground_truth=ground_truth or [list(range(10))] * 10,
+        k=10,
+        batch_size=batch_size,
+        k_list=k_list,
+    )
+
+
+class TestSerialSearchRunner:
+    def test_search(self):
+        runner = get_runner(batch_size=1)
+        recall, ndcg, p99, p95, batch, mrr, precision, quality_at_k = runner.search(
+            (runner.test_data, runner.ground_truth)
+        )
+        assert recall == ndcg == mrr == precision == 1.0
+        assert quality_at_k == {}
+        assert p99 >= p95 >= 0
+        assert batch == {}
+
+    @pytest.mark.parametrize("batch_size", [3, 10])
+    def test_batch_search(self, batch_size: int):
+        # the Test client has no native batch search, the default search_embeddings loops over the queries
+        runner = get_runner(batch_size=batch_size)
+        recall, ndcg, p99, _, batch, *_ = runner.search((runner.test_data, runner.ground_truth))
+        assert recall == ndcg == 1.0
+        assert batch["batch_size"] == batch_size
+        assert batch["latency_p99"] >= p99
+        assert batch["vectors_per_second"] > 0
+
+    def test_quality_at_k(self):
+        runner = get_runner(batch_size=1, k_list=[1, 5, 20], ground_truth=[list(range(5)) + list(range(100, 115))] * 10)
+        recall, *_, quality_at_k = runner.search((runner.test_data, runner.ground_truth))
+
+        # one search of 20 results, scored at k=10 and at each k of k_list
+        assert runner.search_k == 20
+        assert recall == 0.5
+        assert quality_at_k["1"]["recall"] == quality_at_k["5"]["recall"] == 1.0
+        assert quality_at_k["20"]["recall"] == 0.25
+
+    def test_k_list_above_ground_truth(self):
+        with pytest.raises(ValueError, match=r"\[20\] exceed the ground truth width 10"):
+            get_runner(batch_size=1, k_list=[5, 20])
+
+    def test_save_search_results(self, tmp_path):
+        runner = get_runner(batch_size=3)
+        runner.results_file = tmp_path / "search_results.parquet"
+        runner.search((runner.test_data, runner.ground_truth))
+
+        result_ids, latencies, metadata = read_search_results(runner.results_file)
+        assert result_ids.tolist() == runner.ground_truth
+        assert len(latencies) == 10
+        assert metadata["k"] == 10
+
+
+def get_dataset(files: int = 1) -> DatasetManager:
+    """200 rows split over `files` train files, in row groups of 30 rows"""
+    cohere = Dataset.COHERE.manager(100_000)
+    cohere.train_files = [f"train-{i}.parquet" for i in range(files)]
+    cohere.data_dir.mkdir(parents=True)
+    rows = 200 // files
+    for i, file_name in enumerate(cohere.train_files):
+        ids = list(range(i * rows, (i + 1) * rows))
+        df = pl.DataFrame({"id": ids, "emb": [[float(j)] * 4 for j in ids]})
+        df.write_parquet(cohere.data_dir / file_name, row_group_size=30)
+    return cohere
+
+
+class TestSerialInsertRunner:
+    @pytest.fixture(autouse=True)
+    def calibration_config(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(config, "DATASET_LOCAL_DIR", tmp_path)
+        monkeypatch.setattr(config, "LOAD_CALIBRATION_MIN_BATCH_SIZE", 2)
+        monkeypatch.setattr(config, "LOAD_CALIBRATION_MAX_BATCH_SIZE", 16)
+        monkeypatch.setattr(config, "LOAD_CALIBRATION_BATCHES", 2)
+
+    def get_db(self, monkeypatch, batches: list, fail_at: int | None = None) -> api.VectorDB:
+        """Test db recording the inserted ids, raising on the insert of batch `fail_at`"""
+        db = DB.Test.init_cls(dim=4, db_config={}, db_case_config=TestIndexConfig())
+
+        def insert_embeddings(metadata: list[int], **_) -> tuple[int, None]:
+            if len(batches) == fail_at:
+                msg = "client crashed"
+                raise RuntimeError(msg)
+            # same latency for any batch size, the largest size is the fastest
+            time.sleep(0.002)
+            batches.append(metadata)
+            return len(metadata), None
+
+        monkeypatch.setattr(db, "insert_embeddings", insert_embeddings)
+        return db
+
+    def test_calibrate_batch_size(self, tmp_path, monkeypatch):
+        cohere = get_dataset()
+        batches = []
+        db = self.get_db(monkeypatch, batches)
+        runner = SerialInsertRunner(db, cohere, normalize=False, calibrate_batch_size=True)
+
+        calibrated = runner.calibrate()
+        # one untimed batch of 2, then 2 batches of each size
+        assert calibrated == 2 + 2 * (2 + 4 + 8 + 16)
+        assert list(runner.batch_calibration) == ["2", "4", "8", "16"]
+        assert runner.batch_size == 16
+
+        calibration_batches = len(batches)
+        loaded = runner.task()
+        assert calibrated + loaded == 200
+        # every row is inserted exactly once
+        assert sorted(i for batch in batches for i in batch) == list(range(200))
+        # the load reads the rest in batches of the calibrated size
+        assert max(len(batch) for batch in batches[calibration_batches:]) == 16
+        # only the batches of the load are in the latencies and the timeline
+        assert runner.insert_latencies.total_count == len(batches) - calibration_batches
+        assert sum(runner.insert_timeline.rows) == loaded
+
+    def test_resume_load(self, tmp_path, monkeypatch):
+        cohere = get_dataset(files=2)
+        checkpoint_dir = tmp_path / "checkpoint"
+
+        batches = []
+        checkpoint = LoadCheckpoint("case", checkpoint_dir)
+        runner = SerialInsertRunner(
+            self.get_db(monkeypatch, batches, fail_at=14),
+            cohere,
+            normalize=False,
+            calibrate_batch_size=True,
+            checkpoint=checkpoint,
+        )
+        calibrated = runner._start_load()
+        with pytest.raises(RuntimeError):
+            runner.task()
+        assert checkpoint.exists()
+
+        resumed = LoadCheckpoint("case", checkpoint_dir).read()
+        # every acknowledged batch is in the checkpoint
+        assert resumed.count == sum(len(batch) for batch in batches)
+        assert resumed.state["calibrated"] == calibrated
+
+        runner = SerialInsertRunner(
+            self.get_db(monkeypatch, batches),
+            cohere,
+            normalize=False,
+            calibrate_batch_size=True,
+            checkpoint=resumed,
+        )
+        resumed_count = resumed.count
+        assert runner._start_load() == resumed_count
+        assert runner.batch_size == 16
+        assert runner.task() == 200 - resumed_count
+        # the rows of the checkpoint are not inserted again
+        assert sorted(i for batch in batches for i in batch) == list(range(200))
+        assert runner.resumed["count"] == resumed_count
+        # the checkpoint keeps up with the load
+        assert resumed.count == 200
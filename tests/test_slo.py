@@ -0,0 +1,65 @@
+from vectordb_bench.backend.runner.slo import RateRamp
+from vectordb_bench.metric import Metric, set_slo_metric
+
+
+def run_rates(rates: RateRamp, capacity: float) -> list[float]:
+    """a server keeping up with any rate up to `capacity`, latency grows past 80% of it"""
+    explored = []
+    for rate in rates:
+        explored.append(rate)
+        qps = min(rate, capacity)
+        latency = 0.005 if rate <= capacity * 0.8 else 0.1
+        rates.record(rate, qps, latency)
+    return explored
+
+
+class TestRateRamp:
+    def test_grow_then_bisect(self):
+        rates = RateRamp(start=100, latency_budget=0.02)
+        explored = run_rates(rates, capacity=1000)
+
+        assert explored[:5] == [100, 200, 400, 800, 1600]
+        assert all(400 < r < 1600 for r in explored[5:])
+        assert 760 <= rates.best <= 800
+        assert len(explored) == len(set(explored))
+
+    def test_shortfall_breaks_slo(self):
+        rates = RateRamp(start=100, latency_budget=1)
+        run_rates(rates, capacity=1000)
+        # latency is always within the budget, but rates above capacity are not sustained
+        assert 1000 <= rates.best <= 1000 / (1 - rates.max_shortfall)
+
+    def test_start_breaks_slo(self):
+        rates = RateRamp(start=100, latency_budget=0.02)
+        assert run_rates(rates, capacity=50) == [100]
+        assert rates.best is None
+
+
+def test_set_slo_metric():
+    m = Metric(
+        conc_num_list=[1, 10, 20],
+        conc_qps_list=[100.0, 900.0, 1000.0],
+        conc_latency_avg_list=[0.001, 0.005, 0.02],
+        conc_latency_p50_list=[0.001, 0.004, 0.015],
+        conc_latency_p90_list=[0.002, 0.006, 0.025],
+        conc_latency_p95_list=[0.002, 0.007, 0.03],
+        conc_latency_p99_list=[0.003, 0.008, 0.04],
+        conc_latency_p999_list=[0.004, 0.03, 0.05],
+        conc_latency_p9999_list=[0.005, 0.04, 0.06],
+    )
+    set_slo_metric(m, latency_budget=0.02, percentile=99)
+    assert m.slo_qps == 900.0
+    assert m.slo_conc_num == 10
+    assert m.slo_latency_curve["p99"] == 0.008
+    assert m.slo_latency_curve["avg"] == 0.005
+
+    set_slo_metric(m, latency_budget=0.02, percentile=99.9)
+    assert m.slo_qps == 100.0
+    assert m.slo_conc_num == 1
+
+
+def test_set_slo_metric_nothing_within():
+    m = Metric(conc_num_list=[1], conc_qps_list=[100.0], conc_latency_p99_list=[0.1])
+    set_slo_metric(m, latency_budget=0.02, percentile=99)
+    assert m.slo_qps == 0.0
+    assert m.slo_latency_curve == {}
@@ -0,0 +1,67 @@
+import queue
+import time
+
+import numpy as np
+import polars as pl
+import pytest
+
+from vectordb_bench import config
+from vectordb_bench.backend.clients import DB
+from vectordb_bench.backend.clients.test.config import TestIndexConfig
+from vectordb_bench.backend.runner.rate_runner import RatedMultiThreadingInsertRunner, TokenBucket
+
+
+class TestTokenBucket:
+    def test_even_spacing(self):
+        bucket = TokenBucket(rate=10, burst=1, start=0.0)
+        assert bucket.delay(now=0.0) == 0.0
+        bucket.take()
+        # the next batch is due 1/rate later, not at the next second
+        assert bucket.delay(now=0.0) == pytest.approx(0.1)
+        assert bucket.delay(now=0.05) == pytest.approx(0.05)
+        # idle for a second, still one batch at a time
+        assert bucket.delay(now=1.0) == 0.0
+        bucket.take()
+        assert bucket.delay(now=1.0) == pytest.approx(0.1)
+
+    def test_burst(self):
+        bucket = TokenBucket(rate=10, burst=3, start=0.0)
+        bucket.take()
+        # idle for a second, 3 batches go back to back
+        for _ in range(3):
+            assert bucket.delay(now=1.0) == 0.0
+            bucket.take()
+        assert bucket.delay(now=1.0) == pytest.approx(0.1)
+
+
+def test_run_with_rate(monkeypatch):
+    monkeypatch.setattr(config, "NUM_PER_BATCH", 10)
+    db = DB.Test.init_cls(dim=4, db_config={}, db_case_config=TestIndexConfig())
+    sent = []
+
+    def insert_embeddings(_: np.ndarray, metadata: np.ndarray, **__) -> tuple[int, None]:
+        sent.append(time.perf_counter())
+        return len(metadata), None
+
+    monkeypatch.setattr(db, "insert_embeddings", insert_embeddings)
+    batches = [
+        pl.DataFrame({"id": range(i * 10, (i + 1) * 10), "emb": np.ones((10, 4)).tolist()}).to_pandas()
+        for i in range(80)
+    ]
+    # 40 batches/s
+    # the freshness probe is off by default, no sentinel is inserted
+    runner = RatedMultiThreadingInsertRunner(rate=400, db=db, dataset_iter=iter(batches), sentinel_id_start=800)
+    q = queue.Queue()
+    (latencies, timeline, freshness), dur = runner.run_with_rate(q)
+
+    assert latencies.total_count == 80
+    assert len(sent) == 80
+    assert freshness == {}
+    assert sum(timeline.offered) == sum(timeline.rows) == 800
+    # spaced evenly over the second instead of sent together
+    assert np.median(np.diff(sorted(sent))) == pytest.approx(0.025, abs=0.005)
+    assert dur == pytest.approx(2, abs=0.2)
+    assert timeline.offered_rate == pytest.approx(400, rel=0.1)
+    # a progress signal every second of data, then the end
+    signals = [q.get() for _ in range(q.qsize())]
+    assert signals == [False, True]
@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+from pydantic import ValidationError
+
+from vectordb_bench.backend.clients import DB
+from vectordb_bench.backend.clients.api import MetricType
+from vectordb_bench.backend.clients.test.config import TestIndexConfig
+from vectordb_bench.backend.runner.workload_runner import LiveIds, TrainRows, WorkloadRunner
+from vectordb_bench.backend.workload import KeyChooser, KeyDistribution, WorkloadOp, WorkloadSpec, load_workload_spec
+
+
+class InMemoryDataset:
+    """train batches, test queries and metric of a DatasetManager"""
+
+    def __init__(self, train: np.ndarray, test: np.ndarray):
+        self.train = train
+        self.test_data = test.tolist()
+        self.data = SimpleNamespace(size=len(train), metric_type=MetricType.L2)
+
+    def __iter__(self):
+        # picklable, the runner is pickled into the search processes
+        return iter(
+            [
+                pd.DataFrame({"id": range(i, i + 100), "emb": list(self.train[i : i + 100])})
+                for i in range(0, len(self.train), 100)
+            ]
+        )
+
+
+class TestWorkloadSpec:
+    def test_file(self, tmp_path):
+        path = tmp_path / "workload.yml"
+        path.write_text(
+            "target_ops: 2000\n"
+            "operations:\n"
+            "  search: {ratio: 0.9, batch_size: 10}\n"
+            "  update: {ratio: 0.1}\n"
+            "key_distribution: latest\n"
+        )
+        spec = WorkloadSpec.parse_obj(load_workload_spec(path))
+        assert spec.rate(WorkloadOp.SEARCH) == pytest.approx(1800)
+        assert spec.batch_size(WorkloadOp.SEARCH) == 10
+        assert spec.ratio(WorkloadOp.INSERT) == 0
+        assert spec.write_ops == [WorkloadOp.UPDATE]
+        assert spec.with_deletes
+        assert spec.key_distribution == KeyDistribution.LATEST
+
+    @pytest.mark.parametrize(
+        "spec",
+        [
+            {"operations": {"search": {"ratio": 0.5}}},
+            {"operations": {"search": {"ratio": 1, "batch_size": 0}}},
+            {"operations": {"scan": {"ratio": 1}}},
+            {"target_ops": 0},
+        ],
+    )
+    def test_invalid(self, spec: dict):
+        with pytest.raises(ValidationError):
+            WorkloadSpec.parse_obj(spec)
+
+
+@pytest.mark.parametrize("distribution", list(KeyDistribution))
+def test_key_chooser(distribution: KeyDistribution):
+    keys = KeyChooser(distribution).choose(1000, 100_000, np.random.default_rng(0))
+    assert keys.min() >= 0
+    assert keys.max() < 1000
+    counts = np.bincount(keys, minlength=1000)
+    if distribution == KeyDistribution.UNIFORM:
+        assert counts.max() < 3 * counts.mean()
+    else:
+        hottest = 0 if distribution == KeyDistribution.ZIPFIAN else 999
+        # log(2) / log(1001) of the keys by the continuous approximation, 1 / H(1000) by the discrete zipfian
+        assert counts.argmax() == hottest
+        assert 0.08 < counts[hottest] / len(keys) < 0.15
+        assert counts[hottest] > 1.5 * counts[abs(hottest - 1)]
+
+
+def test_live_ids():
+    live = LiveIds(np.arange(3))
+    live.add(np.array([10, 11, 12]))
+    assert len(live) == 6
+    live.remove(np.array([0, 5]))
+    assert sorted(live.get(np.arange(len(live)))) == [1, 2, 10, 11]
+
+
+def test_train_rows():
+    train = np.arange(200 * 2, dtype=np.float32).reshape(200, 2)
+    rows = TrainRows(InMemoryDataset(train, train[:1]), normalize=False)
+    assert np.array_equal(rows.take(150), train[:150])
+    # cycles through the train data
+    assert np.array_equal(rows.take(100), np.concatenate([train[150:], train[:50]]))
+
+
+def test_run():
+    rng = np.random.default_rng(0)
+    dataset = InMemoryDataset(rng.normal(size=(300, 4)).astype(np.float32), rng.normal(size=(5, 4)))
+    db = DB.Test.init_cls(dim=4, db_config={}, db_case_config=TestIndexConfig())
+    spec = WorkloadSpec(
+        target_ops=200,
+        duration=2,
+        operations={
+            "search": {"ratio": 0.5},
+            "insert": {"ratio": 0.2, "batch_size": 10},
+            "update": {"ratio": 0.2, "batch_size": 5},
+            "delete": {"ratio": 0.1, "batch_size": 5},
+        },
+        key_distribution="zipfian",
+        search_concurrency=2,
+        write_concurrency=2,
+    )
+    runner = WorkloadRunner(db, dataset, spec, k=10)
+    res = runner.run()
+
+    ops = res["workload_ops"]
+    assert set(ops) == {"search", "insert", "update", "delete"}
+    for op, ratio in [("search", 0.5), ("insert", 0.2), ("update", 0.2), ("delete", 0.1)]:
+        assert ops[op]["count"] > 0
+        assert ops[op]["ops"] == pytest.approx(200 * ratio, rel=0.5)
+        assert ops[op]["latency_p99"] >= ops[op]["latency_p50"] > 0
+    assert "failed" not in ops["search"]
+    assert ops["insert"]["failed"] == 0
+    assert res["workload_target_ops"] == 200
+    assert res["workload_achieved_ops"] == pytest.approx(200, rel=0.3)
+    # new ids follow the train ids, deleted ids leave the live ids
+    inserted = ops["insert"]["count"] * 10
+    assert runner.next_id == 300 + inserted
+    assert 300 + inserted - 5 * ops["delete"]["count"] <= len(runner.live) <= 300 + inserted
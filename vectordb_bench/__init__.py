@@ -19,7 +19,35 @@ class config:
     DATASET_SOURCE = env.str("DATASET_SOURCE", "S3")  # Options "S3" or "AliyunOSS"
     DATASET_LOCAL_DIR = env.path("DATASET_LOCAL_DIR", "/tmp/vectordb_bench/dataset")
     NUM_PER_BATCH = env.int("NUM_PER_BATCH", 100)
+    # record batches read and prepared ahead of the insert loop by a background thread, 0 to prepare them inline
+    LOAD_PREFETCH_DEPTH = env.int("LOAD_PREFETCH_DEPTH", 8)
+    # insert batch size calibration before the load: sizes doubled from MIN to MAX, each timed on
+    # LOAD_CALIBRATION_BATCHES batches, out of a sample of at most LOAD_CALIBRATION_ROWS first train rows
+    LOAD_CALIBRATION_MIN_BATCH_SIZE = env.int("LOAD_CALIBRATION_MIN_BATCH_SIZE", 100)
+    LOAD_CALIBRATION_MAX_BATCH_SIZE = env.int("LOAD_CALIBRATION_MAX_BATCH_SIZE", 12800)
+    LOAD_CALIBRATION_BATCHES = env.int("LOAD_CALIBRATION_BATCHES", 5)
+    LOAD_CALIBRATION_ROWS = env.int("LOAD_CALIBRATION_ROWS", 50_000)
+    # progress of the performance case loads, saved after every acknowledged batch for --resume-load
+    LOAD_CHECKPOINT_DIR = env.path("LOAD_CHECKPOINT_DIR", "/tmp/vectordb_bench/checkpoint")
+    # inserted rows/s and batch latencies of the load per window, windows double past LOAD_TIMELINE_MAX_WINDOWS
+    LOAD_TIMELINE_WINDOW = env.float("LOAD_TIMELINE_WINDOW", 1.0)
+    LOAD_TIMELINE_MAX_WINDOWS = env.int("LOAD_TIMELINE_MAX_WINDOWS", 512)
     TIME_PER_BATCH = 1  # 1s. for streaming insertion.
+    # streaming insert batches sent back to back after an idle moment, 1 spaces every batch evenly
+    STREAMING_INSERT_BURST = env.int("STREAMING_INSERT_BURST", 1)
+    # unfinished streaming insert batches before sending waits for one to finish, the offered rate then drops
+    STREAMING_MAX_BACKLOG = env.int("STREAMING_MAX_BACKLOG", 200)
+    # seconds between freshness sentinels during streaming insertion, 0 disables the freshness probe. The sentinels
+    # are extra rows copying train vectors, left in the collection by clients without delete_supported
+    FRESHNESS_PROBE_INTERVAL = env.float("FRESHNESS_PROBE_INTERVAL", 0.0)
+    # a sentinel not in the top FRESHNESS_PROBE_K of its own search after FRESHNESS_PROBE_TIMEOUT seconds is a timeout
+    FRESHNESS_PROBE_TIMEOUT = env.float("FRESHNESS_PROBE_TIMEOUT", 60.0)
+    FRESHNESS_PROBE_POLL_INTERVAL = env.float("FRESHNESS_PROBE_POLL_INTERVAL", 0.05)
+    FRESHNESS_PROBE_K = env.int("FRESHNESS_PROBE_K", 10)
+    # continuous streaming search: seconds per point of its timeline, and test queries whose recall is sampled
+    # at each point against the exact neighbors of the rows inserted so far, 0 disables the recall sample
+    STREAMING_SEARCH_WINDOW = env.float("STREAMING_SEARCH_WINDOW", 10.0)
+    STREAMING_RECALL_QUERIES = env.int("STREAMING_RECALL_QUERIES", 20)
     MAX_INSERT_RETRY = 5
     MAX_SEARCH_RETRY = 5
 
@@ -34,6 +62,14 @@ class config:
 
     CONCURRENCY_TIMEOUT = 3600
 
+    # latencies are recorded into fixed-size histograms, values keep this many significant digits
+    LATENCY_HISTOGRAM_SIGNIFICANT_DIGITS = env.int("LATENCY_HISTOGRAM_SIGNIFICANT_DIGITS", 3)
+    LATENCY_HISTOGRAM_HIGHEST_TRACKABLE = 3600  # 1h, larger latencies are clamped
+    CONCURRENCY_TIMELINE_WINDOW = env.float("CONCURRENCY_TIMELINE_WINDOW", 1.0)  # seconds per timeline point
+
+    ADAPTIVE_MAX_CONCURRENCY = 256
+    ADAPTIVE_MIN_QPS_GAIN = 0.05
+
     RESULTS_LOCAL_DIR = env.path(
         "RESULTS_LOCAL_DIR",
         pathlib.Path(__file__).parent.joinpath("results"),
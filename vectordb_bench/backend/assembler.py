@@ -5,7 +5,7 @@ from vectordb_bench.backend.data_source import DatasetSource
 from vectordb_bench.backend.filter import FilterOp
 from vectordb_bench.models import TaskConfig
 
-from .cases import CaseLabel
+from .cases import CaseLabel, StreamingChurnCase, WorkloadCase
 from .task_runner import CaseRunner, RunningStatus, TaskRunner
 
 log = logging.getLogger(__name__)
@@ -18,6 +18,13 @@ class FilterNotSupportedError(ValueError):
         super().__init__(f"{filter_type} Filter test is not supported by {db_name}.")
 
 
+class DeleteNotSupportedError(ValueError):
+    """Raised when a case deletes embeddings and the vector database client cannot."""
+
+    def __init__(self, db_name: str, case_name: str):
+        super().__init__(f"{case_name} is not supported by {db_name}, it has no delete_embeddings.")
+
+
 class Assembler:
     @classmethod
     def assemble(cls, run_id: str, task: TaskConfig, source: DatasetSource) -> CaseRunner:
@@ -48,6 +55,16 @@ class Assembler:
         load_runners = [r for r in runners if r.ca.label == CaseLabel.Load]
         perf_runners = [r for r in runners if r.ca.label == CaseLabel.Performance]
         streaming_runners = [r for r in runners if r.ca.label == CaseLabel.Streaming]
+        for r in streaming_runners:
+            if isinstance(r.ca, StreamingChurnCase) and not r.config.db.init_cls.delete_supported:
+                raise DeleteNotSupportedError(r.config.db.value, r.ca.name)
+        for r in perf_runners:
+            if (
+                isinstance(r.ca, WorkloadCase)
+                and r.ca.workload.with_deletes
+                and not r.config.db.init_cls.delete_supported
+            ):
+                raise DeleteNotSupportedError(r.config.db.value, r.ca.name)
 
         # group by db
         db2runner: dict[DB, list[CaseRunner]] = {}
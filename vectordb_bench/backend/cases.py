@@ -9,6 +9,7 @@ from vectordb_bench.base import BaseModel
 from vectordb_bench.frontend.components.custom.getCustomConfig import CustomDatasetConfig
 
 from .dataset import CustomDataset, Dataset, DatasetManager, DatasetWithSizeType
+from .workload import WorkloadSpec, load_workload_spec
 
 log = logging.getLogger(__name__)
 
@@ -51,11 +52,14 @@ class CaseType(Enum):
     PerformanceCustomDataset = 101
 
     StreamingPerformanceCase = 200
+    StreamingChurnCase = 201
 
     LabelFilterPerformanceCase = 300
 
     NewIntFilterPerformanceCase = 400
 
+    WorkloadCase = 500
+
     def case_cls(self, custom_configs: dict | None = None) -> type["Case"]:
         if custom_configs is None:
             return type2case.get(self)()
@@ -428,6 +432,10 @@ class StreamingPerformanceCase(Case):
     concurrencies: list[int]
     optimize_after_write: bool = True
     read_dur_after_write: int = 30
+    # search all along the insertion by max(concurrencies) workers instead of at the search stages,
+    # open-loop at continuous_search_qps if set, closed-loop otherwise
+    continuous_search: bool = False
+    continuous_search_qps: float = 0
 
     def __init__(
         self,
@@ -474,6 +482,31 @@ class StreamingPerformanceCase(Case):
         )
 
 
+class StreamingChurnCase(StreamingPerformanceCase):
+    """Streaming case whose batches are inserts, updates or deletes at the given ratios, the rest being inserts.
+
+    The recall of every search stage is scored against the exact neighbors of the ids live at that moment.
+    """
+
+    case_id: CaseType = CaseType.StreamingChurnCase
+    update_ratio: float = 0.1
+    delete_ratio: float = 0.1
+
+    def __init__(self, update_ratio: float = 0.1, delete_ratio: float = 0.1, **kwargs):
+        if update_ratio < 0 or delete_ratio < 0 or update_ratio + delete_ratio >= 1:
+            msg = f"update_ratio(={update_ratio}) and delete_ratio(={delete_ratio}) should be >= 0, sum < 1"
+            raise ValueError(msg)
+        super().__init__(update_ratio=update_ratio, delete_ratio=delete_ratio, **kwargs)
+        self.name = (
+            f"Streaming-Churn - {self.dataset_with_size_type.value}, {self.insert_rate} rows/s, "
+            f"{update_ratio:.0%} update, {delete_ratio:.0%} delete"
+        )
+        self.description = (
+            "This case tests the search performance and recall of vector database while inserting, updating "
+            f"and deleting at a fixed speed. (dataset: {self.dataset_with_size_type.value})"
+        )
+
+
 class NewIntFilterPerformanceCase(PerformanceCase):
     case_id: CaseType = CaseType.NewIntFilterPerformanceCase
     dataset_with_size_type: DatasetWithSizeType
@@ -551,6 +584,45 @@ class LabelFilterPerformanceCase(PerformanceCase):
         return LabelFilter(label_percentage=self.label_percentage)
 
 
+class WorkloadCase(PerformanceCase):
+    """The dataset is loaded, then searches and writes are sent at the mix and rate of the workload spec, see
+    WorkloadSpec. The latencies of each operation type are reported separately.
+    """
+
+    case_id: CaseType = CaseType.WorkloadCase
+    dataset_with_size_type: DatasetWithSizeType
+    workload: WorkloadSpec
+
+    def __init__(
+        self,
+        dataset_with_size_type: DatasetWithSizeType | str = DatasetWithSizeType.CohereSmall.value,
+        workload: WorkloadSpec | dict | str | None = None,
+        **kwargs,
+    ):
+        if not isinstance(dataset_with_size_type, DatasetWithSizeType):
+            dataset_with_size_type = DatasetWithSizeType(dataset_with_size_type)
+        if workload is None:
+            workload = WorkloadSpec()
+        elif isinstance(workload, str):
+            workload = WorkloadSpec.parse_obj(load_workload_spec(workload))
+        elif isinstance(workload, dict):
+            workload = WorkloadSpec.parse_obj(workload)
+        mix = ", ".join(f"{op.ratio:.0%} {name.value}" for name, op in workload.operations.items() if op.ratio > 0)
+        super().__init__(
+            name=f"Workload - {dataset_with_size_type.value}, {workload.target_ops:g} ops/s, {mix}",
+            description=(
+                "This case tests the latencies of each operation type of vector database under a mix of searches "
+                f"and writes at a fixed rate. (dataset: {dataset_with_size_type.value})"
+            ),
+            dataset=dataset_with_size_type.get_manager(),
+            load_timeout=dataset_with_size_type.get_load_timeout(),
+            optimize_timeout=dataset_with_size_type.get_optimize_timeout(),
+            dataset_with_size_type=dataset_with_size_type,
+            workload=workload,
+            **kwargs,
+        )
+
+
 type2case = {
     CaseType.CapacityDim960: CapacityDim960,
     CaseType.CapacityDim128: CapacityDim128,
@@ -572,6 +644,8 @@ type2case = {
     CaseType.Performance1536D50K: Performance1536D50K,
     CaseType.PerformanceCustomDataset: PerformanceCustomDataset,
     CaseType.StreamingPerformanceCase: StreamingPerformanceCase,
+    CaseType.StreamingChurnCase: StreamingChurnCase,
     CaseType.NewIntFilterPerformanceCase: NewIntFilterPerformanceCase,
     CaseType.LabelFilterPerformanceCase: LabelFilterPerformanceCase,
+    CaseType.WorkloadCase: WorkloadCase,
 }
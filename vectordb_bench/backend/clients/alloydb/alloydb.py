@@ -19,6 +19,8 @@ log = logging.getLogger(__name__)
 class AlloyDB(VectorDB):
     """Use psycopg instructions"""
 
+    ndarray_query_supported: bool = True
+    ndarray_insert_supported: bool = True
     conn: psycopg.Connection[Any] | None = None
     cursor: psycopg.Cursor[Any] | None = None
 
@@ -301,8 +303,8 @@ class AlloyDB(VectorDB):
         assert self.cursor is not None, "Cursor is not initialized"
 
         try:
-            metadata_arr = np.array(metadata)
-            embeddings_arr = np.array(embeddings)
+            metadata_arr = np.asarray(metadata)
+            embeddings_arr = np.asarray(embeddings)
 
             with self.cursor.copy(
                 sql.SQL("COPY public.{table_name} FROM STDIN (FORMAT BINARY)").format(
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
-from contextlib import contextmanager
+from contextlib import AbstractAsyncContextManager, contextmanager
 from enum import Enum
 
+import numpy as np
 from pydantic import BaseModel, SecretStr, validator
 
 from vectordb_bench.backend.filter import Filter, FilterOp
@@ -135,6 +136,16 @@ class VectorDB(ABC):
 
     "The filtering types supported by the VectorDB Client, default only non-filter"
     supported_filter_types: list[FilterOp] = [FilterOp.NonFilter]
+    "Whether search_embedding accepts a float32 np.ndarray query, otherwise the query is passed as list[float]"
+    ndarray_query_supported: bool = False
+    "Whether async_init and async_search_embedding are implemented, required by the asyncio search runner"
+    async_search_supported: bool = False
+    "Whether search_embeddings sends all the queries in one request, otherwise it loops over search_embedding"
+    batch_search_supported: bool = False
+    "Whether insert_embeddings accepts np.ndarray embeddings and ids, otherwise they are passed as lists"
+    ndarray_insert_supported: bool = False
+    "Whether delete_embeddings and upsert_embeddings are implemented, required by the streaming churn case"
+    delete_supported: bool = False
     name: str = ""
 
     @classmethod
@@ -206,8 +217,10 @@ class VectorDB(ABC):
         each insert_embeddings is 5000.
 
         Args:
-            embeddings(list[list[float]]): list of embedding to add to the vector database.
-            metadatas(list[int]): metadata associated with the embeddings, for filtering.
+            embeddings(list[list[float]]): list of embedding to add to the vector database,
+                a C-contiguous float32 np.ndarray of shape (n, dim) if ndarray_insert_supported is True.
+            metadatas(list[int]): metadata associated with the embeddings, for filtering,
+                an int64 np.ndarray if ndarray_insert_supported is True.
             **kwargs(Any): vector database specific parameters.
 
         Returns:
@@ -224,7 +237,8 @@ class VectorDB(ABC):
         """Get k most similar embeddings to query vector.
 
         Args:
-            query(list[float]): query embedding to look up documents similar to.
+            query(list[float]): query embedding to look up documents similar to,
+                a float32 np.ndarray row if ndarray_query_supported is True.
             k(int): Number of most similar embeddings to return. Defaults to 100.
             filters(dict, optional): filtering expression to filter the data while searching.
 
@@ -233,6 +247,80 @@ class VectorDB(ABC):
         """
         raise NotImplementedError
 
+    def search_embeddings(
+        self,
+        queries: np.ndarray,
+        k: int = 100,
+    ) -> list[list[int]]:
+        """Get k most similar embeddings to each of the queries. Clients with batch_search_supported send all
+        the queries in one request, the default loops over search_embedding so every DB can run batch search.
+
+        Args:
+            queries(np.ndarray): float32 matrix, one query per row.
+            k(int): Number of most similar embeddings to return for each query. Defaults to 100.
+
+        Returns:
+            list[list[int]]: k most similar embeddings IDs of each query, in the order of queries.
+        """
+        if self.ndarray_query_supported:
+            return [self.search_embedding(query, k) for query in queries]
+        return [self.search_embedding(query, k) for query in queries.tolist()]
+
+    def async_init(self, concurrency: int = 1) -> AbstractAsyncContextManager[None]:
+        """create and destory the async client in the running event loop, the client is shared by
+        all the coroutines of a process. Only needed if async_search_supported is True.
+
+        Args:
+            concurrency(int): the largest number of coroutines searching at the same time on the client
+
+        Examples:
+            >>> async with self.async_init():
+            >>>     await self.async_search_embedding()
+        """
+        raise NotImplementedError
+
+    async def async_search_embedding(
+        self,
+        query: list[float],
+        k: int = 100,
+    ) -> list[int]:
+        """Async version of search_embedding, called concurrently by many coroutines inside async_init().
+        Only needed if async_search_supported is True.
+        """
+        raise NotImplementedError
+
+    def delete_embeddings(self, ids: list[int]) -> tuple[int, Exception | None]:
+        """Delete the embeddings of ids, called inside init(). Only needed if delete_supported is True.
+
+        Args:
+            ids(list[int]): ids of embeddings inserted before, as metadata of insert_embeddings.
+
+        Returns:
+            int: deleted data count
+        """
+        raise NotImplementedError
+
+    def upsert_embeddings(
+        self,
+        embeddings: list[list[float]],
+        metadata: list[int],
+        **kwargs,
+    ) -> tuple[int, Exception | None]:
+        """Insert the embeddings, replacing the embeddings with the same ids, called inside init(). Only needed if
+        delete_supported is True. The arguments are the same as insert_embeddings.
+
+        Returns:
+            int: upserted data count
+        """
+        raise NotImplementedError
+
+    def count_embeddings(self) -> int | None:
+        """Number of embeddings in the collection, called inside init(). Checked against the load checkpoint
+        before resuming a load with --resume-load, None if the client cannot count them, then the checkpoint is
+        trusted.
+        """
+        return None
+
     @abstractmethod
     def optimize(self, data_size: int | None = None):
         """optimize will be called between insertion and search in performance cases.
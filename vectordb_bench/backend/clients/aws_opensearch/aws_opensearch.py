@@ -1,9 +1,10 @@
 import logging
 import time
 from collections.abc import Iterable
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
-from opensearchpy import OpenSearch
+import numpy as np
+from opensearchpy import AsyncOpenSearch, OpenSearch
 
 from vectordb_bench.backend.filter import Filter, FilterOp
 
@@ -23,6 +24,9 @@ class AWSOpenSearch(VectorDB):
         FilterOp.NumGE,
         FilterOp.StrEqual,
     ]
+    async_search_supported: bool = True
+    batch_search_supported: bool = True
+    delete_supported: bool = True
 
     def __init__(
         self,
@@ -180,6 +184,16 @@ class AWSOpenSearch(VectorDB):
         self.client = None
         del self.client
 
+    @asynccontextmanager
+    async def async_init(self, concurrency: int = 1):
+        """connect to opensearch with the aiohttp based client"""
+        self.async_client = AsyncOpenSearch(**self.db_config)
+        try:
+            yield
+        finally:
+            await self.async_client.close()
+            self.async_client = None
+
     def insert_embeddings(
         self,
         embeddings: Iterable[list[float]],
@@ -199,6 +213,28 @@ class AWSOpenSearch(VectorDB):
         log.info(f"Using {num_clients} parallel clients for data insertion")
         return self._insert_with_multiple_clients(embeddings, metadata, num_clients, labels_data)
 
+    def upsert_embeddings(
+        self,
+        embeddings: Iterable[list[float]],
+        metadata: list[int],
+        labels_data: list[str] | None = None,
+        **kwargs,
+    ) -> tuple[int, Exception]:
+        """The index action of bulk replaces the document with the same id"""
+        assert self.client is not None, "should self.init() first"
+        return self._insert_with_single_client(embeddings, metadata, labels_data)
+
+    def delete_embeddings(self, ids: list[int]) -> tuple[int, Exception]:
+        """Delete the documents of ids, without routing: not for indexes created with use_routing"""
+        assert self.client is not None, "should self.init() first"
+        delete_data = [{"delete": {"_index": self.index_name, self.id_col_name: int(i)}} for i in ids]
+        try:
+            resp = self.client.bulk(body=delete_data)
+        except Exception as e:
+            log.warning(f"Failed to delete data: {self.index_name} error: {e!s}")
+            return 0, e
+        return sum(1 for item in resp["items"] if item["delete"].get("result") == "deleted"), None
+
     def _insert_with_single_client(
         self,
         embeddings: Iterable[list[float]],
@@ -350,6 +386,62 @@ class AWSOpenSearch(VectorDB):
         """
         assert self.client is not None, "should self.init() first"
 
+        try:
+            resp = self.client.search(**self._search_kwargs(query, k))
+            return self._parse_search_resp(resp)
+        except Exception as e:
+            log.warning(f"Failed to search: {self.index_name} error: {e!s}")
+            raise e from None
+
+    def search_embeddings(
+        self,
+        queries: np.ndarray,
+        k: int = 100,
+    ) -> list[list[int]]:
+        """Search all the queries in one _msearch request, should self.init() first."""
+        assert self.client is not None, "should self.init() first"
+
+        body = []
+        for query in queries.tolist():
+            kwargs = self._search_kwargs(query, k)
+            header = {"index": kwargs["index"]}
+            for key in ("preference", "routing"):
+                if kwargs[key] is not None:
+                    header[key] = kwargs[key]
+            body.append(header)
+            body.append(
+                {
+                    **kwargs["body"],
+                    "_source": kwargs["_source"],
+                    "docvalue_fields": kwargs["docvalue_fields"],
+                    "stored_fields": kwargs["stored_fields"],
+                }
+            )
+
+        try:
+            resp = self.client.msearch(body=body)
+            return [self._parse_search_resp(r) for r in resp["responses"]]
+        except Exception as e:
+            log.warning(f"Failed to search: {self.index_name} error: {e!s}")
+            raise e from None
+
+    async def async_search_embedding(
+        self,
+        query: list[float],
+        k: int = 100,
+    ) -> list[int]:
+        """Async version of search_embedding, should self.async_init() first."""
+        assert self.async_client is not None, "should self.async_init() first"
+
+        try:
+            resp = await self.async_client.search(**self._search_kwargs(query, k))
+            return self._parse_search_resp(resp)
+        except Exception as e:
+            log.warning(f"Failed to search: {self.index_name} error: {e!s}")
+            raise e from None
+
+    def _search_kwargs(self, query: list[float], k: int) -> dict:
+        """search request shared by the sync and the async client"""
         # Configure query based on engine type
         if self.case_config.engine == AWSOS_Engine.s3vector:
             # For s3vector engine, use simplified query without method_parameters
@@ -379,28 +471,26 @@ class AWSOpenSearch(VectorDB):
             "query": {"knn": {self.vector_col_name: knn_query}},
         }
 
+        return {
+            "index": self.index_name,
+            "body": body,
+            "size": k,
+            "_source": False,
+            "docvalue_fields": [self.id_col_name],
+            "stored_fields": "_none_",
+            "preference": "_only_local" if self.case_config.number_of_shards == 1 else None,
+            "routing": self.routing_key,
+        }
+
+    def _parse_search_resp(self, resp: dict) -> list[int]:
+        log.debug(f"Search took: {resp['took']}")
+        log.debug(f"Search shards: {resp['_shards']}")
+        log.debug(f"Search hits total: {resp['hits']['total']}")
         try:
-            resp = self.client.search(
-                index=self.index_name,
-                body=body,
-                size=k,
-                _source=False,
-                docvalue_fields=[self.id_col_name],
-                stored_fields="_none_",
-                preference="_only_local" if self.case_config.number_of_shards == 1 else None,
-                routing=self.routing_key,
-            )
-            log.debug(f"Search took: {resp['took']}")
-            log.debug(f"Search shards: {resp['_shards']}")
-            log.debug(f"Search hits total: {resp['hits']['total']}")
-            try:
-                return [int(h["fields"][self.id_col_name][0]) for h in resp["hits"]["hits"]]
-            except Exception:
-                # empty results
-                return []
-        except Exception as e:
-            log.warning(f"Failed to search: {self.index_name} error: {e!s}")
-            raise e from None
+            return [int(h["fields"][self.id_col_name][0]) for h in resp["hits"]["hits"]]
+        except Exception:
+            # empty results
+            return []
 
     def prepare_filter(self, filters: Filter):
         self.routing_key = None
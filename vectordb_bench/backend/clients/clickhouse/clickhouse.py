@@ -5,6 +5,7 @@ from contextlib import contextmanager
 from typing import Any
 
 import clickhouse_connect
+import numpy as np
 from clickhouse_connect.driver import Client
 
 from .. import IndexType
@@ -17,6 +18,8 @@ log = logging.getLogger(__name__)
 class Clickhouse(VectorDB):
     """Use SQLAlchemy instructions"""
 
+    ndarray_insert_supported: bool = True
+
     def __init__(
         self,
         dim: int,
@@ -159,6 +162,9 @@ class Clickhouse(VectorDB):
 
         try:
             # do not iterate for bulk insert
+            if isinstance(metadata, np.ndarray):
+                # the client packs the vectors row by row, the rows stay views of the batch
+                metadata, embeddings = metadata.tolist(), list(embeddings)
             items = [metadata, embeddings]
 
             self.conn.insert(
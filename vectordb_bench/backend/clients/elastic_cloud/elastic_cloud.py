@@ -3,6 +3,7 @@ import time
 from collections.abc import Iterable
 from contextlib import contextmanager
 
+import numpy as np
 from elasticsearch.helpers import bulk
 
 from vectordb_bench.backend.filter import Filter, FilterOp
@@ -25,6 +26,7 @@ class ElasticCloud(VectorDB):
         FilterOp.NumGE,
         FilterOp.StrEqual,
     ]
+    batch_search_supported: bool = True
 
     def __init__(
         self,
@@ -180,6 +182,35 @@ class ElasticCloud(VectorDB):
         """
         assert self.client is not None, "should self.init() first"
 
+        res = self.client.search(
+            index=self.indice,
+            routing=self.routing_key,
+            **self._search_body(query, k),
+            filter_path=[f"hits.hits.fields.{self.id_col_name}"],
+        )
+        return [h["fields"][self.id_col_name][0] for h in res["hits"]["hits"]]
+
+    def search_embeddings(
+        self,
+        queries: np.ndarray,
+        k: int = 100,
+    ) -> list[list[int]]:
+        """Search all the queries in one _msearch request."""
+        assert self.client is not None, "should self.init() first"
+
+        header = {"index": self.indice, **({"routing": self.routing_key} if self.routing_key else {})}
+        searches = []
+        for query in queries.tolist():
+            searches.extend([header, self._search_body(query, k)])
+
+        res = self.client.msearch(
+            searches=searches,
+            filter_path=[f"responses.hits.hits.fields.{self.id_col_name}"],
+        )
+        return [[h["fields"][self.id_col_name][0] for h in r["hits"]["hits"]] for r in res["responses"]]
+
+    def _search_body(self, query: list[float], k: int) -> dict:
+        """knn search request shared by search and msearch"""
         if self.case_config.use_rescore:
             oversample_k = int(k * self.case_config.oversample_ratio)
             oversample_num_candidates = int(self.case_config.num_candidates * self.case_config.oversample_ratio)
@@ -215,20 +246,15 @@ class ElasticCloud(VectorDB):
                 "query_vector": query,
             }
             rescore = None
-        size = k
 
-        res = self.client.search(
-            index=self.indice,
-            knn=knn,
-            routing=self.routing_key,
-            rescore=rescore,
-            size=size,
-            _source=False,
-            docvalue_fields=[self.id_col_name],
-            stored_fields="_none_",
-            filter_path=[f"hits.hits.fields.{self.id_col_name}"],
-        )
-        return [h["fields"][self.id_col_name][0] for h in res["hits"]["hits"]]
+        return {
+            "knn": knn,
+            **({"rescore": rescore} if rescore else {}),
+            "size": k,
+            "_source": False,
+            "docvalue_fields": [self.id_col_name],
+            "stored_fields": "_none_",
+        }
 
     def optimize(self, data_size: int | None = None):
         """optimize will be called between insertion and search in performance cases."""
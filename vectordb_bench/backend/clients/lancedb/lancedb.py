@@ -2,8 +2,10 @@ import logging
 from contextlib import contextmanager
 
 import lancedb
+import numpy as np
 import pyarrow as pa
 from lancedb.pydantic import LanceModel
+from lancedb.query import LanceVectorQueryBuilder
 
 from ..api import IndexType, VectorDB
 from .config import LanceDBConfig, LanceDBIndexConfig
@@ -17,6 +19,10 @@ class VectorModel(LanceModel):
 
 
 class LanceDB(VectorDB):
+    ndarray_query_supported: bool = True
+    batch_search_supported: bool = True
+    ndarray_insert_supported: bool = True
+
     def __init__(
         self,
         dim: int,
@@ -68,7 +74,14 @@ class LanceDB(VectorDB):
         **kwargs,
     ) -> tuple[int, Exception | None]:
         try:
-            data = [{"id": meta, "vector": emb} for meta, emb in zip(metadata, embeddings, strict=False)]
+            # one arrow table over the batch buffers instead of a dict per row
+            vectors = np.ascontiguousarray(embeddings, dtype=np.float32)
+            data = pa.table(
+                {
+                    "id": pa.array(np.asarray(metadata, dtype=np.int64)),
+                    "vector": pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), self.dim),
+                }
+            )
             self.table.add(data)
             return len(metadata), None
         except Exception as e:
@@ -81,25 +94,33 @@ class LanceDB(VectorDB):
         k: int = 100,
         filters: dict | None = None,
     ) -> list[int]:
+        results = self.table.search(query).select(["id"])
         if filters:
-            results = self.table.search(query).select(["id"]).where(f"id >= {filters['id']}", prefilter=True).limit(k)
-            if self.case_config.index == IndexType.IVFPQ and "nprobes" in self.search_config:
-                results = results.nprobes(self.search_config["nprobes"]).to_list()
-            elif self.case_config.index == IndexType.HNSW and "ef" in self.search_config:
-                results = results.ef(self.search_config["ef"]).to_list()
-            else:
-                results = results.to_list()
-        else:
-            results = self.table.search(query).select(["id"]).limit(k)
-            if self.case_config.index == IndexType.IVFPQ and "nprobes" in self.search_config:
-                results = results.nprobes(self.search_config["nprobes"]).to_list()
-            elif self.case_config.index == IndexType.HNSW and "ef" in self.search_config:
-                results = results.ef(self.search_config["ef"]).to_list()
-            else:
-                results = results.to_list()
+            results = results.where(f"id >= {filters['id']}", prefilter=True)
+        results = self._with_search_params(results.limit(k)).to_list()
 
         return [int(result["id"]) for result in results]
 
+    def search_embeddings(
+        self,
+        queries: np.ndarray,
+        k: int = 100,
+    ) -> list[list[int]]:
+        """Search all the queries in one multi-vector query, the results are grouped by query_index."""
+        results = self._with_search_params(self.table.search(list(queries)).select(["id"]).limit(k)).to_arrow()
+
+        ids = [[] for _ in range(len(queries))]
+        for query_index, id_ in zip(results["query_index"].to_pylist(), results["id"].to_pylist(), strict=True):
+            ids[query_index].append(int(id_))
+        return ids
+
+    def _with_search_params(self, query: LanceVectorQueryBuilder) -> LanceVectorQueryBuilder:
+        if self.case_config.index == IndexType.IVFPQ and "nprobes" in self.search_config:
+            return query.nprobes(self.search_config["nprobes"])
+        if self.case_config.index == IndexType.HNSW and "ef" in self.search_config:
+            return query.ef(self.search_config["ef"])
+        return query
+
     def optimize(self, data_size: int | None = None):
         if self.table and hasattr(self, "case_config") and self.case_config.index != IndexType.NONE:
             log.info(f"Creating index for LanceDB table ({self.table_name})")
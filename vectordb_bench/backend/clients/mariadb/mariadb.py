@@ -11,6 +11,8 @@ log = logging.getLogger(__name__)
 
 
 class MariaDB(VectorDB):
+    ndarray_insert_supported: bool = True
+
     def __init__(
         self,
         dim: int,
@@ -171,8 +173,8 @@ class MariaDB(VectorDB):
         assert self.cursor is not None, "Cursor is not initialized"
 
         try:
-            metadata_arr = np.array(metadata)
-            embeddings_arr = np.array(embeddings)
+            metadata_arr = np.asarray(metadata)
+            embeddings_arr = np.asarray(embeddings)
 
             batch_data = []
             for i, row in enumerate(metadata_arr):
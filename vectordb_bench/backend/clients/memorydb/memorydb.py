@@ -20,6 +20,9 @@ INDEX_NAME = "index"  # Vector Index Name
 
 
 class MemoryDB(VectorDB):
+    ndarray_query_supported: bool = True
+    ndarray_insert_supported: bool = True
+
     def __init__(
         self,
         dim: int,
@@ -180,12 +183,13 @@ class MemoryDB(VectorDB):
         try:
             with self.conn.pipeline(transaction=False) as pipe:
                 for i, embedding in enumerate(embeddings):
-                    ndarr_emb = np.array(embedding).astype(np.float32)
+                    ndarr_emb = np.asarray(embedding, dtype=np.float32)
+                    key = int(metadata[i])
                     pipe.hset(
-                        metadata[i],
+                        key,
                         mapping={
-                            "id": str(metadata[i]),
-                            "metadata": metadata[i],
+                            "id": str(key),
+                            "metadata": key,
                             "vector": ndarr_emb.tobytes(),
                         },
                     )
@@ -2,9 +2,10 @@
 
 import logging
 import time
-from collections.abc import Iterable
-from contextlib import contextmanager
+from collections.abc import Callable, Iterable
+from contextlib import asynccontextmanager, contextmanager
 
+import numpy as np
 from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, MilvusException, utility
 
 from vectordb_bench.backend.filter import Filter, FilterOp
@@ -23,6 +24,10 @@ class Milvus(VectorDB):
         FilterOp.NumGE,
         FilterOp.StrEqual,
     ]
+    async_search_supported: bool = True
+    batch_search_supported: bool = True
+    ndarray_insert_supported: bool = True
+    delete_supported: bool = True
 
     def __init__(
         self,
@@ -191,6 +196,11 @@ class Milvus(VectorDB):
         assert self.col, "Please call self.init() before"
         self._optimize()
 
+    def count_embeddings(self) -> int:
+        assert self.col, "Please call self.init() before"
+        res = self.col.query(expr="", output_fields=["count(*)"], consistency_level="Strong")
+        return res[0]["count(*)"]
+
     def need_normalize_cosine(self) -> bool:
         """Wheather this database need to normalize dataset to support COSINE"""
         if self.case_config.is_gpu_index:
@@ -209,7 +219,30 @@ class Milvus(VectorDB):
         """Insert embeddings into Milvus. should call self.init() first"""
         # use the first insert_embeddings to init collection
         assert self.col is not None
+        return self._write_embeddings(self.col.insert, embeddings, metadata, labels_data)
+
+    def upsert_embeddings(
+        self,
+        embeddings: Iterable[list[float]],
+        metadata: list[int],
+        labels_data: list[str] | None = None,
+        **kwargs,
+    ) -> tuple[int, Exception]:
+        """Upsert embeddings into Milvus by primary key. should call self.init() first"""
+        assert self.col is not None
+        return self._write_embeddings(self.col.upsert, embeddings, metadata, labels_data)
+
+    def _write_embeddings(
+        self,
+        write: Callable,
+        embeddings: Iterable[list[float]],
+        metadata: list[int],
+        labels_data: list[str] | None = None,
+    ) -> tuple[int, Exception]:
         assert len(embeddings) == len(metadata)
+        if isinstance(metadata, np.ndarray):
+            # pymilvus takes the ids as python ints and the vectors row by row, the rows stay views of the batch
+            metadata, embeddings = metadata.tolist(), list(embeddings)
         insert_count = 0
         try:
             for batch_start_offset in range(0, len(embeddings), self.batch_size):
@@ -221,13 +254,23 @@ class Milvus(VectorDB):
                 ]
                 if self.with_scalar_labels:
                     insert_data.append(labels_data[batch_start_offset:batch_end_offset])
-                res = self.col.insert(insert_data)
+                res = write(insert_data)
                 insert_count += len(res.primary_keys)
         except MilvusException as e:
             log.info(f"Failed to insert data: {e}")
             return insert_count, e
         return insert_count, None
 
+    def delete_embeddings(self, ids: list[int]) -> tuple[int, Exception]:
+        """Delete embeddings from Milvus by primary key. should call self.init() first"""
+        assert self.col is not None
+        try:
+            res = self.col.delete(expr=f"{self._primary_field} in {[int(i) for i in ids]}")
+        except MilvusException as e:
+            log.info(f"Failed to delete data: {e}")
+            return 0, e
+        return res.delete_count, None
+
     def prepare_filter(self, filters: Filter):
         if filters.type == FilterOp.NonFilter:
             self.expr = ""
@@ -259,3 +302,61 @@ class Milvus(VectorDB):
 
         # Organize results.
         return [result.id for result in res[0]]
+
+    def search_embeddings(
+        self,
+        queries: np.ndarray,
+        k: int = 100,
+    ) -> list[list[int]]:
+        """Search all the queries in one request."""
+        assert self.col is not None
+
+        res = self.col.search(
+            data=queries.tolist(),
+            anns_field=self._vector_field,
+            param=self.case_config.search_param(),
+            limit=k,
+            expr=self.expr,
+        )
+
+        return [[result.id for result in hits] for hits in res]
+
+    @asynccontextmanager
+    async def async_init(self, concurrency: int = 1):
+        """
+        Examples:
+            >>> async with self.async_init():
+            >>>     await self.async_search_embedding()
+        """
+        from pymilvus import AsyncMilvusClient
+
+        self.async_client = AsyncMilvusClient(
+            uri=self.db_config.get("uri"),
+            user=self.db_config.get("user") or "",
+            password=self.db_config.get("password") or "",
+            timeout=60,
+        )
+        try:
+            yield
+        finally:
+            await self.async_client.close()
+            self.async_client = None
+
+    async def async_search_embedding(
+        self,
+        query: list[float],
+        k: int = 100,
+    ) -> list[int]:
+        """Perform a search on a query embedding with the async client."""
+        assert self.async_client is not None
+
+        res = await self.async_client.search(
+            collection_name=self.collection_name,
+            data=[query],
+            anns_field=self._vector_field,
+            search_params=self.case_config.search_param(),
+            limit=k,
+            filter=self.expr,
+        )
+
+        return [result["id"] for result in res[0]]
@@ -1,14 +1,15 @@
 """Wrapper around the Pgvector vector database over VectorDB"""
 
 import logging
-from collections.abc import Generator, Sequence
-from contextlib import contextmanager
+from collections.abc import AsyncGenerator, Generator, Sequence
+from contextlib import asynccontextmanager, contextmanager
 from typing import Any
 
 import numpy as np
 import psycopg
-from pgvector.psycopg import register_vector
+from pgvector.psycopg import register_vector, register_vector_async
 from psycopg import Connection, Cursor, sql
+from psycopg_pool import AsyncConnectionPool
 
 from vectordb_bench.backend.filter import Filter, FilterOp
 
@@ -21,6 +22,10 @@ log = logging.getLogger(__name__)
 class PgVector(VectorDB):
     """Use psycopg instructions"""
 
+    ndarray_query_supported: bool = True
+    ndarray_insert_supported: bool = True
+    async_search_supported: bool = True
+    delete_supported: bool = True
     supported_filter_types: list[FilterOp] = [
         FilterOp.NonFilter,
         FilterOp.NumGE,
@@ -217,15 +222,9 @@ class PgVector(VectorDB):
 
         self.conn, self.cursor = self._create_connection(**self.connect_config)
 
-        # index configuration may have commands defined that we should set during each client session
-        session_options: Sequence[dict[str, Any]] = self.case_config.session_param()["session_options"]
-
-        if len(session_options) > 0:
-            for setting in session_options:
-                command = sql.SQL("SET {setting_name} " + "= {val};").format(
-                    setting_name=sql.Identifier(setting["parameter"]["setting_name"]),
-                    val=sql.Identifier(str(setting["parameter"]["val"])),
-                )
+        session_commands = self._session_commands()
+        if len(session_commands) > 0:
+            for command in session_commands:
                 log.debug(command.as_string(self.cursor))
                 self.cursor.execute(command)
             self.conn.commit()
@@ -238,6 +237,47 @@ class PgVector(VectorDB):
             self.cursor = None
             self.conn = None
 
+    def _session_commands(self) -> list[sql.Composed]:
+        # index configuration may have commands defined that we should set during each client session
+        session_options: Sequence[dict[str, Any]] = self.case_config.session_param()["session_options"]
+        return [
+            sql.SQL("SET {setting_name} " + "= {val};").format(
+                setting_name=sql.Identifier(setting["parameter"]["setting_name"]),
+                val=sql.Identifier(str(setting["parameter"]["val"])),
+            )
+            for setting in session_options
+        ]
+
+    @asynccontextmanager
+    async def async_init(self, concurrency: int = 1) -> AsyncGenerator[None, None]:
+        """
+        An AsyncConnection runs one query at a time, so every coroutine needs its own connection. The pool opens
+        `concurrency` connections before yielding, so no connection is opened during the search, and it closes
+        and replaces the broken connections given back to it.
+
+        Examples:
+            >>> async with self.async_init(concurrency=10):
+            >>>     await self.async_search_embedding()
+        """
+        self._async_pool = AsyncConnectionPool(
+            kwargs={**self.connect_config, "autocommit": True},
+            min_size=concurrency,
+            max_size=concurrency,
+            configure=self._configure_async_connection,
+            open=False,
+        )
+        await self._async_pool.open(wait=True)
+        try:
+            yield
+        finally:
+            await self._async_pool.close()
+            self._async_pool = None
+
+    async def _configure_async_connection(self, conn: psycopg.AsyncConnection):
+        await register_vector_async(conn)
+        for command in self._session_commands():
+            await conn.execute(command)
+
     def _drop_table(self):
         assert self.conn is not None, "Connection is not initialized"
         assert self.cursor is not None, "Cursor is not initialized"
@@ -253,6 +293,15 @@ class PgVector(VectorDB):
     def optimize(self, data_size: int | None = None):
         self._post_insert()
 
+    def count_embeddings(self) -> int:
+        assert self.cursor is not None, "Cursor is not initialized"
+        self.cursor.execute(
+            sql.SQL("SELECT count(*) FROM public.{table_name}").format(
+                table_name=sql.Identifier(self.table_name),
+            ),
+        )
+        return self.cursor.fetchone()[0]
+
     def _post_insert(self):
         log.info(f"{self.name} post insert before optimize")
         if self.case_config.create_index_after_load:
@@ -448,8 +497,8 @@ class PgVector(VectorDB):
         index_param = self.case_config.index_param()
 
         try:
-            metadata_arr = np.array(metadata)
-            embeddings_arr = np.array(embeddings)
+            metadata_arr = np.asarray(metadata)
+            embeddings_arr = np.asarray(embeddings)
 
             if index_param["table_quantization_type"] == "bit":
                 with self.cursor.copy(
@@ -498,6 +547,50 @@ class PgVector(VectorDB):
             log.warning(f"Failed to insert data into pgvector table ({self.table_name}), error: {e}")
             return 0, e
 
+    def delete_embeddings(self, ids: list[int]) -> tuple[int, Exception | None]:
+        assert self.conn is not None, "Connection is not initialized"
+        assert self.cursor is not None, "Cursor is not initialized"
+
+        try:
+            self._delete_rows(ids)
+            self.conn.commit()
+        except Exception as e:
+            log.warning(f"Failed to delete data from pgvector table ({self.table_name}), error: {e}")
+            self.conn.rollback()
+            return 0, e
+        return self.cursor.rowcount, None
+
+    def upsert_embeddings(
+        self,
+        embeddings: list[list[float]],
+        metadata: list[int],
+        labels_data: list[str] | None = None,
+        **kwargs: Any,
+    ) -> tuple[int, Exception | None]:
+        """COPY cannot update rows: the old rows are deleted and the new ones copied in the same transaction"""
+        assert self.conn is not None, "Connection is not initialized"
+        assert self.cursor is not None, "Cursor is not initialized"
+
+        try:
+            self._delete_rows(metadata)
+        except Exception as e:
+            log.warning(f"Failed to upsert data into pgvector table ({self.table_name}), error: {e}")
+            self.conn.rollback()
+            return 0, e
+        count, error = self.insert_embeddings(embeddings, metadata, labels_data, **kwargs)
+        if error is not None:
+            self.conn.rollback()
+        return count, error
+
+    def _delete_rows(self, ids: list[int]):
+        self.cursor.execute(
+            sql.SQL("DELETE FROM public.{table_name} WHERE {primary_field} = ANY(%s)").format(
+                table_name=sql.Identifier(self.table_name),
+                primary_field=sql.Identifier(self._primary_field),
+            ),
+            ([int(i) for i in ids],),
+        )
+
     def prepare_filter(self, filters: Filter):
         if filters.type == FilterOp.NonFilter:
             self.where_clause = ""
@@ -521,13 +614,32 @@ class PgVector(VectorDB):
         assert self.conn is not None, "Connection is not initialized"
         assert self.cursor is not None, "Cursor is not initialized"
 
-        index_param = self.case_config.index_param()
-        search_param = self.case_config.search_param()
-        q = np.asarray(query)
         result = self.cursor.execute(
             self._search,
-            (q, q, k) if index_param["quantization_type"] == "bit" and search_param["reranking"] else (q, k),
+            self._search_params(query, k),
             prepare=True,
             binary=True,
         )
         return [int(i[0]) for i in result.fetchall()]
+
+    async def async_search_embedding(
+        self,
+        query: list[float],
+        k: int = 100,
+    ) -> list[int]:
+        assert self._async_pool is not None, "Please call self.async_init() before"
+
+        async with self._async_pool.connection() as conn:
+            result = await conn.execute(
+                self._search,
+                self._search_params(query, k),
+                prepare=True,
+                binary=True,
+            )
+            return [int(i[0]) for i in await result.fetchall()]
+
+    def _search_params(self, query: list[float], k: int) -> tuple:
+        index_param = self.case_config.index_param()
+        search_param = self.case_config.search_param()
+        q = np.asarray(query)
+        return (q, q, k) if index_param["quantization_type"] == "bit" and search_param["reranking"] else (q, k)
@@ -2,9 +2,10 @@
 
 import logging
 import time
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
-from qdrant_client import QdrantClient
+import numpy as np
+from qdrant_client import AsyncQdrantClient, QdrantClient
 from qdrant_client.http.models import (
     Batch,
     CollectionStatus,
@@ -13,10 +14,12 @@ from qdrant_client.http.models import (
     KeywordIndexParams,
     OptimizersConfigDiff,
     PayloadSchemaType,
+    PointIdsList,
     Range,
     ScalarQuantization,
     ScalarQuantizationConfig,
     ScalarType,
+    SearchRequest,
     VectorParams,
 )
 from qdrant_client.http.models import (
@@ -41,6 +44,9 @@ class QdrantCloud(VectorDB):
         FilterOp.NumGE,
         FilterOp.StrEqual,
     ]
+    async_search_supported: bool = True
+    batch_search_supported: bool = True
+    delete_supported: bool = True
 
     def __init__(
         self,
@@ -82,6 +88,20 @@ class QdrantCloud(VectorDB):
         self.qdrant_client = None
         del self.qdrant_client
 
+    @asynccontextmanager
+    async def async_init(self, concurrency: int = 1):
+        """
+        Examples:
+            >>> async with self.async_init():
+            >>>     await self.async_search_embedding()
+        """
+        self.async_qdrant_client = AsyncQdrantClient(**self.db_config)
+        try:
+            yield
+        finally:
+            await self.async_qdrant_client.close()
+            self.async_qdrant_client = None
+
     def optimize(self, data_size: int | None = None):
         assert self.qdrant_client, "Please call self.init() before"
         # wait for vectors to be fully indexed
@@ -186,6 +206,31 @@ class QdrantCloud(VectorDB):
         else:
             return len(metadata), None
 
+    def upsert_embeddings(
+        self,
+        embeddings: list[list[float]],
+        metadata: list[int],
+        labels_data: list[str] | None = None,
+        **kwargs,
+    ) -> tuple[int, Exception]:
+        """Points are always upserted by id"""
+        return self.insert_embeddings(embeddings, metadata, labels_data, **kwargs)
+
+    def delete_embeddings(self, ids: list[int]) -> tuple[int, Exception]:
+        assert self.qdrant_client is not None
+        try:
+            for offset in range(0, len(ids), QDRANT_BATCH_SIZE):
+                _ = self.qdrant_client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=PointIdsList(points=[int(i) for i in ids[offset : offset + QDRANT_BATCH_SIZE]]),
+                    wait=True,
+                )
+        except Exception as e:
+            log.info(f"Failed to delete data, {e}")
+            return 0, e
+        else:
+            return len(ids), None
+
     def search_embedding(
         self,
         query: list[float],
@@ -209,6 +254,51 @@ class QdrantCloud(VectorDB):
 
         return [r.id for r in res]
 
+    def search_embeddings(
+        self,
+        queries: np.ndarray,
+        k: int = 100,
+    ) -> list[list[int]]:
+        """Search all the queries in one batch request. Should call self.init() first."""
+        assert self.qdrant_client is not None
+
+        res = self.qdrant_client.search_batch(
+            collection_name=self.collection_name,
+            requests=[
+                SearchRequest(
+                    vector=query,
+                    limit=k,
+                    filter=self.query_filter,
+                    params=self.db_case_config.search_param(),
+                    with_payload=self.db_case_config.with_payload,
+                )
+                for query in queries.tolist()
+            ],
+        )
+
+        return [[r.id for r in points] for points in res]
+
+    async def async_search_embedding(
+        self,
+        query: list[float],
+        k: int = 100,
+    ) -> list[int]:
+        """Perform a search on a query embedding with the async client.
+        Should call self.async_init() first.
+        """
+        assert self.async_qdrant_client is not None
+
+        res = await self.async_qdrant_client.search(
+            collection_name=self.collection_name,
+            query_vector=query,
+            limit=k,
+            query_filter=self.query_filter,
+            search_params=self.db_case_config.search_param(),
+            with_payload=self.db_case_config.with_payload,
+        )
+
+        return [r.id for r in res]
+
     def prepare_filter(self, filters: Filter):
         if filters.type == FilterOp.NonFilter:
             self.query_filter = None
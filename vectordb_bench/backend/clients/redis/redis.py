@@ -15,6 +15,10 @@ INDEX_NAME = "index"  # Vector Index Name
 
 
 class Redis(VectorDB):
+    ndarray_query_supported: bool = True
+    ndarray_insert_supported: bool = True
+    delete_supported: bool = True
+
     def __init__(
         self,
         dim: int,
@@ -112,12 +116,13 @@ class Redis(VectorDB):
         try:
             with self.conn.pipeline(transaction=False) as pipe:
                 for i, embedding in enumerate(embeddings):
-                    ndarr_emb = np.array(embedding).astype(np.float32)
+                    ndarr_emb = np.asarray(embedding, dtype=np.float32)
+                    key = int(metadata[i])
                     pipe.hset(
-                        metadata[i],
+                        key,
                         mapping={
-                            "id": str(metadata[i]),
-                            "metadata": metadata[i],
+                            "id": str(key),
+                            "metadata": key,
                             "vector": ndarr_emb.tobytes(),
                         },
                     )
@@ -132,6 +137,23 @@ class Redis(VectorDB):
 
         return result_len, None
 
+    def upsert_embeddings(
+        self,
+        embeddings: list[list[float]],
+        metadata: list[int],
+        **kwargs: Any,
+    ) -> tuple[int, Exception]:
+        """HSET overwrites the hash of the same key"""
+        return self.insert_embeddings(embeddings, metadata, **kwargs)
+
+    def delete_embeddings(self, ids: list[int]) -> tuple[int, Exception]:
+        assert self.conn is not None
+        try:
+            result_len = self.conn.delete(*[int(i) for i in ids])
+        except Exception as e:
+            return 0, e
+        return result_len, None
+
     def search_embedding(
         self,
         query: list[float],
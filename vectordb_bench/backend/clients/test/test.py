@@ -1,6 +1,7 @@
+import asyncio
 import logging
-from collections.abc import Generator
-from contextlib import contextmanager
+from collections.abc import AsyncGenerator, Generator
+from contextlib import asynccontextmanager, contextmanager
 from typing import Any
 
 from ..api import DBCaseConfig, VectorDB
@@ -9,6 +10,11 @@ log = logging.getLogger(__name__)
 
 
 class Test(VectorDB):
+    ndarray_query_supported: bool = True
+    ndarray_insert_supported: bool = True
+    async_search_supported: bool = True
+    delete_supported: bool = True
+
     def __init__(
         self,
         dim: int,
@@ -33,6 +39,10 @@ class Test(VectorDB):
 
         yield
 
+    @asynccontextmanager
+    async def async_init(self, concurrency: int = 1) -> AsyncGenerator[None, None]:
+        yield
+
     def optimize(self, data_size: int | None = None):
         pass
 
@@ -47,6 +57,17 @@ class Test(VectorDB):
         """
         return len(metadata), None
 
+    def upsert_embeddings(
+        self,
+        embeddings: list[list[float]],
+        metadata: list[int],
+        **kwargs: Any,
+    ) -> tuple[int, Exception | None]:
+        return len(metadata), None
+
+    def delete_embeddings(self, ids: list[int]) -> tuple[int, Exception | None]:
+        return len(ids), None
+
     def search_embedding(
         self,
         query: list[float],
@@ -56,3 +77,12 @@ class Test(VectorDB):
         **kwargs: Any,
     ) -> list[int]:
         return list(range(k))
+
+    async def async_search_embedding(
+        self,
+        query: list[float],
+        k: int = 100,
+    ) -> list[int]:
+        # hand over to the other coroutines like a real network call
+        await asyncio.sleep(0)
+        return list(range(k))
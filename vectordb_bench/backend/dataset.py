@@ -4,9 +4,11 @@ Usage:
     >>> Dataset.Cohere.get(100_000)
 """
 
+import itertools
 import logging
 import pathlib
 import typing
+from collections.abc import Iterator
 from enum import Enum
 
 import pandas as pd
@@ -399,11 +401,28 @@ class DatasetManager(BaseModel):
 
 
 class DataSetIterator:
-    def __init__(self, dataset: DatasetManager):
+    """Record batches of the train files, converted to DataFrames.
+
+    With `workers` > 1, only the row groups of partition `worker` are read: the row groups of all the train files
+    are dealt out to the workers in turn, so the workers read disjoint parts of the dataset.
+    The batches have `batch_size` rows, config.NUM_PER_BATCH by default, fewer at the end of a file.
+    The first `skip_rows` rows of the partition are skipped, whole row groups without reading them.
+    """
+
+    def __init__(
+        self,
+        dataset: DatasetManager,
+        worker: int = 0,
+        workers: int = 1,
+        batch_size: int | None = None,
+        skip_rows: int = 0,
+    ):
         self._ds = dataset
+        self._batch_size = batch_size or config.NUM_PER_BATCH
         self._idx = 0  # file number
         self._cur = None
         self._sub_idx = [0 for i in range(len(self._ds.train_files))]  # iter num for each file
+        self._partition = self._iter_partition(worker, workers, skip_rows) if workers > 1 or skip_rows > 0 else None
 
     def __iter__(self):
         return self
@@ -415,10 +434,39 @@ class DataSetIterator:
             msg = f"No such file: {p}"
             log.warning(msg)
             raise IndexError(msg)
-        return ParquetFile(p, memory_map=True, pre_buffer=True).iter_batches(config.NUM_PER_BATCH)
+        return ParquetFile(p, memory_map=True, pre_buffer=True).iter_batches(self._batch_size)
+
+    def _iter_partition(self, worker: int, workers: int, skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+        row_groups = []
+        for file_name in self._ds.train_files:
+            p = pathlib.Path(self._ds.data_dir, file_name)
+            if not p.exists():
+                msg = f"No such file: {p}"
+                log.warning(msg)
+                raise IndexError(msg)
+            row_groups.extend((p, i) for i in range(ParquetFile(p).num_row_groups))
+
+        for p, group in itertools.groupby(row_groups[worker::workers], key=lambda x: x[0]):
+            file = ParquetFile(p, memory_map=True, pre_buffer=True)
+            groups = [i for _, i in group]
+            while groups and skip_rows >= file.metadata.row_group(groups[0]).num_rows:
+                skip_rows -= file.metadata.row_group(groups.pop(0)).num_rows
+            if not groups:
+                continue
+
+            log.info(f"Get iterator for {p.name}, row groups {groups}")
+            for batch in file.iter_batches(self._batch_size, groups):
+                if skip_rows >= batch.num_rows:
+                    skip_rows -= batch.num_rows
+                    continue
+                yield batch.slice(skip_rows).to_pandas()
+                skip_rows = 0
 
     def __next__(self) -> pd.DataFrame:
         """return the data in the next file of the training list"""
+        if self._partition is not None:
+            return next(self._partition)
+
         if self._idx < len(self._ds.train_files):
             if self._cur is None:
                 file_name = self._ds.train_files[self._idx]
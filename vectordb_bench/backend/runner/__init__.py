@@ -1,10 +1,16 @@
+from .async_runner import AsyncSearchRunner
+from .churn_runner import ChurnRunner
 from .mp_runner import MultiProcessingSearchRunner
 from .read_write_runner import ReadWriteRunner
 from .serial_runner import SerialInsertRunner, SerialSearchRunner
+from .workload_runner import WorkloadRunner
 
 __all__ = [
+    "AsyncSearchRunner",
+    "ChurnRunner",
     "MultiProcessingSearchRunner",
     "ReadWriteRunner",
     "SerialInsertRunner",
     "SerialSearchRunner",
+    "WorkloadRunner",
 ]
@@ -0,0 +1,170 @@
+import asyncio
+import logging
+import math
+import multiprocessing as mp
+import random
+import time
+from collections.abc import Generator
+from contextlib import contextmanager
+
+import numpy as np
+
+from ..clients import api
+from .histogram import LatencyHistogram, LatencyTimeline
+from .mp_runner import MultiProcessingSearchRunner
+from .shared_query import SharedQueryMatrix
+from .worker_pool import SearchWorkerPool
+
+log = logging.getLogger(__name__)
+
+
+class AsyncSearchRunner(MultiProcessingSearchRunner):
+    """asyncio search runner for clients with async_search_supported
+
+    Each concurrency is the total number of in-flight queries. It is split across at most `processes` search
+    processes, and every process drives its share of coroutines over one async client from `db.async_init()`,
+    so the concurrency is no longer capped by the number of processes. The event loop and the async client of a
+    process are kept for all the concurrency levels, until the pool shuts down.
+
+    Args:
+        processes(int): the largest number of search processes
+        other args are the same as MultiProcessingSearchRunner, search is always closed-loop
+    """
+
+    def __init__(
+        self,
+        db: api.VectorDB,
+        test_data: list[list[float]] | np.ndarray | SharedQueryMatrix,
+        processes: int,
+        **kwargs,
+    ):
+        super().__init__(db, test_data, **kwargs)
+        self.processes = processes
+        # event loop of the pool process, created by init_worker
+        self._loop: asyncio.Runner | None = None
+        if self.target_qps:
+            log.warning(f"AsyncSearchRunner runs closed-loop search, target_qps={self.target_qps} is ignored")
+            self.target_qps = None
+        if self.batch_size > 1:
+            log.warning(f"AsyncSearchRunner searches one query per request, batch_size={self.batch_size} is ignored")
+            self.batch_size = 1
+
+    def _pool_size(self, conc: int) -> int:
+        return min(conc, self.processes)
+
+    def _coroutines_per_process(self) -> int:
+        """most coroutines of a process in any level, see _run_search"""
+        conc = self._max_concurrency()
+        return math.ceil(conc / self._pool_size(conc))
+
+    @contextmanager
+    def init_worker(self) -> Generator[None, None, None]:
+        """Start the event loop of the process and enter db.async_init() on it, the coroutines of every level
+        share this client, no sync connection is needed"""
+        self.db.prepare_filter(self.filters)
+        with asyncio.Runner() as loop:
+            client = self.db.async_init(concurrency=self._coroutines_per_process())
+            loop.run(client.__aenter__())
+            self._loop = loop
+            try:
+                yield
+            finally:
+                self._loop = None
+                loop.run(client.__aexit__(None, None, None))
+
+    def _split_coroutines(self, conc: int) -> list[int]:
+        """Split `conc` coroutines as evenly as possible across the processes"""
+        procs = min(conc, self.processes)
+        return [conc // procs + (1 if i < conc % procs else 0) for i in range(procs)]
+
+    def _prepare_level(self, pool: SearchWorkerPool, conc: int):
+        """Warm up the coroutines of the level in every process, the processes then meet at the barrier of
+        the search task and all start timing together"""
+        if self._warmup_enabled():
+            pool.run_each("warmup_async", [(c,) for c in self._split_coroutines(conc)])
+
+    def _run_search(
+        self,
+        pool: SearchWorkerPool,
+        conc: int,
+        rate: float | None,
+    ) -> list[tuple[int, float, LatencyHistogram, LatencyTimeline]]:
+        """Run the coroutines of `conc` in the processes, always closed-loop"""
+        coroutines = self._split_coroutines(conc)
+        log.info(f"Search by {len(coroutines)} processes with coroutines {coroutines}")
+        return pool.run_each("search_async", [(c,) for c in coroutines])
+
+    def warmup_async(self, coroutines: int):
+        """Run the warm-up of `coroutines` coroutines on the event loop of init_worker(), see pop_warmup_latencies"""
+        self._loop.run(self._warmup_async(coroutines))
+
+    async def _warmup_async(self, coroutines: int):
+        warmups = await asyncio.gather(*[self._warmup_coroutine() for _ in range(coroutines)])
+        self._warmup_latencies.merge(LatencyHistogram.merge_all(warmups))
+
+    def search_async(self, coroutines: int) -> tuple[int, float, LatencyHistogram, LatencyTimeline]:
+        """Run `coroutines` search coroutines on the event loop of init_worker()
+
+        Returns:
+            int: successful requests count
+            float: actual duration
+            LatencyHistogram: latencies of all the coroutines in this process
+            LatencyTimeline: qps and latencies per time window
+        """
+        return self._loop.run(self._search_async(coroutines))
+
+    async def _search_async(self, coroutines: int) -> tuple[int, float, LatencyHistogram, LatencyTimeline]:
+        start_time = time.perf_counter()
+        latencies = LatencyHistogram()
+        timeline = LatencyTimeline(start_time, self.duration)
+        counts = await asyncio.gather(
+            *[self._search_coroutine(start_time, latencies, timeline) for _ in range(coroutines)]
+        )
+
+        count = sum(counts)
+        total_dur = round(time.perf_counter() - start_time, 4)
+        log.info(
+            f"{mp.current_process().name:16} search {self.duration}s by {coroutines} coroutines: "
+            f"actual_dur={total_dur}s, count={count}, qps in this process: {round(count / total_dur, 4):3}"
+        )
+        return count, total_dur, latencies, timeline
+
+    async def _warmup_coroutine(self) -> LatencyHistogram:
+        """Async version of warmup, run by every coroutine before the measured search"""
+        test_data = self.test_data
+        num, idx = len(test_data), random.randint(0, len(test_data) - 1)
+
+        latencies = LatencyHistogram()
+        end_time = time.perf_counter() + self.warmup_duration
+        sent = 0
+        while sent < self.warmup_queries or time.perf_counter() < end_time:
+            s = time.perf_counter()
+            try:
+                await self.db.async_search_embedding(self._get_query(test_data, idx), self.k)
+                latencies.record(time.perf_counter() - s)
+            except Exception as e:
+                log.warning(f"VectorDB async_search_embedding error in warm-up: {e}")
+            sent += 1
+            idx = idx + 1 if idx < num - 1 else 0
+        return latencies
+
+    async def _search_coroutine(self, start_time: float, latencies: LatencyHistogram, timeline: LatencyTimeline) -> int:
+        test_data = self.test_data
+        num, idx = len(test_data), random.randint(0, len(test_data) - 1)
+
+        count = 0
+        while time.perf_counter() < start_time + self.duration:
+            query = self._get_query(test_data, idx)
+            s = time.perf_counter()
+            try:
+                await self.db.async_search_embedding(query, self.k)
+                end = time.perf_counter()
+                count += 1
+                latencies.record(end - s)
+                timeline.record(end, end - s)
+            except Exception as e:
+                log.warning(f"VectorDB async_search_embedding error: {e}")
+
+            # loop through the test data
+            idx = idx + 1 if idx < num - 1 else 0
+        return count
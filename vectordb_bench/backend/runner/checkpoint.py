@@ -0,0 +1,80 @@
+import hashlib
+import json
+import logging
+import pathlib
+import shutil
+
+from ... import config
+
+log = logging.getLogger(__name__)
+
+
+class LoadCheckpoint:
+    """Progress of the load of a performance case, to continue it after a crash with --resume-load.
+
+    The files are in config.LOAD_CHECKPOINT_DIR/<key>, key being a hash of everything that decides which rows go
+    where. load.json holds the settings fixed at the start of the load, e.g. the batch size. worker_<i>.json holds
+    the progress of load process i: the rows of its part of the train data acknowledged by the db, in order,
+    the rows inserted, and its insert seconds so far. Every file has one writer and is replaced atomically.
+
+    Examples:
+        >>> checkpoint = LoadCheckpoint(LoadCheckpoint.make_key(db="Milvus", case="Performance768D10M"))
+        >>> if checkpoint.exists():
+        >>>     checkpoint.read()
+    """
+
+    def __init__(self, key: str, directory: pathlib.Path | None = None):
+        self.key = key
+        self.path = pathlib.Path(directory or config.LOAD_CHECKPOINT_DIR, key)
+        self.state: dict = {}
+        self.workers: dict[int, dict] = {}
+
+    @staticmethod
+    def make_key(**fields) -> str:
+        """Hash of the json of fields, not readable from the key"""
+        return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def exists(self) -> bool:
+        return self.path.joinpath("load.json").exists()
+
+    def read(self) -> "LoadCheckpoint":
+        self.state = json.loads(self.path.joinpath("load.json").read_text())
+        self.workers = {}
+        for p in self.path.glob("worker_*.json"):
+            self.workers[int(p.stem.removeprefix("worker_"))] = json.loads(p.read_text())
+        log.info(f"Read load checkpoint {self.path}: {self.count} rows, {round(self.duration, 4)}s")
+        return self
+
+    def _write(self, name: str, data: dict):
+        tmp = self.path.joinpath(f".{name}.tmp")
+        tmp.write_text(json.dumps(data))
+        tmp.replace(self.path.joinpath(name))
+
+    def start(self, **state):
+        """A new load, with the settings to reuse when resuming it, e.g. batch_size"""
+        self.remove()
+        self.path.mkdir(parents=True)
+        self.state, self.workers = state, {}
+        self._write("load.json", state)
+
+    def worker(self, worker: int) -> dict:
+        """{"rows": ..., "count": ..., "duration": ...} of load process `worker`, zeros if it saved nothing yet"""
+        return self.workers.get(worker, {"rows": 0, "count": 0, "duration": 0.0})
+
+    def save_worker(self, worker: int, rows: int, count: int, duration: float):
+        self.workers[worker] = {"rows": rows, "count": count, "duration": round(duration, 4)}
+        self._write(f"worker_{worker}.json", self.workers[worker])
+
+    @property
+    def count(self) -> int:
+        """rows already in the db: calibration rows and the rows of every load process"""
+        return self.state.get("calibrated", 0) + sum(w["count"] for w in self.workers.values())
+
+    @property
+    def duration(self) -> float:
+        """insert seconds so far, the load processes run in parallel"""
+        workers = max((w["duration"] for w in self.workers.values()), default=0.0)
+        return self.state.get("calibration_duration", 0.0) + workers
+
+    def remove(self):
+        shutil.rmtree(self.path, ignore_errors=True)
@@ -0,0 +1,300 @@
+import logging
+import math
+import threading
+import time
+from copy import deepcopy
+from enum import Enum
+
+import numpy as np
+
+from vectordb_bench import config
+from vectordb_bench.backend.clients import api
+from vectordb_bench.backend.clients.api import MetricType
+from vectordb_bench.backend.dataset import DatasetManager
+from vectordb_bench.metric import Metric
+
+from .ground_truth import ExactTopK
+from .histogram import InsertTimeline, LatencyHistogram
+from .mp_runner import MultiProcessingSearchRunner
+from .rate_runner import TokenBucket
+from .serial_runner import SerialSearchRunner
+from .util import get_data
+
+log = logging.getLogger(__name__)
+
+
+class ChurnOp(Enum):
+    INSERT = "insert"
+    UPDATE = "update"
+    DELETE = "delete"
+
+
+class LiveSet:
+    """Ids in the db and the train row whose embedding each of them holds.
+
+    The train ids are the row keys, 0 <= id < size. An insert adds row r as id r, an update gives a live id the
+    embedding of a row read from the train data instead of inserting it, a delete removes a live id. Each row is
+    held by one id at most, the ground truth of the live ids is computed from the train data.
+    """
+
+    def __init__(self, size: int):
+        # train row held by each id, -1 if the id is not live
+        self.source = np.full(size, -1, dtype=np.int64)
+        # id holding each train row, -1 if none
+        self.owner = np.full(size, -1, dtype=np.int64)
+        # the first `count` are the live ids, in any order, pos is the index of each live id in ids
+        self.ids = np.empty(size, dtype=np.int64)
+        self.pos = np.full(size, -1, dtype=np.int64)
+        self.count = 0
+
+    def insert(self, ids: np.ndarray):
+        for i in ids:
+            self.source[i] = self.owner[i] = i
+            self.ids[self.count], self.pos[i] = i, self.count
+            self.count += 1
+
+    def update(self, ids: np.ndarray, rows: np.ndarray):
+        for i, row in zip(ids, rows, strict=True):
+            self.owner[self.source[i]] = -1
+            self.source[i], self.owner[row] = row, i
+
+    def delete(self, ids: np.ndarray):
+        for i in ids:
+            self.owner[self.source[i]] = self.source[i] = -1
+            # move the last live id into the slot of i
+            last = self.ids[self.count - 1]
+            self.ids[self.pos[i]], self.pos[last] = last, self.pos[i]
+            self.pos[i] = -1
+            self.count -= 1
+
+    def sample(self, n: int, rng: np.random.Generator) -> np.ndarray:
+        """n distinct live ids"""
+        return self.ids[rng.choice(self.count, size=n, replace=False)]
+
+
+def live_ground_truth(
+    dataset: DatasetManager,
+    queries: np.ndarray,
+    live: LiveSet,
+    k: int,
+    metric_type: MetricType,
+) -> list[list[int]]:
+    """Exact k nearest live ids of each query, reading the train data once in batches"""
+    top_k = ExactTopK(queries, k, metric_type)
+    for data in dataset:
+        emb, rows = get_data(data, normalize=metric_type == MetricType.COSINE, ndarray=True)
+        owners = live.owner[rows]
+        mask = owners >= 0
+        top_k.add(emb[mask], owners[mask])
+    return top_k.result()
+
+
+class ChurnRunner:
+    """Streaming churn: the batches of the train data are inserted, or upserted under live ids, and live ids are
+    deleted, at the ratios of the case and `insert_rate` rows/s, by a writer thread paced by a TokenBucket.
+
+    At each search stage, a share of the train data read, the writer is paused: the ground truth of the live ids
+    is computed and the serial search measures recall against it. The writer then goes on while the concurrent
+    search measures qps for read_dur_after_write seconds. The last stage, 100, is after the whole train data.
+    """
+
+    def __init__(
+        self,
+        db: api.VectorDB,
+        dataset: DatasetManager,
+        insert_rate: int = 1000,
+        update_ratio: float = 0.1,
+        delete_ratio: float = 0.1,
+        normalize: bool = False,
+        k: int = 100,
+        concurrencies: tuple[int, ...] = (1, 15, 50),
+        search_stages: tuple[float, ...] = (0.5, 0.6, 0.7, 0.8, 0.9),
+        read_dur_after_write: int = 300,
+        seed: int = 42,
+    ):
+        for stage in search_stages:
+            assert 0.0 <= stage < 1.0, "each search stage should be in [0.0, 1.0)"
+        self.db = db
+        self.dataset = dataset
+        self.data_volume = dataset.data.size
+        self.insert_rate = insert_rate
+        self.op_ratios = {
+            ChurnOp.INSERT: 1 - update_ratio - delete_ratio,
+            ChurnOp.UPDATE: update_ratio,
+            ChurnOp.DELETE: delete_ratio,
+        }
+        self.normalize = normalize
+        self.k = k
+        self.search_stages = sorted(search_stages)
+        self.read_dur_after_write = read_dur_after_write
+        self.seed = seed
+
+        test_emb = np.asarray(dataset.test_data, dtype=np.float32)
+        if normalize:
+            test_emb = test_emb / np.linalg.norm(test_emb, axis=1)[:, np.newaxis]
+        self.test_emb = test_emb
+        self.search_runner = MultiProcessingSearchRunner(
+            db=db,
+            test_data=test_emb,
+            k=k,
+            concurrencies=concurrencies,
+        )
+        self.serial_search_runner = SerialSearchRunner(
+            db=db,
+            test_data=test_emb.tolist(),
+            ground_truth=dataset.gt_data,
+            k=k,
+        )
+
+        self.live = LiveSet(self.data_volume)
+        self.rows_read = 0
+        self.op_counts = dict.fromkeys(ChurnOp, 0)
+        self.latencies = LatencyHistogram()
+        self.timeline: InsertTimeline | None = None
+        # held by the writer for each batch, by the stages to pause the writer
+        self._cond = threading.Condition()
+        self._done = False
+        self._error: Exception | None = None
+
+    def _next_op(self, rng: np.random.Generator) -> ChurnOp:
+        op = rng.choice(list(self.op_ratios), p=list(self.op_ratios.values()))
+        # updates and deletes need a batch of live ids
+        return ChurnOp.INSERT if self.live.count < config.NUM_PER_BATCH else op
+
+    def _send(self, db: api.VectorDB, op: ChurnOp, ids: np.ndarray, emb: np.ndarray | None) -> float:
+        """one batch, returns its latency"""
+        ids_arg = ids if db.ndarray_insert_supported else ids.tolist()
+        emb_arg = emb if emb is None or db.ndarray_insert_supported else emb.tolist()
+        s = time.perf_counter()
+        if op == ChurnOp.DELETE:
+            _, error = db.delete_embeddings(ids_arg)
+        elif op == ChurnOp.UPDATE:
+            _, error = db.upsert_embeddings(emb_arg, ids_arg)
+        else:
+            _, error = db.insert_embeddings(emb_arg, ids_arg)
+        if error is not None:
+            msg = f"Churn {op.value} of {len(ids)} rows failed"
+            raise RuntimeError(msg) from error
+        return time.perf_counter() - s
+
+    def _write(self, start: float):
+        rng = np.random.default_rng(self.seed)
+        # the search processes are started from the original db object, the writer thread has its own connection
+        db = deepcopy(self.db)
+        bucket = TokenBucket(self.insert_rate / config.NUM_PER_BATCH, config.STREAMING_INSERT_BURST, start)
+        batches = iter(self.dataset)
+        try:
+            with db.init():
+                while not self._done:
+                    op = self._next_op(rng)
+                    if op == ChurnOp.DELETE:
+                        rows, emb = None, None
+                        ids = self.live.sample(config.NUM_PER_BATCH, rng)
+                    else:
+                        data = next(batches, None)
+                        if data is None:
+                            break
+                        emb, rows = get_data(data, self.normalize, ndarray=True)
+                        ids = self.live.sample(len(rows), rng) if op == ChurnOp.UPDATE else rows
+                    time.sleep(bucket.delay())
+                    bucket.take()
+                    with self._cond:
+                        latency = self._send(db, op, ids, emb)
+                        self.latencies.record(latency)
+                        self.timeline.record(time.perf_counter(), latency, len(ids))
+                        if op == ChurnOp.INSERT:
+                            self.live.insert(ids)
+                        elif op == ChurnOp.UPDATE:
+                            self.live.update(ids, rows)
+                        else:
+                            self.live.delete(ids)
+                        self.op_counts[op] += len(ids)
+                        self.rows_read += 0 if rows is None else len(rows)
+                        self._cond.notify_all()
+        except Exception as e:
+            log.warning(f"Churn writer failed: {e}")
+            self._error = e
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    def _serial_search(self) -> dict[str, float]:
+        """recall against the live ids, called with the writer paused, as Metric st_* list items"""
+        s = time.perf_counter()
+        self.serial_search_runner.ground_truth = live_ground_truth(
+            self.dataset,
+            self.test_emb,
+            self.live,
+            self.k,
+            self.dataset.data.metric_type,
+        )
+        log.info(f"Ground truth of {self.live.count} live ids computed in {round(time.perf_counter() - s, 4)}s")
+        res, ssearch_dur = self.serial_search_runner.run()
+        recall, ndcg, p99_latency, p95_latency, *_ = res
+        log.info(
+            f"Churn serial search - recall={recall}, ndcg={ndcg}, p99={p99_latency}, p95={p95_latency}, "
+            f"dur={ssearch_dur:.4f}",
+        )
+        return {
+            "st_recall_list": recall,
+            "st_ndcg_list": ndcg,
+            "st_serial_latency_p99_list": p99_latency,
+            "st_serial_latency_p95_list": p95_latency,
+        }
+
+    def run_churn(self) -> Metric:
+        m = Metric()
+        start_time = time.perf_counter()
+        self.timeline = InsertTimeline(start_time)
+        writer = threading.Thread(target=self._write, args=(start_time,), name="churn-writer", daemon=True)
+        writer.start()
+
+        results = []
+        try:
+            for stage in [*self.search_stages, 1.0]:
+                perc = int(stage * 100)
+                with self._cond:
+                    self._cond.wait_for(lambda stage=stage: self._done or self.rows_read >= stage * self.data_volume)
+                    if self._error is not None:
+                        raise self._error
+                    log.info(
+                        f"Churn {perc}% done, live={self.live.count}, "
+                        f"{', '.join(f'{op.value}={n}' for op, n in self.op_counts.items())}"
+                    )
+                    res = {
+                        "st_search_stage_list": perc,
+                        "st_search_time_list": round(time.perf_counter() - start_time, 4),
+                        "st_live_count_list": self.live.count,
+                        "st_update_count_list": self.op_counts[ChurnOp.UPDATE],
+                        "st_delete_count_list": self.op_counts[ChurnOp.DELETE],
+                    }
+                    res |= self._serial_search()
+                max_qps, conc_failed_rate, conc_p99_latency = self.search_runner.run_by_dur(self.read_dur_after_write)
+                log.info(f"Churn {perc}% concurrent search - max_qps={max_qps}, p99={conc_p99_latency}")
+                results.append(
+                    res
+                    | {
+                        "st_max_qps_list_list": max_qps,
+                        "st_conc_failed_rate_list": conc_failed_rate,
+                        "st_conc_latency_p99_list": conc_p99_latency,
+                    },
+                )
+        finally:
+            self.search_runner.stop()
+            with self._cond:
+                # stops the writer after its current batch if a search failed
+                self._done = True
+            writer.join()
+
+        m.insert_duration = round(self.timeline.end - start_time, 4)
+        m.insert_latency_p99 = self.latencies.percentile(99)
+        m.insert_latency_p95 = self.latencies.percentile(95)
+        m.insert_latency_p50 = self.latencies.percentile(50)
+        m.insert_timeline = self.timeline.to_dict()
+        m.st_achieved_insert_rate = round(self.timeline.achieved_rate, 4)
+        m.st_ideal_insert_duration = math.ceil(self.data_volume / self.insert_rate)
+        for key in results[0]:
+            setattr(m, key, [r[key] for r in results])
+        log.info(f"Churn all done, results: {m}")
+        return m
@@ -0,0 +1,132 @@
+import logging
+import threading
+import time
+from copy import deepcopy
+
+import numpy as np
+
+from vectordb_bench import config
+from vectordb_bench.backend.clients import api
+from vectordb_bench.backend.filter import non_filter
+
+from .histogram import InsertTimeline, LatencyHistogram
+
+log = logging.getLogger(__name__)
+
+
+class FreshnessProbe:
+    """Measures how long an inserted vector takes to be returned by search, during a streaming insert.
+
+    Every `interval` seconds a thread inserts a sentinel, a copy of the last embedding offered by the insert loop,
+    with an id from `sentinel_id_start` on, after the ids of the dataset. It then searches the same embedding every
+    `poll_interval` seconds until the sentinel id is in the top `k`. The lag is from the acknowledged insert to
+    that search result. Sentinels not found within `timeout` seconds are counted apart. Sentinels are deleted once
+    found if the client supports deletes, not to skew the recall of the streaming search.
+
+    Examples:
+        >>> probe = FreshnessProbe(db, time.perf_counter(), sentinel_id_start=dataset.data.size)
+        >>> probe.start()
+        >>> probe.offer(emb[0])
+        >>> probe.stop()
+        >>> probe.result()
+    """
+
+    def __init__(
+        self,
+        db: api.VectorDB,
+        start: float,
+        sentinel_id_start: int,
+        interval: float = config.FRESHNESS_PROBE_INTERVAL,
+        timeout: float = config.FRESHNESS_PROBE_TIMEOUT,
+        poll_interval: float = config.FRESHNESS_PROBE_POLL_INTERVAL,
+        k: int = config.FRESHNESS_PROBE_K,
+    ):
+        self.db = db
+        self.start_time = start
+        self.next_id = sentinel_id_start
+        self.interval = interval
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.k = k
+        self.lags = LatencyHistogram()
+        self.timeline = InsertTimeline(start)
+        self.timeouts = 0
+        self._embedding: np.ndarray | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def offer(self, embedding: np.ndarray | list[float]):
+        """embedding of the next sentinel, replacing the one offered before if it was not used yet"""
+        self._embedding = np.array(embedding, dtype=np.float32)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="freshness-probe", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """a sentinel still waiting to be found is not recorded"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        try:
+            if self.db.name == "PgVector":
+                # pgvector connections are not thread-safe, same as the insert threads
+                db = deepcopy(self.db)
+                with db.init():
+                    self._probe_all(db)
+            else:
+                self._probe_all(self.db)
+        except Exception as e:
+            log.warning(f"Freshness probe stopped, err={e}")
+
+    def _probe_all(self, db: api.VectorDB):
+        db.prepare_filter(non_filter)
+        while not self._stop.wait(self.interval):
+            if self._embedding is not None:
+                embedding, self._embedding = self._embedding, None
+                self._probe(db, embedding)
+
+    def _probe(self, db: api.VectorDB, embedding: np.ndarray):
+        sentinel_id, self.next_id = self.next_id, self.next_id + 1
+        if db.ndarray_insert_supported:
+            _, error = db.insert_embeddings(embedding[np.newaxis, :], np.array([sentinel_id], dtype=np.int64))
+        else:
+            _, error = db.insert_embeddings([embedding.tolist()], [sentinel_id])
+        if error is not None:
+            log.warning(f"Freshness probe insert failed, err={error}")
+            return
+        acked = time.perf_counter()
+        query = embedding if db.ndarray_query_supported else embedding.tolist()
+        while not self._stop.is_set():
+            if sentinel_id in db.search_embedding(query, self.k):
+                now = time.perf_counter()
+                self.lags.record(now - acked)
+                self.timeline.record(now, now - acked, 1)
+                break
+            if time.perf_counter() - acked > self.timeout:
+                log.warning(f"Freshness probe sentinel {sentinel_id} not found in {self.timeout}s")
+                self.timeouts += 1
+                break
+            time.sleep(self.poll_interval)
+        if db.delete_supported:
+            db.delete_embeddings([sentinel_id])
+
+    def result(self) -> dict:
+        """Metric st_freshness_* fields"""
+        timeline = self.timeline.to_dict()
+        # most windows have no sentinel found in them, their lag is not 0
+        found = [i for i, h in enumerate(self.timeline.latencies) if h is not None]
+        return {
+            "st_freshness_lag_p99": self.lags.percentile(99),
+            "st_freshness_lag_p95": self.lags.percentile(95),
+            "st_freshness_lag_p50": self.lags.percentile(50),
+            "st_freshness_probe_count": self.lags.total_count,
+            "st_freshness_timeout_count": self.timeouts,
+            "st_freshness_timeline": {
+                "time": [timeline["time"][i] for i in found],
+                "lag_p99": [timeline["latency_p99"][i] for i in found],
+                "lag_p50": [timeline["latency_p50"][i] for i in found],
+            },
+        }
@@ -0,0 +1,46 @@
+import numpy as np
+
+from vectordb_bench.backend.clients.api import MetricType
+
+
+class ExactTopK:
+    """Exact k nearest ids of each query among the embeddings added so far, by brute force.
+
+    The rows are added in batches, only the k best of each query are kept between batches, so the ground truth of
+    a growing collection is updated with the new rows only.
+
+    Examples:
+        >>> top_k = ExactTopK(queries, k=100, metric_type=MetricType.COSINE)
+        >>> top_k.add(emb, ids)
+        >>> top_k.result()
+    """
+
+    def __init__(self, queries: np.ndarray | list[list[float]], k: int, metric_type: MetricType):
+        queries = np.asarray(queries, dtype=np.float32)
+        if metric_type == MetricType.COSINE:
+            queries = queries / np.linalg.norm(queries, axis=1)[:, np.newaxis]
+        self.queries = queries
+        self.k = k
+        self.metric_type = metric_type
+        self.best_ids = np.empty((len(queries), 0), dtype=np.int64)
+        self.best_scores = np.empty((len(queries), 0), dtype=np.float32)
+
+    def add(self, emb: np.ndarray, ids: np.ndarray):
+        """emb of the ids, normalized by the caller for COSINE"""
+        if len(ids) == 0:
+            return
+        # larger is nearer
+        scores = self.queries @ emb.T
+        if self.metric_type == MetricType.L2:
+            scores = 2 * scores - (emb * emb).sum(axis=1)
+        self.best_ids = np.hstack([self.best_ids, np.broadcast_to(ids, scores.shape)])
+        self.best_scores = np.hstack([self.best_scores, scores])
+        if self.best_ids.shape[1] > self.k:
+            top = np.argpartition(-self.best_scores, self.k - 1, axis=1)[:, : self.k]
+            self.best_ids = np.take_along_axis(self.best_ids, top, axis=1)
+            self.best_scores = np.take_along_axis(self.best_scores, top, axis=1)
+
+    def result(self) -> list[list[int]]:
+        """ids of each query, nearest first"""
+        order = np.argsort(-self.best_scores, axis=1, kind="stable")
+        return np.take_along_axis(self.best_ids, order, axis=1).tolist()
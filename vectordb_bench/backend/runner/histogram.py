@@ -0,0 +1,382 @@
+import copy
+import logging
+import math
+import zlib
+from collections.abc import Iterable
+
+import numpy as np
+
+from ... import config
+
+log = logging.getLogger(__name__)
+
+NS_PER_SECOND = 1_000_000_000
+# one histogram per timeline window, a lower precision keeps them small
+TIMELINE_SIGNIFICANT_DIGITS = 2
+
+
+class LatencyHistogram:
+    """HDR-style latency histogram with a fixed memory footprint.
+
+    Latencies are recorded in nanoseconds into log-linear buckets, every recorded value is kept within
+    `significant_digits` decimal digits of precision. Histograms of the same precision can be merged, so
+    search processes only need to send back one histogram instead of every latency.
+
+    Args:
+        significant_digits(int): number of significant decimal digits kept for each value, in [1, 5]
+        highest_trackable_s(float): largest latency in seconds, larger values are clamped
+
+    Examples:
+        >>> hist = LatencyHistogram()
+        >>> hist.record(0.0012)
+        >>> hist.merge(other_hist)
+        >>> hist.percentile(99)
+    """
+
+    def __init__(
+        self,
+        significant_digits: int = config.LATENCY_HISTOGRAM_SIGNIFICANT_DIGITS,
+        highest_trackable_s: float = config.LATENCY_HISTOGRAM_HIGHEST_TRACKABLE,
+    ):
+        if not 1 <= significant_digits <= 5:
+            msg = f"significant_digits should be in [1, 5], got {significant_digits}"
+            raise ValueError(msg)
+
+        self.significant_digits = significant_digits
+        self.highest_trackable_value = int(highest_trackable_s * NS_PER_SECOND)
+
+        sub_bucket_count = 2 ** math.ceil(math.log2(2 * 10**significant_digits))
+        self._half_count_magnitude = int(math.log2(sub_bucket_count)) - 1
+        self._half_count = sub_bucket_count // 2
+        self._sub_bucket_mask = sub_bucket_count - 1
+
+        bucket_count, smallest_untrackable_value = 1, sub_bucket_count
+        while smallest_untrackable_value <= self.highest_trackable_value:
+            smallest_untrackable_value <<= 1
+            bucket_count += 1
+
+        self.counts = np.zeros((bucket_count + 1) * self._half_count, dtype=np.int64)
+        self.total_count = 0
+        self._sum = 0
+        self._min = 0
+        self._max = 0
+
+    def _counts_index(self, value: int) -> int:
+        bucket_idx = (value | self._sub_bucket_mask).bit_length() - (self._half_count_magnitude + 1)
+        sub_bucket_idx = value >> bucket_idx
+        return ((bucket_idx + 1) << self._half_count_magnitude) + sub_bucket_idx - self._half_count
+
+    def _counts_indices(self, values: np.ndarray) -> np.ndarray:
+        # for positive integers below 2**53, frexp exponent equals bit_length
+        _, bit_length = np.frexp((values | self._sub_bucket_mask).astype(np.float64))
+        bucket_idx = bit_length.astype(np.int64) - (self._half_count_magnitude + 1)
+        sub_bucket_idx = values >> bucket_idx
+        return ((bucket_idx + 1) << self._half_count_magnitude) + sub_bucket_idx - self._half_count
+
+    def _highest_equivalent_value(self, index: int) -> int:
+        bucket_idx = (index >> self._half_count_magnitude) - 1
+        sub_bucket_idx = (index & (self._half_count - 1)) + self._half_count
+        if bucket_idx < 0:
+            sub_bucket_idx -= self._half_count
+            bucket_idx = 0
+        return ((sub_bucket_idx + 1) << bucket_idx) - 1
+
+    def _clamp(self, value: int) -> int:
+        if value > self.highest_trackable_value:
+            log.debug(f"latency {value}ns exceeds the highest trackable value, clamped")
+            return self.highest_trackable_value
+        return max(value, 0)
+
+    def _update_stats(self, count: int, value_sum: int, value_min: int, value_max: int):
+        self._min = value_min if self.total_count == 0 else min(self._min, value_min)
+        self._max = max(self._max, value_max)
+        self.total_count += count
+        self._sum += value_sum
+
+    def record(self, latency: float):
+        """record one latency in seconds"""
+        value = self._clamp(int(latency * NS_PER_SECOND))
+        self.counts[self._counts_index(value)] += 1
+        self._update_stats(1, value, value, value)
+
+    def record_many(self, latencies: Iterable[float]):
+        """record latencies in seconds"""
+        values = (np.asarray(latencies, dtype=np.float64) * NS_PER_SECOND).astype(np.int64)
+        if len(values) == 0:
+            return
+        values = np.clip(values, 0, self.highest_trackable_value)
+        np.add.at(self.counts, self._counts_indices(values), 1)
+        self._update_stats(len(values), int(values.sum()), int(values.min()), int(values.max()))
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """add all values recorded in other into this histogram"""
+        if other.significant_digits != self.significant_digits or len(other.counts) != len(self.counts):
+            msg = "Cannot merge latency histograms with different precision or range"
+            raise ValueError(msg)
+        if other.total_count == 0:
+            return self
+        self.counts += other.counts
+        self._update_stats(other.total_count, other._sum, other._min, other._max)
+        return self
+
+    @classmethod
+    def merge_all(cls, hists: Iterable["LatencyHistogram"]) -> "LatencyHistogram":
+        hists = list(hists)
+        if len(hists) == 0:
+            return cls()
+        merged = copy.deepcopy(hists[0])
+        for h in hists[1:]:
+            merged.merge(h)
+        return merged
+
+    def percentile(self, p: float) -> float:
+        """latency in seconds at percentile p in [0, 100]; 0.0 if nothing recorded"""
+        if self.total_count == 0:
+            return 0.0
+        target = max(1, math.ceil(p / 100 * self.total_count))
+        index = int(np.searchsorted(np.cumsum(self.counts), target))
+        value = min(self._highest_equivalent_value(index), self._max)
+        return value / NS_PER_SECOND
+
+    def mean(self) -> float:
+        return self._sum / self.total_count / NS_PER_SECOND if self.total_count else 0.0
+
+    def sum(self) -> float:
+        return self._sum / NS_PER_SECOND
+
+    def min(self) -> float:
+        return self._min / NS_PER_SECOND
+
+    def max(self) -> float:
+        return self._max / NS_PER_SECOND
+
+    def __len__(self) -> int:
+        return self.total_count
+
+    def __getstate__(self) -> dict:
+        # mostly empty buckets, compress them before shipping between processes
+        state = self.__dict__.copy()
+        state["counts"] = zlib.compress(self.counts.tobytes())
+        return state
+
+    def __setstate__(self, state: dict):
+        state["counts"] = np.frombuffer(zlib.decompress(state["counts"]), dtype=np.int64).copy()
+        self.__dict__.update(state)
+
+
+class LatencyTimeline:
+    """Throughput and latencies in fixed time windows since the search started.
+
+    Each window keeps its own low precision histogram, timelines of processes that started together
+    are merged window by window.
+
+    Args:
+        start(float): time.perf_counter() when the search started
+        duration(float): expected search duration, later completions are counted in the last window
+        window(float): window size in seconds
+
+    Examples:
+        >>> timeline = LatencyTimeline(time.perf_counter(), duration=30)
+        >>> timeline.record(time.perf_counter(), 0.0012)
+        >>> timeline.to_dict()["qps"]
+    """
+
+    def __init__(self, start: float, duration: float, window: float = config.CONCURRENCY_TIMELINE_WINDOW):
+        self.start = start
+        self.duration = duration
+        self.window = window
+        self.windows: list[LatencyHistogram | None] = [None] * max(math.ceil(duration / window), 1)
+
+    def record(self, end: float, latency: float):
+        """record one latency in seconds of a request completed at `end`, in time.perf_counter()"""
+        idx = min(max(int((end - self.start) / self.window), 0), len(self.windows) - 1)
+        if self.windows[idx] is None:
+            self.windows[idx] = LatencyHistogram(significant_digits=TIMELINE_SIGNIFICANT_DIGITS)
+        self.windows[idx].record(latency)
+
+    def merge(self, other: "LatencyTimeline") -> "LatencyTimeline":
+        if other.window != self.window or len(other.windows) != len(self.windows):
+            msg = "Cannot merge latency timelines with different windows"
+            raise ValueError(msg)
+        for i, h in enumerate(other.windows):
+            if h is None:
+                continue
+            if self.windows[i] is None:
+                self.windows[i] = copy.deepcopy(h)
+            else:
+                self.windows[i].merge(h)
+        return self
+
+    @classmethod
+    def merge_all(cls, timelines: Iterable["LatencyTimeline"]) -> "LatencyTimeline":
+        timelines = list(timelines)
+        merged = copy.deepcopy(timelines[0])
+        for t in timelines[1:]:
+            merged.merge(t)
+        return merged
+
+    def to_dict(self) -> dict[str, list[float]]:
+        """parallel lists of window end time since start, qps and latencies in seconds"""
+        timeline = {"time": [], "qps": [], "latency_p99": [], "latency_p95": [], "latency_p50": [], "latency_avg": []}
+        for i, h in enumerate(self.windows):
+            end = min((i + 1) * self.window, self.duration)
+            timeline["time"].append(round(end, 4))
+            if h is None:
+                # nothing completed in this window, e.g. a stall
+                for key in ("qps", "latency_p99", "latency_p95", "latency_p50", "latency_avg"):
+                    timeline[key].append(0.0)
+                continue
+            timeline["qps"].append(round(len(h) / (end - i * self.window), 4))
+            timeline["latency_p99"].append(h.percentile(99))
+            timeline["latency_p95"].append(h.percentile(95))
+            timeline["latency_p50"].append(h.percentile(50))
+            timeline["latency_avg"].append(h.mean())
+        return timeline
+
+
+class InsertTimeline:
+    """Inserted rows and per-batch insert latencies in time windows since the load started.
+
+    The duration of a load is not known in advance: the windows start at `window` seconds and double, adjacent
+    windows being merged, whenever the load outlasts `max_windows` of them. A load of hours keeps a bounded number
+    of histograms, timelines of processes with the same start are merged window by window.
+
+    A rate-limited insert also records, with record_offered, the rows it sent per window and the largest number of
+    batches sent but not finished yet, to tell the rate the db was offered from the rate it achieved.
+
+    Args:
+        start(float): time.perf_counter() when the load started, shared by the load processes of one machine
+        window(float): initial window size in seconds
+        max_windows(int): largest number of windows
+
+    Examples:
+        >>> timeline = InsertTimeline(time.perf_counter())
+        >>> timeline.record(time.perf_counter(), 0.05, rows=1000)
+        >>> timeline.to_dict()["rows_per_second"]
+    """
+
+    def __init__(
+        self,
+        start: float,
+        window: float = config.LOAD_TIMELINE_WINDOW,
+        max_windows: int = config.LOAD_TIMELINE_MAX_WINDOWS,
+    ):
+        self.start = start
+        self.window = window
+        self.max_windows = max(max_windows, 2)
+        self.end = start
+        self.rows: list[int] = []
+        self.latencies: list[LatencyHistogram | None] = []
+        self.offered: list[int] = []
+        self.backlog: list[int] = []
+        self.offered_end = start
+
+    def _coarsen(self):
+        self.window *= 2
+        pairs = range(0, len(self.rows), 2)
+        self.rows = [sum(self.rows[i : i + 2]) for i in pairs]
+        self.offered = [sum(self.offered[i : i + 2]) for i in pairs]
+        self.backlog = [max(self.backlog[i : i + 2]) for i in pairs]
+        self.latencies = [
+            (
+                LatencyHistogram.merge_all([h for h in self.latencies[i : i + 2] if h is not None])
+                if any(h is not None for h in self.latencies[i : i + 2])
+                else None
+            )
+            for i in pairs
+        ]
+
+    def _grow(self, size: int):
+        self.rows.extend([0] * (size - len(self.rows)))
+        self.latencies.extend([None] * (size - len(self.latencies)))
+        self.offered.extend([0] * (size - len(self.offered)))
+        self.backlog.extend([0] * (size - len(self.backlog)))
+
+    def _index(self, t: float) -> int:
+        """window of time t, coarsening the windows if t is past the last of them"""
+        while int((t - self.start) / self.window) >= self.max_windows:
+            self._coarsen()
+        idx = max(int((t - self.start) / self.window), 0)
+        self._grow(idx + 1)
+        return idx
+
+    def record(self, end: float, latency: float, rows: int):
+        """record one insert_embeddings call of `rows` rows and `latency` seconds completed at `end`"""
+        self.end = max(self.end, end)
+        idx = self._index(end)
+        if self.latencies[idx] is None:
+            self.latencies[idx] = LatencyHistogram(significant_digits=TIMELINE_SIGNIFICANT_DIGITS)
+        self.latencies[idx].record(latency)
+        self.rows[idx] += rows
+
+    def record_offered(self, sent: float, rows: int, backlog: int):
+        """record a batch of `rows` rows sent at `sent`, with `backlog` batches sent but not finished"""
+        self.offered_end = max(self.offered_end, sent)
+        idx = self._index(sent)
+        self.offered[idx] += rows
+        self.backlog[idx] = max(self.backlog[idx], backlog)
+
+    @property
+    def offered_rate(self) -> float:
+        """rows/s sent from start to the last batch sent"""
+        return sum(self.offered) / ((self.offered_end - self.start) or self.window)
+
+    @property
+    def achieved_rate(self) -> float:
+        """rows/s inserted from start to the last batch finished"""
+        return sum(self.rows) / ((self.end - self.start) or self.window)
+
+    def merge(self, other: "InsertTimeline") -> "InsertTimeline":
+        other = copy.deepcopy(other)
+        while self.window < other.window:
+            self._coarsen()
+        while other.window < self.window:
+            other._coarsen()
+        if not math.isclose(self.window, other.window):
+            msg = "Cannot merge insert timelines with different windows"
+            raise ValueError(msg)
+
+        self._grow(len(other.rows))
+        for i, h in enumerate(other.latencies):
+            self.rows[i] += other.rows[i]
+            self.offered[i] += other.offered[i]
+            self.backlog[i] += other.backlog[i]
+            if h is not None:
+                self.latencies[i] = h if self.latencies[i] is None else self.latencies[i].merge(h)
+        self.end = max(self.end, other.end)
+        self.offered_end = max(self.offered_end, other.offered_end)
+        while len(self.rows) > self.max_windows:
+            self._coarsen()
+        return self
+
+    @classmethod
+    def merge_all(cls, timelines: Iterable["InsertTimeline"]) -> "InsertTimeline":
+        timelines = list(timelines)
+        merged = copy.deepcopy(timelines[0])
+        for t in timelines[1:]:
+            merged.merge(t)
+        return merged
+
+    def to_dict(self) -> dict[str, list[float]]:
+        """parallel lists of window end time since start, inserted rows/s and batch latencies in seconds,
+        and the sent rows/s and backlog of record_offered if any"""
+        timeline = {"time": [], "rows_per_second": [], "latency_p99": [], "latency_p50": [], "latency_avg": []}
+        if any(self.offered):
+            timeline |= {"offered_rows_per_second": [], "backlog": []}
+        for i, h in enumerate(self.latencies):
+            end = min((i + 1) * self.window, max(self.end, self.offered_end) - self.start)
+            seconds = (end - i * self.window) or self.window
+            timeline["time"].append(round(end, 4))
+            timeline["rows_per_second"].append(round(self.rows[i] / seconds, 4))
+            if "backlog" in timeline:
+                timeline["offered_rows_per_second"].append(round(self.offered[i] / seconds, 4))
+                timeline["backlog"].append(self.backlog[i])
+            if h is None:
+                # nothing completed in this window, e.g. a compaction stall
+                for key in ("latency_p99", "latency_p50", "latency_avg"):
+                    timeline[key].append(0.0)
+                continue
+            timeline["latency_p99"].append(h.percentile(99))
+            timeline["latency_p50"].append(h.percentile(50))
+            timeline["latency_avg"].append(h.mean())
+        return timeline
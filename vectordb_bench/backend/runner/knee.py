@@ -0,0 +1,90 @@
+import logging
+import math
+from collections.abc import Iterator
+
+log = logging.getLogger(__name__)
+
+
+class KneeSearch:
+    """Adaptive concurrency levels looking for the knee of the QPS curve.
+
+    Concurrency grows geometrically from `start` until the QPS gain of one step falls below `min_gain`, the p99
+    latency exceeds `max_p99`, or `max_concurrency` is reached. Then the interval between the knee and the explored
+    level right below it is bisected, until it is narrower than `resolution` of the knee.
+
+    The knee is the smallest concurrency whose QPS reaches (1 - min_gain) of the max QPS, among the levels with
+    p99 within `max_p99`.
+
+    Args:
+        start(int): first concurrency
+        max_concurrency(int): concurrency never exceeds it
+        min_gain(float): relative QPS gain below which QPS is considered saturated, e.g. 0.05
+        max_p99(float | None): p99 latency limit in seconds, no limit if None
+        growth(float): concurrency multiplier of each step before the knee is found
+        resolution(float): stop bisecting when the interval is narrower than this ratio of the knee
+
+    Examples:
+        >>> levels = KneeSearch(start=1, max_concurrency=256, min_gain=0.05)
+        >>> for conc in levels:
+        >>>     levels.record(conc, qps, p99)
+        >>> levels.knee
+    """
+
+    def __init__(
+        self,
+        start: int,
+        max_concurrency: int,
+        min_gain: float,
+        max_p99: float | None = None,
+        growth: float = 2,
+        resolution: float = 0.1,
+    ):
+        self.start = max(start, 1)
+        self.max_concurrency = max(max_concurrency, self.start)
+        self.min_gain = min_gain
+        self.max_p99 = max_p99
+        self.growth = growth
+        self.resolution = resolution
+        self.results: dict[int, tuple[float, float]] = {}
+
+    def record(self, conc: int, qps: float, p99: float):
+        self.results[conc] = (qps, p99)
+
+    def _within_limit(self, conc: int) -> bool:
+        return self.max_p99 is None or self.results[conc][1] <= self.max_p99
+
+    def _grow(self) -> Iterator[int]:
+        conc, prev = self.start, None
+        while True:
+            yield conc
+            if conc not in self.results or not self._within_limit(conc) or conc >= self.max_concurrency:
+                return
+
+            qps = self.results[conc][0]
+            if prev is not None and qps < self.results[prev][0] * (1 + self.min_gain):
+                log.info(f"QPS saturated at concurrency {conc}, qps={qps}, gain below {self.min_gain}")
+                return
+            prev, conc = conc, min(max(conc + 1, math.ceil(conc * self.growth)), self.max_concurrency)
+
+    def __iter__(self) -> Iterator[int]:
+        yield from self._grow()
+
+        while (knee := self.knee) is not None:
+            lower = [c for c in self.results if c < knee]
+            if len(lower) == 0 or knee - max(lower) <= max(1, int(knee * self.resolution)):
+                break
+
+            mid = (max(lower) + knee) // 2
+            yield mid
+            if mid not in self.results:
+                break
+        log.info(f"Knee search explored concurrencies {list(self.results)}, knee={self.knee}")
+
+    @property
+    def knee(self) -> int | None:
+        """smallest concurrency reaching (1 - min_gain) of the max QPS within the p99 limit, None if nothing does"""
+        qps_within_limit = {c: qps for c, (qps, _) in self.results.items() if self._within_limit(c)}
+        if len(qps_within_limit) == 0:
+            return None
+        target = max(qps_within_limit.values()) * (1 - self.min_gain)
+        return min(c for c, qps in qps_within_limit.items() if qps >= target)
@@ -1,21 +1,30 @@
 import concurrent
+import copy
 import logging
+import math
 import multiprocessing as mp
 import random
 import time
 import traceback
-from collections.abc import Iterable
-from multiprocessing.queues import Queue
+from collections.abc import Generator, Iterable, Iterator
+from contextlib import ExitStack, contextmanager
 
 import numpy as np
 
 from vectordb_bench.backend.filter import Filter, non_filter
 
 from ... import config
-from ...models import ConcurrencySlotTimeoutError
+from ...models import ArrivalPattern
 from ..clients import api
+from .histogram import LatencyHistogram, LatencyTimeline
+from .knee import KneeSearch
+from .shared_query import SharedQueryMatrix
+from .slo import RateRamp
+from .worker_pool import SearchWorkerPool
 
 NUM_PER_BATCH = config.NUM_PER_BATCH
+# latency percentiles recorded for each concurrency level
+CONC_LATENCY_PERCENTILES = {"p99": 99, "p95": 95, "p50": 50, "p90": 90, "p999": 99.9, "p9999": 99.99}
 log = logging.getLogger(__name__)
 
 
@@ -26,17 +35,52 @@ class MultiProcessingSearchRunner:
         k(int): search topk, default to 100
         concurrency(Iterable): concurrencies, default [1, 5, 10, 15, 20, 25, 30, 35]
         duration(int): duration for each concurency, default to 30s
+        target_qps(float | None): open-loop mode if set, queries are dispatched at this total rate
+            across all workers instead of back-to-back, default to None (closed-loop)
+        arrival_pattern(ArrivalPattern): send schedule in open-loop mode, poisson or constant
+        threads_per_process(int): each concurrency is split into processes of at most this many threads,
+            every thread searches with its own connection from db.init(), default to 1
+        adaptive(bool): ignore the concurrency list except its min as the start, grow the concurrency
+            geometrically and bisect the knee of the QPS curve, see KneeSearch
+        adaptive_max_concurrency(int): upper bound of the adaptive search
+        adaptive_min_qps_gain(float): relative QPS gain below which the adaptive search considers QPS saturated
+        adaptive_max_latency_p99(float | None): p99 limit in seconds of the adaptive search, no limit if None
+        slo_latency(float | None): latency budget in seconds. Closed-loop search stops at the first concurrency
+            breaking it, open-loop search ramps the rate from target_qps at the largest concurrency instead of
+            running every concurrency, see RateRamp. No budget if None
+        slo_percentile(float): the latency percentile checked against slo_latency, default to 99
+        warmup_duration(float): seconds of closed-loop search by every thread or coroutine on its fresh
+            connection before the measured search, default to 0
+        warmup_queries(int): queries sent by every thread or coroutine before the measured search, default to 0.
+            If both are set, the warm-up lasts until both are reached. Warm-up latencies are reported separately
+        batch_size(int): queries per request, batch search by db.search_embeddings if larger than 1. Counts and
+            rates are in queries, latencies are per request. Default to 1
+
+    The search processes are started once, sized to the largest concurrency, and reused by every concurrency
+    and every run_by_dur call until stop().
     """
 
     def __init__(
         self,
         db: api.VectorDB,
-        test_data: list[list[float]],
+        test_data: list[list[float]] | np.ndarray | SharedQueryMatrix,
         k: int = config.K_DEFAULT,
         filters: Filter = non_filter,
         concurrencies: Iterable[int] = config.NUM_CONCURRENCY,
         duration: int = config.CONCURRENCY_DURATION,
         concurrency_timeout: int = config.CONCURRENCY_TIMEOUT,
+        target_qps: float | None = None,
+        arrival_pattern: ArrivalPattern = ArrivalPattern.POISSON,
+        threads_per_process: int = 1,
+        adaptive: bool = False,
+        adaptive_max_concurrency: int = config.ADAPTIVE_MAX_CONCURRENCY,
+        adaptive_min_qps_gain: float = config.ADAPTIVE_MIN_QPS_GAIN,
+        adaptive_max_latency_p99: float | None = None,
+        slo_latency: float | None = None,
+        slo_percentile: float = 99,
+        warmup_duration: float = 0,
+        warmup_queries: int = 0,
+        batch_size: int = 1,
     ):
         self.db = db
         self.k = k
@@ -44,45 +88,78 @@ class MultiProcessingSearchRunner:
         self.concurrencies = concurrencies
         self.duration = duration
         self.concurrency_timeout = concurrency_timeout
-
-        self.test_data = test_data
+        self.target_qps = target_qps
+        self.arrival_pattern = arrival_pattern
+        self.threads_per_process = max(threads_per_process, 1)
+        self.adaptive = adaptive
+        self.adaptive_max_concurrency = adaptive_max_concurrency
+        self.adaptive_min_qps_gain = adaptive_min_qps_gain
+        self.adaptive_max_latency_p99 = adaptive_max_latency_p99
+        self.slo_latency = slo_latency
+        self.slo_percentile = slo_percentile
+        self.warmup_duration = warmup_duration
+        self.warmup_queries = warmup_queries
+        self.batch_size = max(batch_size, 1)
+        self._warmup_latencies = LatencyHistogram()
+        self._pool: SearchWorkerPool | None = None
+        self._thread_runners: list[MultiProcessingSearchRunner] = []
+
+        # shared with all search processes instead of pickling the queries into each of them
+        self.test_data = test_data if isinstance(test_data, SharedQueryMatrix) else SharedQueryMatrix(test_data)
         log.debug(f"test dataset columns: {len(test_data)}")
 
-    def search(
-        self,
-        test_data: list[list[float]],
-        q: mp.Queue,
-        cond: mp.Condition,
-    ) -> tuple[int, float]:
-        # sync all process
-        q.put(1)
-        with cond:
-            cond.wait()
-
-        with self.db.init():
-            self.db.prepare_filter(self.filters)
-            num, idx = len(test_data), random.randint(0, len(test_data) - 1)
-
-            start_time = time.perf_counter()
-            count = 0
-            latencies = []
-            while time.perf_counter() < start_time + self.duration:
-                s = time.perf_counter()
-                try:
-                    self.db.search_embedding(test_data[idx], self.k)
-                    count += 1
-                    latencies.append(time.perf_counter() - s)
-                except Exception as e:
-                    log.warning(f"VectorDB search_embedding error: {e}")
+    def _get_query(self, test_data: SharedQueryMatrix, idx: int) -> np.ndarray | list[float]:
+        query = test_data[idx]
+        return query if self.db.ndarray_query_supported else query.tolist()
 
-                # loop through the test data
-                idx = idx + 1 if idx < num - 1 else 0
+    def _get_request(self, test_data: SharedQueryMatrix, idx: int) -> np.ndarray | list[float]:
+        """the query at idx, or batch_size queries from idx in batch mode"""
+        if self.batch_size > 1:
+            return test_data.batch(idx, self.batch_size)
+        return self._get_query(test_data, idx)
 
-                if count % 500 == 0:
-                    log.debug(
-                        f"({mp.current_process().name:16}) "
-                        f"search_count: {count}, latest_latency={time.perf_counter()-s}"
-                    )
+    def _send_request(self, request: np.ndarray | list[float]):
+        if self.batch_size > 1:
+            self.db.search_embeddings(request, self.k)
+        else:
+            self.db.search_embedding(request, self.k)
+
+    def search(self) -> tuple[int, float, LatencyHistogram, LatencyTimeline]:
+        """Closed-loop search in a pool process for self.duration, the db is already initialized by the pool.
+
+        Returns:
+            int: successful queries count
+            float: actual duration
+            LatencyHistogram: latencies of the requests
+            LatencyTimeline: qps and latencies per time window
+        """
+        test_data = self.test_data
+        num, idx = len(test_data), random.randint(0, len(test_data) - 1)
+
+        start_time = time.perf_counter()
+        count = 0
+        latencies = LatencyHistogram()
+        timeline = LatencyTimeline(start_time, self.duration)
+        while time.perf_counter() < start_time + self.duration:
+            request = self._get_request(test_data, idx)
+            s = time.perf_counter()
+            try:
+                self._send_request(request)
+                end = time.perf_counter()
+                count += self.batch_size
+                latencies.record(end - s)
+                timeline.record(end, end - s)
+            except Exception as e:
+                log.warning(f"VectorDB search_embedding error: {e}")
+
+            # loop through the test data
+            idx = (idx + self.batch_size) % num
+
+            if count % 500 == 0:
+                log.debug(
+                    f"({mp.current_process().name:16}) "
+                    f"search_count: {count}, latest_latency={time.perf_counter()-s}"
+                )
 
         total_dur = round(time.perf_counter() - start_time, 4)
         log.info(
@@ -90,7 +167,271 @@ class MultiProcessingSearchRunner:
             f"actual_dur={total_dur}s, count={count}, qps in this process: {round(count / total_dur, 4):3}"
         )
 
-        return (count, total_dur, latencies)
+        return (count, total_dur, latencies, timeline)
+
+    def warmup(self) -> LatencyHistogram:
+        """Closed-loop search before the measured ones, until warmup_duration elapses and warmup_queries are sent
+
+        Returns:
+            LatencyHistogram: warm-up latencies, excluded from the measured ones
+        """
+        test_data = self.test_data
+        num, idx = len(test_data), random.randint(0, len(test_data) - 1)
+
+        latencies = LatencyHistogram()
+        end_time = time.perf_counter() + self.warmup_duration
+        sent = 0
+        while sent < self.warmup_queries or time.perf_counter() < end_time:
+            s = time.perf_counter()
+            try:
+                self._send_request(self._get_request(test_data, idx))
+                latencies.record(time.perf_counter() - s)
+            except Exception as e:
+                log.warning(f"VectorDB search_embedding error in warm-up: {e}")
+            sent += self.batch_size
+            idx = (idx + self.batch_size) % num
+        return latencies
+
+    def pop_warmup_latencies(self) -> LatencyHistogram:
+        """Warm-up latencies of this process since the last call"""
+        latencies, self._warmup_latencies = self._warmup_latencies, LatencyHistogram()
+        return latencies
+
+    def _warmup_enabled(self) -> bool:
+        return self.warmup_duration > 0 or self.warmup_queries > 0
+
+    @staticmethod
+    def _unsent_schedule(
+        scheduled: float,
+        end_time: float,
+        interval: float,
+        poisson: bool,
+        rng: np.random.Generator,
+    ) -> np.ndarray:
+        """send times from `scheduled` up to `end_time` of the requests left unsent at the end of search_by_rate"""
+        if not poisson:
+            return np.arange(scheduled, end_time, interval)
+        times, last = [np.array([scheduled])], scheduled
+        while last < end_time:
+            chunk = last + np.cumsum(rng.exponential(interval, size=max(math.ceil((end_time - last) / interval), 16)))
+            times.append(chunk)
+            last = chunk[-1]
+        times = np.concatenate(times)
+        return times[times < end_time]
+
+    def search_by_rate(self, rate: float) -> tuple[int, float, LatencyHistogram, LatencyTimeline, int]:
+        """Open-loop search, send queries on a fixed schedule of `rate` queries per second.
+
+        The latency of each query is measured from its scheduled send time rather than the actual send time,
+        so a stalled server is charged for the queries it delays (coordinated omission correction). The requests
+        still unsent at the end, the server having fallen behind, are recorded with their wait until the end.
+
+        Returns:
+            int: successful queries count
+            float: actual duration
+            LatencyHistogram: latencies of the requests, the unsent ones included
+            LatencyTimeline: qps and latencies per time window
+            int: queries scheduled and never sent
+        """
+        test_data = self.test_data
+        num, idx = len(test_data), random.randint(0, len(test_data) - 1)
+
+        # one request of batch_size queries per interval
+        interval = self.batch_size / rate
+        poisson = self.arrival_pattern == ArrivalPattern.POISSON
+        rng = np.random.default_rng()
+
+        start_time = time.perf_counter()
+        end_time = start_time + self.duration
+        # random phase, so that constant schedules of different processes do not send in lockstep
+        scheduled = start_time + rng.uniform(0, interval)
+        count, sent, missed, latency = 0, 0, 0, 0
+        latencies = LatencyHistogram()
+        timeline = LatencyTimeline(start_time, self.duration)
+        while scheduled < end_time:
+            now = time.perf_counter()
+            if now >= end_time:
+                # requests scheduled but never sent because the server fell behind
+                unsent = self._unsent_schedule(scheduled, end_time, interval, poisson, rng)
+                latencies.record_many(end_time - unsent)
+                missed = len(unsent) * self.batch_size
+                break
+            if scheduled > now:
+                time.sleep(scheduled - now)
+
+            try:
+                self._send_request(self._get_request(test_data, idx))
+                end = time.perf_counter()
+                latency = end - scheduled
+                count += self.batch_size
+                latencies.record(latency)
+                timeline.record(end, latency)
+            except Exception as e:
+                log.warning(f"VectorDB search_embedding error: {e}")
+
+            # loop through the test data
+            idx = (idx + self.batch_size) % num
+            scheduled += rng.exponential(interval) if poisson else interval
+
+            sent += 1
+            if sent % 500 == 0:
+                log.debug(f"({mp.current_process().name:16}) search_count: {count}, latest_latency={latency}")
+
+        total_dur = round(time.perf_counter() - start_time, 4)
+        log.info(
+            f"{mp.current_process().name:16} search {self.duration}s at rate={rate}: "
+            f"actual_dur={total_dur}s, count={count}, missed={missed}, "
+            f"qps in this process: {round(count / total_dur, 4):3}"
+        )
+
+        return (count, total_dur, latencies, timeline, missed)
+
+    def _run_search(
+        self,
+        pool: SearchWorkerPool,
+        conc: int,
+        rate: float | None,
+    ) -> list[tuple[int, float, LatencyHistogram, LatencyTimeline]]:
+        """Run one search task per thread, closed-loop if rate is None, otherwise open-loop at the total rate.
+        The open-loop results have a fifth item, the queries never sent, see search_by_rate"""
+        if rate:
+            return self._run_in_threads(pool, conc, "search_by_rate", rate / conc)
+        return self._run_in_threads(pool, conc, "search")
+
+    def _prepare_level(self, pool: SearchWorkerPool, conc: int):
+        """Run before the timed search of each level, the process runner warms up once in init_worker"""
+
+    def _timed_search(self, pool: SearchWorkerPool, conc: int, rate: float | None) -> tuple[list, float]:
+        """Returns: the results of _run_search, and its wall time the qps of the level is computed over"""
+        self._prepare_level(pool, conc)
+        start = time.perf_counter()
+        res = self._run_search(pool, conc, rate)
+        return res, time.perf_counter() - start
+
+    def _run_in_threads(self, pool: SearchWorkerPool, conc: int, method: str, *args) -> list:
+        """Split `conc` into as few processes as possible, with threads spread evenly across them
+
+        Returns:
+            list: the return values of all the `conc` threads
+        """
+        procs = math.ceil(conc / self.threads_per_process)
+        threads = [conc // procs + (1 if i < conc % procs else 0) for i in range(procs)]
+        res = pool.run_each("search_in_threads", [(t, method, *args) for t in threads])
+        return [r for thread_res in res for r in thread_res]
+
+    def search_in_threads(self, threads: int, method: str, *args) -> list:
+        """Call `method` of the first `threads` thread runners of this process at the same time"""
+        runners = self._thread_runners[:threads]
+        if threads == 1:
+            return [getattr(runners[0], method)(*args)]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=threads) as executor:
+            futures = [executor.submit(getattr(r, method), *args) for r in runners]
+            return [f.result() for f in futures]
+
+    @contextmanager
+    def init_worker(self) -> Generator[None, None, None]:
+        """Entered once by each pool process, open one connection per thread and keep them across concurrencies.
+
+        Every thread gets a shallow copy of this runner with its own copy of the db, so the attributes set by
+        db.init() are not shared between threads. The fresh connections are warmed up here, before the process
+        reports ready, so the warm-up never overlaps the measured search.
+        """
+        with ExitStack() as stack:
+            for _ in range(self.threads_per_process):
+                runner = copy.copy(self)
+                runner.db = copy.copy(self.db)
+                stack.enter_context(runner.db.init())
+                runner.db.prepare_filter(self.filters)
+                self._thread_runners.append(runner)
+            if self._warmup_enabled():
+                self._warmup_latencies = LatencyHistogram.merge_all(
+                    self.search_in_threads(self.threads_per_process, "warmup")
+                )
+            try:
+                yield
+            finally:
+                self._thread_runners = []
+
+    def _pool_size(self, conc: int) -> int:
+        """number of search processes to run `conc` concurrency"""
+        return math.ceil(conc / self.threads_per_process)
+
+    def _max_concurrency(self) -> int:
+        """largest concurrency of the levels of run(), the adaptive search may stop below it"""
+        rate_ramp = self.target_qps and self.slo_latency is not None
+        return self.adaptive_max_concurrency if self.adaptive and not rate_ramp else max(self.concurrencies)
+
+    def _get_pool(self, conc: int) -> SearchWorkerPool:
+        """Start the search processes on first use, and reuse them for all the following concurrencies
+        up to `conc`. A larger `conc` restarts the pool with more processes."""
+        size = self._pool_size(conc)
+        if self._pool is None or self._pool.closed or self._pool.size < size:
+            self.stop()
+            self._pool = SearchWorkerPool(self, size, self.get_mp_context(), self.concurrency_timeout)
+        return self._pool
+
+    def __getstate__(self) -> dict:
+        # the pool and the thread runners stay in the process that created them
+        state = self.__dict__.copy()
+        state["_pool"] = None
+        state["_thread_runners"] = []
+        return state
+
+    def _levels(self, levels: KneeSearch | None, rates: RateRamp | None) -> Iterator[tuple[int, float | None]]:
+        """(concurrency, open-loop rate) of each level, the rate is None in closed-loop search"""
+        if rates is not None:
+            conc = max(self.concurrencies)
+            if self.adaptive:
+                log.warning(f"The rate ramp runs at concurrency {conc}, adaptive concurrency is ignored")
+            for rate in rates:
+                yield conc, rate
+            return
+
+        for conc in levels if levels is not None else self.concurrencies:
+            yield conc, self.target_qps
+
+    def _over_slo(self, latencies: LatencyHistogram) -> bool:
+        return self.slo_latency is not None and latencies.percentile(self.slo_percentile) > self.slo_latency
+
+    def _rate_ramp(self) -> RateRamp:
+        return RateRamp(start=self.target_qps, latency_budget=self.slo_latency)
+
+    def _collect_warmup_latencies(self, pool: SearchWorkerPool) -> LatencyHistogram:
+        """warm-up latencies of all the pool processes since the last level"""
+        if not self._warmup_enabled():
+            return LatencyHistogram()
+        return LatencyHistogram.merge_all(pool.run_each("pop_warmup_latencies", [()] * pool.size))
+
+    @staticmethod
+    def _warmup_summary(latencies: LatencyHistogram) -> dict[str, float]:
+        if len(latencies) == 0:
+            return {}
+        log.info(f"Warm-up: count={len(latencies)}, p99={latencies.percentile(99)}, max={latencies.max()}")
+        return {
+            "count": len(latencies),
+            "latency_p99": latencies.percentile(99),
+            "latency_p50": latencies.percentile(50),
+            "latency_avg": latencies.mean(),
+            "latency_max": latencies.max(),
+        }
+
+    def _log_level_end(self, conc: int, rate: float | None, cost: float, all_count: int, qps: float, missed: int = 0):
+        if rate:
+            log.info(
+                f"End search in concurrency {conc}: dur={cost}s, total_count={all_count}, "
+                f"achieved qps={qps}, offered qps={rate}, missed={missed}"
+            )
+        else:
+            log.info(f"End search in concurrency {conc}: dur={cost}s, total_count={all_count}, qps={qps}")
+
+    def _knee_search(self) -> KneeSearch:
+        return KneeSearch(
+            start=min(self.concurrencies),
+            max_concurrency=self.adaptive_max_concurrency,
+            min_gain=self.adaptive_min_qps_gain,
+            max_p99=self.adaptive_max_latency_p99,
+        )
 
     @staticmethod
     def get_mp_context():
@@ -102,45 +443,52 @@ class MultiProcessingSearchRunner:
         max_qps = 0
         conc_num_list = []
         conc_qps_list = []
-        conc_latency_p99_list = []
-        conc_latency_p95_list = []
+        conc_latency_lists = {name: [] for name in CONC_LATENCY_PERCENTILES}
         conc_latency_avg_list = []
+        conc_offered_qps_list = []
+        conc_missed_list = []
+        conc_timeline = []
+        warmup_latencies = LatencyHistogram()
+        levels = self._knee_search() if self.adaptive else None
+        rates = self._rate_ramp() if self.target_qps and self.slo_latency is not None else None
         try:
-            for conc in self.concurrencies:
-                with mp.Manager() as m:
-                    q, cond = m.Queue(), m.Condition()
-                    with concurrent.futures.ProcessPoolExecutor(
-                        mp_context=self.get_mp_context(),
-                        max_workers=conc,
-                    ) as executor:
-                        log.info(f"Start search {self.duration}s in concurrency {conc}, filters: {self.filters}")
-                        future_iter = [executor.submit(self.search, self.test_data, q, cond) for i in range(conc)]
-                        # Sync all processes
-                        self._wait_for_queue_fill(q, size=conc)
-
-                        with cond:
-                            cond.notify_all()
-                            log.info(f"Syncing all process and start concurrency search, concurrency={conc}")
-
-                        start = time.perf_counter()
-                        all_count = sum([r.result()[0] for r in future_iter])
-                        latencies = sum([r.result()[2] for r in future_iter], start=[])
-                        latency_p99 = np.percentile(latencies, 99)
-                        latency_p95 = np.percentile(latencies, 95)
-                        latency_avg = np.mean(latencies)
-                        cost = time.perf_counter() - start
-
-                        qps = round(all_count / cost, 4)
-                        conc_num_list.append(conc)
-                        conc_qps_list.append(qps)
-                        conc_latency_p99_list.append(latency_p99)
-                        conc_latency_p95_list.append(latency_p95)
-                        conc_latency_avg_list.append(latency_avg)
-                        log.info(f"End search in concurrency {conc}: dur={cost}s, total_count={all_count}, qps={qps}")
+            for conc, rate in self._levels(levels, rates):
+                # sized once for the largest level, the processes above `conc` are parked
+                pool = self._get_pool(self._max_concurrency())
+                log.info(
+                    f"Start search {self.duration}s in concurrency {conc}, filters: {self.filters}, "
+                    f"target_qps: {rate}"
+                )
+                res, cost = self._timed_search(pool, conc, rate)
+                all_count = sum([r[0] for r in res])
+                latencies = LatencyHistogram.merge_all([r[2] for r in res])
+                timeline = LatencyTimeline.merge_all([r[3] for r in res])
+                warmup_latencies.merge(self._collect_warmup_latencies(pool))
+
+                qps = round(all_count / cost, 4)
+                conc_num_list.append(conc)
+                conc_qps_list.append(qps)
+                for name, percentile in CONC_LATENCY_PERCENTILES.items():
+                    conc_latency_lists[name].append(latencies.percentile(percentile))
+                conc_latency_avg_list.append(latencies.mean())
+                conc_timeline.append(timeline.to_dict())
+                if rate:
+                    conc_offered_qps_list.append(rate)
+                    conc_missed_list.append(sum(r[4] for r in res))
+                self._log_level_end(conc, rate, cost, all_count, qps, conc_missed_list[-1] if rate else 0)
+
+                if levels is not None:
+                    levels.record(conc, qps, latencies.percentile(99))
+                if rates is not None:
+                    rates.record(rate, qps, latencies.percentile(self.slo_percentile))
 
                 if qps > max_qps:
                     max_qps = qps
                     log.info(f"Update largest qps with concurrency {conc}: current max_qps={max_qps}")
+
+                if levels is None and rates is None and self._over_slo(latencies):
+                    log.info(f"Concurrency {conc} breaks the latency SLO, skip the larger concurrencies")
+                    break
         except Exception as e:
             log.warning(
                 f"Fail to search, concurrencies: {self.concurrencies}, max_qps before failure={max_qps}, reason={e}"
@@ -154,24 +502,25 @@ class MultiProcessingSearchRunner:
         finally:
             self.stop()
 
+        conc_knee = (levels.knee or 0) if levels is not None else 0
         return (
             max_qps,
             conc_num_list,
             conc_qps_list,
-            conc_latency_p99_list,
-            conc_latency_p95_list,
+            conc_latency_lists["p99"],
+            conc_latency_lists["p95"],
             conc_latency_avg_list,
+            conc_offered_qps_list,
+            conc_missed_list,
+            conc_latency_lists["p50"],
+            conc_latency_lists["p90"],
+            conc_latency_lists["p999"],
+            conc_latency_lists["p9999"],
+            conc_timeline,
+            conc_knee,
+            self._warmup_summary(warmup_latencies),
         )
 
-    def _wait_for_queue_fill(self, q: Queue, size: int):
-        wait_t = 0
-        while q.qsize() < size:
-            sleep_t = size if size < 10 else 10
-            wait_t += sleep_t
-            if wait_t > self.concurrency_timeout > 0:
-                raise ConcurrencySlotTimeoutError
-            time.sleep(sleep_t)
-
     def run(self) -> float:
         """
         Returns:
@@ -180,58 +529,48 @@ class MultiProcessingSearchRunner:
         return self._run_all_concurrencies_mem_efficient()
 
     def stop(self) -> None:
-        pass
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
 
-    def run_by_dur(self, duration: int) -> tuple[float, float]:
+    def run_by_dur(self, duration: int) -> tuple[float, float, float]:
         """
         Returns:
             float: largest qps
             float: failed rate
+            float: p99 latency of the concurrency with the largest qps
         """
         return self._run_by_dur(duration)
 
-    def _run_by_dur(self, duration: int) -> tuple[float, float]:
+    def _run_by_dur(self, duration: int) -> tuple[float, float, float]:
         """
         Returns:
             float: largest qps
             float: failed rate
+            float: p99 latency of the concurrency with the largest qps
         """
-        max_qps = 0
+        max_qps, max_qps_latency_p99 = 0, 0
         try:
+            # kept across calls, streaming cases search by duration at every stage
+            pool = self._get_pool(max(self.concurrencies))
             for conc in self.concurrencies:
-                with mp.Manager() as m:
-                    q, cond = m.Queue(), m.Condition()
-                    with concurrent.futures.ProcessPoolExecutor(
-                        mp_context=self.get_mp_context(),
-                        max_workers=conc,
-                    ) as executor:
-                        log.info(f"Start search_by_dur {duration}s in concurrency {conc}, filters: {self.filters}")
-                        future_iter = [
-                            executor.submit(self.search_by_dur, duration, self.test_data, q, cond) for i in range(conc)
-                        ]
-                        # Sync all processes
-                        while q.qsize() < conc:
-                            sleep_t = conc if conc < 10 else 10
-                            time.sleep(sleep_t)
-
-                        with cond:
-                            cond.notify_all()
-                            log.info(f"Syncing all process and start concurrency search, concurrency={conc}")
-
-                        start = time.perf_counter()
-                        res = [r.result() for r in future_iter]
-                        all_success_count = sum([r[0] for r in res])
-                        all_failed_count = sum([r[1] for r in res])
-                        failed_rate = all_failed_count / (all_failed_count + all_success_count)
-                        cost = time.perf_counter() - start
-
-                        qps = round(all_success_count / cost, 4)
-                        log.info(
-                            f"End search in concurrency {conc}: dur={cost}s, failed_rate={failed_rate}, "
-                            f"all_success_count={all_success_count}, all_failed_count={all_failed_count}, qps={qps}",
-                        )
+                log.info(f"Start search_by_dur {duration}s in concurrency {conc}, filters: {self.filters}")
+                start = time.perf_counter()
+                res = self._run_in_threads(pool, conc, "search_by_dur", duration)
+                cost = time.perf_counter() - start
+                all_success_count = sum([r[0] for r in res])
+                all_failed_count = sum([r[1] for r in res])
+                failed_rate = all_failed_count / (all_failed_count + all_success_count)
+                latency_p99 = LatencyHistogram.merge_all([r[2] for r in res]).percentile(99)
+
+                qps = round(all_success_count / cost, 4)
+                log.info(
+                    f"End search in concurrency {conc}: dur={cost}s, failed_rate={failed_rate}, "
+                    f"all_success_count={all_success_count}, all_failed_count={all_failed_count}, qps={qps}, "
+                    f"latency_p99={latency_p99}",
+                )
                 if qps > max_qps:
-                    max_qps = qps
+                    max_qps, max_qps_latency_p99 = qps, latency_p99
                     log.info(f"Update largest qps with concurrency {conc}: current max_qps={max_qps}")
         except Exception as e:
             log.warning(
@@ -243,50 +582,45 @@ class MultiProcessingSearchRunner:
             if max_qps == 0.0:
                 raise e from None
 
-        finally:
-            self.stop()
-
-        return max_qps, failed_rate
+        return max_qps, failed_rate, max_qps_latency_p99
 
-    def search_by_dur(self, dur: int, test_data: list[list[float]], q: mp.Queue, cond: mp.Condition) -> tuple[int, int]:
+    def search_by_dur(self, dur: int) -> tuple[int, int, LatencyHistogram]:
         """
         Returns:
             int: successful requests count
             int: failed requests count
+            LatencyHistogram: latencies of successful requests
         """
-        # sync all process
-        q.put(1)
-        with cond:
-            cond.wait()
-
-        with self.db.init():
-            self.db.prepare_filter(self.filters)
-            num, idx = len(test_data), random.randint(0, len(test_data) - 1)
-
-            start_time = time.perf_counter()
-            success_count = 0
-            failed_cnt = 0
-            while time.perf_counter() < start_time + dur:
-                s = time.perf_counter()
-                try:
-                    self.db.search_embedding(test_data[idx], self.k)
-                    success_count += 1
-                except Exception as e:
-                    failed_cnt += 1
-                    # reduce log
-                    if failed_cnt <= 3:
-                        log.warning(f"VectorDB search_embedding error: {e}")
-                    else:
-                        log.debug(f"VectorDB search_embedding error: {e}")
-
-                # loop through the test data
-                idx = idx + 1 if idx < num - 1 else 0
-
-                if success_count % 500 == 0:
-                    log.debug(
-                        f"({mp.current_process().name:16}) search_count: {success_count}, "
-                        f"latest_latency={time.perf_counter()-s}",
-                    )
+        test_data = self.test_data
+        num, idx = len(test_data), random.randint(0, len(test_data) - 1)
+
+        start_time = time.perf_counter()
+        success_count = 0
+        failed_cnt = 0
+        latencies = LatencyHistogram()
+        while time.perf_counter() < start_time + dur:
+            query = self._get_query(test_data, idx)
+            s = time.perf_counter()
+            try:
+                self.db.search_embedding(query, self.k)
+                success_count += 1
+                latencies.record(time.perf_counter() - s)
+            except Exception as e:
+                failed_cnt += 1
+                # reduce log
+                if failed_cnt <= 3:
+                    log.warning(f"VectorDB search_embedding error: {e}")
+                else:
+                    log.debug(f"VectorDB search_embedding error: {e}")
+
+            # loop through the test data
+            idx = idx + 1 if idx < num - 1 else 0
+
+            if success_count % 500 == 0:
+                log.debug(
+                    f"({mp.current_process().name:16}) search_count: {success_count}, "
+                    f"latest_latency={time.perf_counter()-s}",
+                )
 
         total_dur = round(time.perf_counter() - start_time, 4)
         log.debug(
@@ -295,4 +629,4 @@ class MultiProcessingSearchRunner:
             f"qps (successful) in this process: {round(success_count / total_dur, 4):3}",
         )
 
-        return success_count, failed_cnt
+        return success_count, failed_cnt, latencies
@@ -0,0 +1,122 @@
+import logging
+import queue
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+
+class _Done:
+    """end of the source, with the exception raised by it if any"""
+
+    def __init__(self, error: Exception | None = None):
+        self.error = error
+
+
+class Prefetcher:
+    """Items of `source` prepared by `prepare` in a background thread, at most `depth` ready items queued ahead.
+
+    Reading and preparing the next items overlaps with the consumer using the current one. With `depth` 0, the
+    items are read and prepared synchronously by the consumer.
+
+    Args:
+        source(Iterable): items to prepare, e.g. the record batches of a dataset
+        prepare(Callable): called on every item of source, its return values are yielded in order
+        depth(int): largest number of prepared items waiting for the consumer
+
+    Examples:
+        >>> batches = Prefetcher(dataset, prepare_batch, depth=8)
+        >>> for batch in batches:
+        >>>     insert(batch)
+        >>> batches.stats
+    """
+
+    def __init__(self, source: Iterable, prepare: Callable[[Any], Any], depth: int):
+        self.source = source
+        self.prepare = prepare
+        self.depth = max(depth, 0)
+
+        self.count = 0
+        self.prepare_time = 0.0  # reading and preparing the items, in the background thread if depth > 0
+        self.wait_time = 0.0  # the consumer waiting for the next prepared item
+        self._queued_sum = 0  # ready items found in the queue by the consumer, summed over the items
+
+    def _next_prepared(self, items: Iterator) -> Any:
+        s = time.perf_counter()
+        try:
+            item = self.prepare(next(items))
+        finally:
+            self.prepare_time += time.perf_counter() - s
+        return item
+
+    def __iter__(self) -> Iterator[Any]:
+        items = iter(self.source)
+        if self.depth == 0:
+            while True:
+                s = time.perf_counter()
+                try:
+                    item = self._next_prepared(items)
+                except StopIteration:
+                    return
+                self.wait_time += time.perf_counter() - s
+                self.count += 1
+                yield item
+
+        ready, stop = queue.Queue(maxsize=self.depth), threading.Event()
+        thread = threading.Thread(target=self._produce, args=(items, ready, stop), name="prefetch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                self._queued_sum += ready.qsize()
+                s = time.perf_counter()
+                item = ready.get()
+                self.wait_time += time.perf_counter() - s
+                if isinstance(item, _Done):
+                    if item.error is not None:
+                        raise item.error
+                    return
+                self.count += 1
+                yield item
+        finally:
+            # the consumer may stop early, unblock the producer
+            stop.set()
+            thread.join()
+
+    def _produce(self, items: Iterator, ready: queue.Queue, stop: threading.Event):
+        def put(item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+                return True
+            return False
+
+        while True:
+            try:
+                item = self._next_prepared(items)
+            except StopIteration:
+                put(_Done())
+                return
+            except Exception as e:
+                log.warning(f"Prefetch failed: {e}")
+                put(_Done(e))
+                return
+            if not put(item):
+                return
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """{"count": ..., "prepare_time": ..., "wait_time": ..., "queue_depth_avg": ...}, times in seconds.
+
+        wait_time close to prepare_time means the consumer is waiting for the items, the loader is the bottleneck.
+        queue_depth_avg close to depth means the items are ready before the consumer needs them.
+        """
+        return {
+            "count": self.count,
+            "prepare_time": round(self.prepare_time, 4),
+            "wait_time": round(self.wait_time, 4),
+            "queue_depth_avg": round(self._queued_sum / self.count, 4) if self.count > 0 else 0.0,
+        }
@@ -10,11 +10,44 @@ from vectordb_bench.backend.clients import api
 from vectordb_bench.backend.dataset import DataSetIterator
 from vectordb_bench.backend.utils import time_it
 
+from .freshness import FreshnessProbe
+from .histogram import InsertTimeline, LatencyHistogram
 from .util import get_data
 
 log = logging.getLogger(__name__)
 
 
+class TokenBucket:
+    """Paces batches at `rate` batches per second.
+
+    Tokens accrue continuously up to `burst`, one per batch sent: the batches of a second are spaced evenly over it
+    instead of sent together at its start, and after an idle moment, e.g. a slow read of the dataset, up to `burst`
+    batches go back to back to catch up. The bucket starts with one token.
+
+    Examples:
+        >>> bucket = TokenBucket(rate=10, burst=1)
+        >>> time.sleep(bucket.delay())
+        >>> bucket.take()
+    """
+
+    def __init__(self, rate: float, burst: int = 1, start: float | None = None):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = 1.0
+        self.last = time.perf_counter() if start is None else start
+
+    def delay(self, now: float | None = None) -> float:
+        """seconds until the next batch may be sent, 0.0 if it may be sent now"""
+        now = time.perf_counter() if now is None else now
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        return max(1 - self.tokens, 0.0) / self.rate
+
+    def take(self):
+        """a batch is sent"""
+        self.tokens -= 1
+
+
 class RatedMultiThreadingInsertRunner:
     def __init__(
         self,
@@ -23,6 +56,7 @@ class RatedMultiThreadingInsertRunner:
         dataset_iter: DataSetIterator,
         normalize: bool = False,
         timeout: float | None = None,
+        sentinel_id_start: int | None = None,
     ):
         self.timeout = timeout if isinstance(timeout, int | float) else None
         self.dataset = dataset_iter
@@ -30,11 +64,24 @@ class RatedMultiThreadingInsertRunner:
         self.normalize = normalize
         self.insert_rate = rate
         self.batch_rate = rate // config.NUM_PER_BATCH
+        # ids of the freshness sentinels, None or config.FRESHNESS_PROBE_INTERVAL 0 disables the probe
+        self.sentinel_id_start = sentinel_id_start
 
         self.executing_futures = []
         self.sig_idx = 0
 
-    def send_insert_task(self, db: api.VectorDB, emb: list[list[float]], metadata: list[str]):
+    def send_insert_task(
+        self,
+        db: api.VectorDB,
+        emb: list[list[float]],
+        metadata: list[str],
+    ) -> tuple[float, float, int]:
+        """Returns:
+        float: time.perf_counter() when the batch was inserted
+        float: its latency in seconds, retries included
+        int: its number of rows
+        """
+
         def _insert_embeddings(db: api.VectorDB, emb: list[list[float]], metadata: list[str], retry_idx: int = 0):
             _, error = db.insert_embeddings(emb, metadata)
             if error is not None:
@@ -52,34 +99,42 @@ class RatedMultiThreadingInsertRunner:
             #   so we need to copy the db object, make sure each thread has its own connection
             db_copy = deepcopy(db)
             with db_copy.init():
+                s = time.perf_counter()
                 _insert_embeddings(db_copy, emb, metadata, retry_idx=0)
         else:
+            s = time.perf_counter()
             _insert_embeddings(db, emb, metadata, retry_idx=0)
+        end = time.perf_counter()
+        return end, end - s, len(metadata)
 
     @time_it
-    def run_with_rate(self, q: mp.Queue):
+    def run_with_rate(self, q: mp.Queue) -> tuple[LatencyHistogram, InsertTimeline, dict]:  # noqa: PLR0915
+        """Send the batches of the dataset at insert_rate rows/s, paced by a TokenBucket.
+
+        Returns:
+            LatencyHistogram: latency of every insert_embeddings call
+            InsertTimeline: inserted and sent rows/s, batch latencies and backlog per window
+            dict: FreshnessProbe.result(), empty if the probe is disabled
+        """
+        latencies = LatencyHistogram()
         with ThreadPoolExecutor(max_workers=mp.cpu_count()) as executor:
 
-            @time_it
-            def submit_by_rate() -> bool:
-                rate = self.batch_rate
-                for data in self.dataset:
-                    emb, metadata = get_data(data, self.normalize)
-                    self.executing_futures.append(executor.submit(self.send_insert_task, self.db, emb, metadata))
-                    rate -= 1
-
-                    if rate == 0:
-                        return False
-                return rate == self.batch_rate
-
-            def check_and_send_signal(wait_interval: float, finished: bool = False):
+            def check_and_send_signal(
+                wait_interval: float,
+                finished: bool = False,
+                return_when: str = concurrent.futures.FIRST_EXCEPTION,
+            ):
                 try:
                     done, not_done = concurrent.futures.wait(
                         self.executing_futures,
                         timeout=wait_interval,
-                        return_when=concurrent.futures.FIRST_EXCEPTION,
+                        return_when=return_when,
                     )
-                    _ = [fut.result() for fut in done]
+                    # recorded by this thread only, the histograms are not thread-safe
+                    for fut in done:
+                        end, latency, rows = fut.result()
+                        latencies.record(latency)
+                        timeline.record(end, latency, rows)
                     if len(not_done) > 0:
                         self.executing_futures = list(not_done)
                     else:
@@ -99,36 +154,64 @@ class RatedMultiThreadingInsertRunner:
                     executor.shutdown(wait=True, cancel_futures=True)
                     raise e from None
 
-            time_per_batch = config.TIME_PER_BATCH
+            def wait_for(delay: float):
+                """collect the finished batches until `delay` seconds from now"""
+                deadline = time.perf_counter() + delay
+                while (left := deadline - time.perf_counter()) > 0:
+                    if len(self.executing_futures) == 0:
+                        time.sleep(left)
+                    else:
+                        check_and_send_signal(wait_interval=left, return_when=concurrent.futures.FIRST_COMPLETED)
+
             with self.db.init():
                 start_time = time.perf_counter()
-                round_idx = 0
+                timeline = InsertTimeline(start_time)
+                bucket = TokenBucket(self.insert_rate / config.NUM_PER_BATCH, config.STREAMING_INSERT_BURST, start_time)
+                probe = None
+                if self.sentinel_id_start is not None and config.FRESHNESS_PROBE_INTERVAL > 0:
+                    if not self.db.delete_supported:
+                        log.warning(
+                            f"{self.db.name} cannot delete the freshness sentinels, they stay in the collection "
+                            "and may be returned by the searches scored against the ground truth"
+                        )
+                    probe = FreshnessProbe(self.db, start_time, self.sentinel_id_start)
+                    probe.start()
 
-                while True:
-                    if len(self.executing_futures) > 200:
-                        log.warning("Skip data insertion this round. There are 200+ unfinished insertion tasks.")
-                    else:
-                        finished, elapsed_time = submit_by_rate()
-                        if finished is True:
-                            log.info(
-                                f"End of dataset, left unfinished={len(self.executing_futures)}, num_round={round_idx}"
-                            )
-                            break
-                        if elapsed_time >= 1.5:
-                            log.warning(
-                                f"Submit insert tasks took {elapsed_time}s, expected 1s, "
-                                f"indicating potential resource limitations on the client machine.",
-                            )
-
-                    check_and_send_signal(wait_interval=0.001, finished=False)
-                    dur = time.perf_counter() - start_time - round_idx * time_per_batch
-                    if dur < time_per_batch:
-                        time.sleep(time_per_batch - dur)
-                    round_idx += 1
+                for data in self.dataset:
+                    emb, metadata = get_data(data, self.normalize, self.db.ndarray_insert_supported)
+                    if probe is not None and len(emb) > 0:
+                        probe.offer(emb[0])
+                    wait_for(bucket.delay())
+                    while len(self.executing_futures) >= config.STREAMING_MAX_BACKLOG:
+                        check_and_send_signal(wait_interval=1, return_when=concurrent.futures.FIRST_COMPLETED)
+                    bucket.take()
+                    self.executing_futures.append(executor.submit(self.send_insert_task, self.db, emb, metadata))
+                    timeline.record_offered(time.perf_counter(), len(metadata), len(self.executing_futures))
+                    check_and_send_signal(wait_interval=0)
+
+                log.info(
+                    f"End of dataset, left unfinished={len(self.executing_futures)}, "
+                    f"offered rate={round(timeline.offered_rate, 4)} rows/s, target rate={self.insert_rate} rows/s"
+                )
+                if timeline.offered_rate < 0.95 * self.insert_rate:
+                    log.warning(
+                        f"Sent {round(timeline.offered_rate, 4)} rows/s, less than the {self.insert_rate} rows/s "
+                        f"of the case, the insert backlog reached {max(timeline.backlog, default=0)} batches "
+                        f"or the client machine could not read the data fast enough."
+                    )
 
                 # wait for all tasks in executing_futures to complete
                 while len(self.executing_futures) > 0:
                     check_and_send_signal(wait_interval=1, finished=True)
-                    round_idx += 1
+                freshness = {}
+                if probe is not None:
+                    probe.stop()
+                    freshness = probe.result()
+                    log.info(
+                        f"Freshness lag p99={freshness['st_freshness_lag_p99']}s, "
+                        f"p50={freshness['st_freshness_lag_p50']}s, probes={freshness['st_freshness_probe_count']}, "
+                        f"timeouts={freshness['st_freshness_timeout_count']}"
+                    )
 
-                log.info(f"Finish all streaming insertion, num_round={round_idx}")
+                log.info(f"Finish all streaming insertion, achieved rate={round(timeline.achieved_rate, 4)} rows/s")
+        return latencies, timeline, freshness
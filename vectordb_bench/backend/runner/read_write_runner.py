@@ -8,15 +8,20 @@ from collections.abc import Iterable
 
 import numpy as np
 
+from vectordb_bench import config
 from vectordb_bench.backend.clients import api
+from vectordb_bench.backend.clients.api import MetricType
 from vectordb_bench.backend.dataset import DatasetManager
 from vectordb_bench.backend.filter import Filter, non_filter
 from vectordb_bench.backend.utils import time_it
-from vectordb_bench.metric import Metric
+from vectordb_bench.metric import Metric, calc_search_quality, id_matrix
 
+from .ground_truth import ExactTopK
+from .histogram import LatencyHistogram
 from .mp_runner import MultiProcessingSearchRunner
 from .rate_runner import RatedMultiThreadingInsertRunner
 from .serial_runner import SerialSearchRunner
+from .util import get_data
 
 log = logging.getLogger(__name__)
 
@@ -41,9 +46,14 @@ class ReadWriteRunner(MultiProcessingSearchRunner, RatedMultiThreadingInsertRunn
         optimize_after_write: bool = True,
         read_dur_after_write: int = 300,  # seconds, search duration when insertion is done
         timeout: float | None = None,
+        continuous_search: bool = False,  # search all along the insertion instead of at the search stages
+        continuous_search_qps: float = 0,  # open-loop rate of the continuous search, 0 means closed-loop
     ):
         self.insert_rate = insert_rate
         self.data_volume = dataset.data.size
+        self.dataset_manager = dataset
+        self.continuous_search = continuous_search
+        self.continuous_search_qps = continuous_search_qps
 
         for stage in search_stages:
             assert 0.0 <= stage < 1.0, "each search stage should be in [0.0, 1.0)"
@@ -77,6 +87,7 @@ class ReadWriteRunner(MultiProcessingSearchRunner, RatedMultiThreadingInsertRunn
             db=db,
             dataset_iter=iter(dataset),
             normalize=normalize,
+            sentinel_id_start=self.data_volume,
         )
         self.serial_search_runner = SerialSearchRunner(
             db=db,
@@ -98,7 +109,7 @@ class ReadWriteRunner(MultiProcessingSearchRunner, RatedMultiThreadingInsertRunn
         log.info("Search after write - Serial search start")
         test_time = round(time.perf_counter(), 4)
         res, ssearch_dur = self.serial_search_runner.run()
-        recall, ndcg, p99_latency, p95_latency = res
+        recall, ndcg, p99_latency, p95_latency, *_ = res
         log.info(
             f"Search after write - Serial search - recall={recall}, ndcg={ndcg}, "
             f"p99={p99_latency}, p95={p95_latency}, dur={ssearch_dur:.4f}",
@@ -106,19 +117,26 @@ class ReadWriteRunner(MultiProcessingSearchRunner, RatedMultiThreadingInsertRunn
         log.info(
             f"Search after wirte - Conc search start, dur for each conc={self.read_dur_after_write}",
         )
-        max_qps, conc_failed_rate = self.run_by_dur(self.read_dur_after_write)
-        log.info(f"Search after wirte - Conc search finished, max_qps={max_qps}")
+        try:
+            max_qps, conc_failed_rate, conc_p99_latency = self.run_by_dur(self.read_dur_after_write)
+        finally:
+            self.stop()
+        log.info(f"Search after wirte - Conc search finished, max_qps={max_qps}, p99={conc_p99_latency}")
 
-        return [(perc, test_time, max_qps, recall, ndcg, p99_latency, p95_latency, conc_failed_rate)]
+        return [
+            (perc, test_time, max_qps, recall, ndcg, p99_latency, p95_latency, conc_failed_rate, conc_p99_latency),
+        ]
 
-    def run_read_write(self) -> Metric:
+    def run_read_write(self) -> Metric:  # noqa: PLR0915
         """
         Test search performance with a fixed insert rate.
         - Insert requests are sent to VectorDB at a fixed rate within a dedicated insert process pool.
-          - if the database cannot promptly process these requests, the process pool will accumulate insert tasks.
+          - if the database cannot promptly process these requests, the process pool will accumulate insert tasks,
+          up to config.STREAMING_MAX_BACKLOG, then the offered rate drops.
         - Search Tests are categorized into three types:
           - streaming_search: Initiates a new search test upon receiving a signal that the inserted data has
-          reached the search_stage.
+          reached the search_stage. With continuous_search, searches all along the insertion instead, see
+          run_search_continuously.
           - streaming_end_search: initiates a new search test after all data has been inserted.
           - optimized_search (optional): After the streaming_end_search, optimizes and initiates a search test.
         """
@@ -127,12 +145,31 @@ class ReadWriteRunner(MultiProcessingSearchRunner, RatedMultiThreadingInsertRunn
             q = mp_manager.Queue()
             with concurrent.futures.ProcessPoolExecutor(mp_context=mp.get_context("spawn"), max_workers=2) as executor:
                 insert_future = executor.submit(self.run_with_rate, q)
-                streaming_search_future = executor.submit(self.run_search_by_sig, q)
+                run_streaming_search = (
+                    self.run_search_continuously if self.continuous_search else self.run_search_by_sig
+                )
+                streaming_search_future = executor.submit(run_streaming_search, q)
 
                 try:
                     start_time = time.perf_counter()
-                    _, m.insert_duration = insert_future.result()
+                    (insert_latencies, insert_timeline, freshness), m.insert_duration = insert_future.result()
+                    m.insert_latency_p99 = insert_latencies.percentile(99)
+                    m.insert_latency_p95 = insert_latencies.percentile(95)
+                    m.insert_latency_p50 = insert_latencies.percentile(50)
+                    m.insert_timeline = insert_timeline.to_dict()
+                    m.st_offered_insert_rate = round(insert_timeline.offered_rate, 4)
+                    m.st_achieved_insert_rate = round(insert_timeline.achieved_rate, 4)
+                    m.st_max_insert_backlog = max(insert_timeline.backlog, default=0)
+                    for name, value in freshness.items():
+                        setattr(m, name, value)
                     streaming_search_res = streaming_search_future.result()
+                    if self.continuous_search:
+                        m.st_search_timeline = streaming_search_res or {}
+                        if m.st_search_timeline:
+                            m.st_search_timeline["time"] = [
+                                round(t - start_time, 4) for t in m.st_search_timeline["time"]
+                            ]
+                        streaming_search_res = []
                     if streaming_search_res is None:
                         streaming_search_res = []
 
@@ -159,6 +196,7 @@ class ReadWriteRunner(MultiProcessingSearchRunner, RatedMultiThreadingInsertRunn
                     m.st_serial_latency_p99_list = [d[5] for d in r]
                     m.st_serial_latency_p95_list = [d[6] for d in r]
                     m.st_conc_failed_rate_list = [d[7] for d in r]
+                    m.st_conc_latency_p99_list = [d[8] for d in r]
 
                 except Exception as e:
                     log.warning(f"Read and write error: {e}")
@@ -192,6 +230,93 @@ class ReadWriteRunner(MultiProcessingSearchRunner, RatedMultiThreadingInsertRunn
             log.warning(warning_msg)
         return each_conc_search_dur
 
+    def _recall_sample(self) -> tuple[np.ndarray, ExactTopK | None]:
+        """indices of the test queries whose recall is sampled, and their exact neighbors, no rows added yet.
+        None if config.STREAMING_RECALL_QUERIES is 0"""
+        count = min(config.STREAMING_RECALL_QUERIES, len(self.test_data))
+        if count <= 0:
+            return np.empty(0, dtype=np.int64), None
+        sample = np.unique(np.linspace(0, len(self.test_data) - 1, count, dtype=np.int64))
+        queries = np.asarray([self.test_data[i] for i in sample], dtype=np.float32)
+        return sample, ExactTopK(queries, self.k, self.dataset_manager.data.metric_type)
+
+    def run_search_continuously(self, q: mp.Queue) -> dict[str, list[float]] | None:
+        """Search by max(concurrencies) workers from the start to the end of the insertion, in windows of
+        config.STREAMING_SEARCH_WINDOW seconds, closed-loop or open-loop at continuous_search_qps.
+
+        After each window, the progress signals of the insertion are read from q, the exact neighbors of the
+        sampled test queries are updated with the rows inserted since the last window, in the order the insertion
+        reads them, and the sample is searched once for its recall.
+
+        Returns:
+            dict: parallel lists of the windows, "time" is time.perf_counter() at their end, None on abnormal exit
+        """
+        conc = max(self.concurrencies)
+        rate = self.continuous_search_qps or None
+        # the search processes are pickled with it, each search call lasts one window
+        self.duration = config.STREAMING_SEARCH_WINDOW
+        cosine = self.dataset_manager.data.metric_type == MetricType.COSINE
+        sample, top_k = self._recall_sample()
+        batches, gt_rows = iter(self.dataset_manager), 0
+
+        timeline = {
+            "time": [],
+            "inserted_rows": [],
+            "qps": [],
+            "latency_p99": [],
+            "latency_p95": [],
+            "latency_p50": [],
+            "recall": [],
+        }
+        inserted, finished = 0, False
+        log.info(f"Continuous search start, concurrency={conc}, qps={rate}, window={self.duration}s")
+        try:
+            pool = self._get_pool(conc)
+            with self.db.init():
+                self.db.prepare_filter(self.filters)
+                while not finished:
+                    start = time.perf_counter()
+                    res = self._run_search(pool, conc, rate)
+                    end = time.perf_counter()
+                    latencies = LatencyHistogram.merge_all([r[2] for r in res])
+
+                    while not q.empty():
+                        sig = q.get(block=True)
+                        if sig is None:
+                            log.warning(f"Abnormal exit, inserted rows={inserted}")
+                            return None
+                        if sig is True:
+                            inserted, finished = self.data_volume, True
+                        else:
+                            # one signal per insert_rate rows inserted
+                            inserted = min(inserted + self.insert_rate, self.data_volume)
+
+                    recall = 0.0
+                    if top_k is not None and inserted > 0:
+                        while gt_rows < inserted and (data := next(batches, None)) is not None:
+                            emb, rows = get_data(data, normalize=cosine, ndarray=True)
+                            top_k.add(emb, rows)
+                            gt_rows += len(rows)
+                        results = [self.db.search_embedding(self._get_query(self.test_data, i), self.k) for i in sample]
+                        recall = calc_search_quality(
+                            id_matrix(results, self.k), id_matrix(top_k.result(), self.k), self.k
+                        )["recall"]
+
+                    timeline["time"].append(end)
+                    timeline["inserted_rows"].append(inserted)
+                    timeline["qps"].append(round(sum(r[0] for r in res) / (end - start), 4))
+                    timeline["latency_p99"].append(latencies.percentile(99))
+                    timeline["latency_p95"].append(latencies.percentile(95))
+                    timeline["latency_p50"].append(latencies.percentile(50))
+                    timeline["recall"].append(round(recall, 4))
+                    log.info(
+                        f"Continuous search - inserted={inserted}/{self.data_volume}, qps={timeline['qps'][-1]}, "
+                        f"p99={timeline['latency_p99'][-1]}, recall={timeline['recall'][-1]}"
+                    )
+        finally:
+            self.stop()
+        return timeline
+
     def run_search_by_sig(self, q: mp.Queue):
         """
         Args:
@@ -221,16 +346,17 @@ class ReadWriteRunner(MultiProcessingSearchRunner, RatedMultiThreadingInsertRunn
             got = wait_next_target(start_batch, target_batch)
             if got is False:
                 log.warning(f"Abnormal exit, target_batch={target_batch}, start_batch={start_batch}")
+                self.stop()
                 return None
 
             log.info(f"Insert {perc}% done, total batch={total_batch}")
             test_time = round(time.perf_counter(), 4)
-            max_qps, recall, ndcg, p99_latency, p95_latency, conc_failed_rate = 0, 0, 0, 0, 0, 0
+            max_qps, recall, ndcg, p99_latency, p95_latency, conc_failed_rate, conc_p99_latency = 0, 0, 0, 0, 0, 0, 0
             try:
                 log.info(f"[{target_batch}/{total_batch}] Serial search - {perc}% start")
                 res, ssearch_dur = self.serial_search_runner.run()
                 ssearch_dur = round(ssearch_dur, 4)
-                recall, ndcg, p99_latency, p95_latency = res
+                recall, ndcg, p99_latency, p95_latency, *_ = res
                 log.info(
                     f"[{target_batch}/{total_batch}] Serial search - {perc}% done, "
                     f"recall={recall}, ndcg={ndcg}, p99={p99_latency}, p95={p95_latency}, dur={ssearch_dur}"
@@ -246,14 +372,19 @@ class ReadWriteRunner(MultiProcessingSearchRunner, RatedMultiThreadingInsertRunn
                         f"[{target_batch}/{total_batch}] Concurrent search - {perc}% start, "
                         f"dur={each_conc_search_dur:.4f}"
                     )
-                    max_qps, conc_failed_rate = self.run_by_dur(each_conc_search_dur)
+                    max_qps, conc_failed_rate, conc_p99_latency = self.run_by_dur(each_conc_search_dur)
                 else:
                     log.warning(f"Skip concurrent tests, each_conc_search_dur={each_conc_search_dur} less than 10s.")
             except Exception as e:
                 log.warning(f"Streaming Search Failed at stage={stage}. Exception: {e}")
-            result.append((perc, test_time, max_qps, recall, ndcg, p99_latency, p95_latency, conc_failed_rate))
+            result.append(
+                (perc, test_time, max_qps, recall, ndcg, p99_latency, p95_latency, conc_failed_rate, conc_p99_latency),
+            )
             start_batch = target_batch
 
+        # search processes are reused by all the stages
+        self.stop()
+
         # Drain the queue
         while q.empty() is False:
             q.get(block=True)
@@ -0,0 +1,131 @@
+import json
+import logging
+import pathlib
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ...metric import calc_search_quality, id_matrix
+
+log = logging.getLogger(__name__)
+
+# queries per row group, a large result matrix is written and read in columnar chunks of this many rows
+ROW_GROUP_SIZE = 1000
+METADATA_KEY = b"vectordb_bench"
+
+
+def write_search_results(
+    path: pathlib.Path,
+    result_ids: np.ndarray,
+    latencies: np.ndarray,
+    metadata: dict,
+) -> None:
+    """Write the per-query result ids and latencies of a serial search to a zstd compressed Parquet file.
+
+    Each row group is built from a slice of the matrices without copying them into python objects.
+
+    Args:
+        path(pathlib.Path): Parquet file to write, its parent directory is created if missing
+        result_ids(np.ndarray): int64 result ids of shape (queries, k), padded with -1
+        latencies(np.ndarray): latency of each query in seconds
+        metadata(dict): json serializable, stored in the file schema, e.g. k and the ground truth file
+    """
+    k = result_ids.shape[1]
+    schema = pa.schema(
+        [("query_idx", pa.int64()), ("ids", pa.list_(pa.int64(), k)), ("latency", pa.float64())],
+        metadata={METADATA_KEY: json.dumps(metadata)},
+    )
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for start in range(0, len(result_ids), ROW_GROUP_SIZE):
+            ids = np.ascontiguousarray(result_ids[start : start + ROW_GROUP_SIZE], dtype=np.int64)
+            batch = pa.record_batch(
+                [
+                    pa.array(np.arange(start, start + len(ids), dtype=np.int64)),
+                    pa.FixedSizeListArray.from_arrays(pa.array(ids.ravel()), k),
+                    pa.array(latencies[start : start + len(ids)], type=pa.float64()),
+                ],
+                schema=schema,
+            )
+            writer.write_batch(batch)
+    log.info(f"Write {len(result_ids)} search results to {path}")
+
+
+def read_search_results(path: pathlib.Path) -> tuple[np.ndarray, np.ndarray, dict]:
+    """Read a file of write_search_results back, row group by row group.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, dict]: result_ids of shape (queries, k), latencies, metadata
+    """
+    file = pq.ParquetFile(path)
+    metadata = json.loads(file.schema_arrow.metadata[METADATA_KEY])
+    k = file.schema_arrow.field("ids").type.list_size
+    num = file.metadata.num_rows
+
+    result_ids = np.empty((num, k), dtype=np.int64)
+    latencies = np.empty(num, dtype=np.float64)
+    for batch in file.iter_batches(batch_size=ROW_GROUP_SIZE):
+        query_idx = batch.column("query_idx").to_numpy()
+        result_ids[query_idx] = batch.column("ids").flatten().to_numpy().reshape(-1, k)
+        latencies[query_idx] = batch.column("latency").to_numpy()
+    return result_ids, latencies, metadata
+
+
+def rescore(
+    path: pathlib.Path,
+    ground_truth: pathlib.Path | None = None,
+    k: int | None = None,
+    k_list: list[int] | None = None,
+    compare: pathlib.Path | None = None,
+) -> dict:
+    """Recompute the search quality of a file of write_search_results.
+
+    Args:
+        path(pathlib.Path): the search results file
+        ground_truth(pathlib.Path | None): Parquet file of the ground truth neighbors, the one of the benchmark
+            run if None
+        k(int | None): score at this k, the k of the benchmark run if None
+        k_list(list[int] | None): also score at each of these k
+        compare(pathlib.Path | None): search results of another run of the same queries, e.g. another db, the
+            overlap@k of the two is added
+
+    Returns:
+        dict: {"k": ..., "recall": ..., "ndcg": ..., "mrr": ..., "precision": ..., "latency_p99": ...,
+            "quality_at_k": {...}, "overlap": ...}
+    """
+    result_ids, latencies, metadata = read_search_results(path)
+    k = k or metadata["k"]
+    k_list = sorted(set(k_list or []))
+    # result ids are padded with -1 above the searched k, scoring there would lower the recall
+    too_large = [v for v in [k, *k_list] if v > result_ids.shape[1]]
+    if too_large:
+        msg = f"k values {too_large} exceed the {result_ids.shape[1]} results per query of {path}"
+        raise ValueError(msg)
+    gt_file = ground_truth or pathlib.Path(metadata["ground_truth"])
+    gt_neighbors_field = metadata.get("gt_neighbors_field", "neighbors_id")
+
+    log.info(f"Rescore {len(result_ids)} search results of {path} against {gt_file}")
+    gt_ids = id_matrix(pl.read_parquet(gt_file)[gt_neighbors_field].to_list(), max([k, *k_list]))
+    if len(gt_ids) < len(result_ids):
+        msg = f"ground truth {gt_file} has {len(gt_ids)} queries, fewer than the {len(result_ids)} search results"
+        raise ValueError(msg)
+    gt_ids = gt_ids[: len(result_ids)]
+
+    scores = {"k": k, **{name: round(v, 4) for name, v in calc_search_quality(result_ids, gt_ids, k).items()}}
+    for p in (50, 90, 95, 99):
+        scores[f"latency_p{p}"] = round(float(np.percentile(latencies, p)), 4)
+    scores["quality_at_k"] = {
+        str(at_k): {name: round(v, 4) for name, v in calc_search_quality(result_ids, gt_ids, at_k).items()}
+        for at_k in k_list
+    }
+    if compare is not None:
+        other_ids, _, _ = read_search_results(compare)
+        if len(other_ids) != len(result_ids):
+            msg = f"{compare} has {len(other_ids)} search results, {path} has {len(result_ids)}"
+            raise ValueError(msg)
+        # share of the results of path also returned by the other run, the other run taken as ground truth
+        scores["overlap"] = round(calc_search_quality(result_ids, other_ids, k)["recall"], 4)
+    return scores
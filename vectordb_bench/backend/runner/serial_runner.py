@@ -1,21 +1,29 @@
 import concurrent
+import contextlib
 import logging
 import math
 import multiprocessing as mp
+import pathlib
 import time
 import traceback
 
 import numpy as np
+import pandas as pd
 import psutil
 
-from vectordb_bench.backend.dataset import DatasetManager
+from vectordb_bench.backend.dataset import DataSetIterator, DatasetManager
 from vectordb_bench.backend.filter import Filter, FilterOp, non_filter
 
 from ... import config
-from ...metric import calc_ndcg, calc_recall, get_ideal_dcg
+from ...metric import calc_search_quality, id_matrix
 from ...models import LoadTimeoutError, PerformanceTimeoutError
 from .. import utils
 from ..clients import api
+from .checkpoint import LoadCheckpoint
+from .histogram import InsertTimeline, LatencyHistogram
+from .prefetch import Prefetcher
+from .search_results import write_search_results
+from .util import prepare_embeddings
 
 NUM_PER_BATCH = config.NUM_PER_BATCH
 LOAD_MAX_TRY_COUNT = config.LOAD_MAX_TRY_COUNT
@@ -31,12 +39,38 @@ class SerialInsertRunner:
         normalize: bool,
         filters: Filter = non_filter,
         timeout: float | None = None,
+        workers: int = 1,
+        calibrate_batch_size: bool = False,
+        checkpoint: LoadCheckpoint | None = None,
     ):
         self.timeout = timeout if isinstance(timeout, int | float) else None
         self.dataset = dataset
         self.db = db
         self.normalize = normalize
         self.filters = filters
+        # processes inserting disjoint row groups of the train files, each with its own db.init() connection
+        self.workers = max(workers, 1)
+        # rows/s of each process, set by _insert_all_batches
+        self.worker_throughputs: list[float] = []
+        # seconds spent reading and preparing the batches, waiting for them and inserting them, set by task
+        self.prefetch_stats: dict[str, float] = {}
+        # sweep the batch sizes on the first train rows before the load, and load the rest in the fastest one
+        self.calibrate_batch_size = calibrate_batch_size
+        # rows per insert_embeddings call of the load
+        self.batch_size = config.NUM_PER_BATCH
+        # rows/s of each batch size of the calibration, set by calibrate
+        self.batch_calibration: dict[str, float] = {}
+        # ids inserted by the calibration, skipped by the load
+        self._calibrated_ids: np.ndarray | None = None
+        # progress of the load saved for --resume-load, an earlier run is continued if it has a state
+        self.checkpoint = checkpoint
+        # rows and insert seconds of the earlier runs, if the load was resumed from the checkpoint
+        self.resumed: dict[str, float] = {}
+        # latency of every insert_embeddings call, and rows/s and latencies per window, set by task
+        self.insert_latencies = LatencyHistogram()
+        self.insert_timeline: InsertTimeline | None = None
+        # time.perf_counter() when the load processes started, the start of their timelines
+        self._load_start: float | None = None
 
     def retry_insert(self, db: api.VectorDB, retry_idx: int = 0, **kwargs):
         _, error = db.insert_embeddings(**kwargs)
@@ -50,30 +84,73 @@ class SerialInsertRunner:
                 msg = f"Insert failed and retried more than {config.MAX_INSERT_RETRY} times"
                 raise RuntimeError(msg) from None
 
-    def task(self) -> int:
-        count = 0
-        with self.db.init():
-            log.info(f"({mp.current_process().name:16}) Start inserting embeddings in batch {config.NUM_PER_BATCH}")
-            start = time.perf_counter()
-            for data_df in self.dataset:
-                all_metadata = data_df[self.dataset.data.train_id_field].tolist()
+    def _prepare_batch(
+        self,
+        data_df: pd.DataFrame,
+    ) -> tuple[list[int] | np.ndarray, list[list[float]] | np.ndarray, list | None]:
+        """ids, embeddings normalized if needed, and labels of one record batch, ready to insert.
+        The ids and embeddings are int64 and float32 arrays if the client has ndarray_insert_supported."""
+        ids = data_df[self.dataset.data.train_id_field]
+        ndarray = self.db.ndarray_insert_supported
+        all_metadata = ids.to_numpy(dtype=np.int64) if ndarray else ids.tolist()
+        all_embeddings = prepare_embeddings(
+            np.stack(data_df[self.dataset.data.train_vector_field]),
+            self.normalize,
+            ndarray,
+        )
+        log.debug(f"batch dataset size: {len(all_embeddings)}, {len(all_metadata)}")
 
-                emb_np = np.stack(data_df[self.dataset.data.train_vector_field])
-                if self.normalize:
-                    log.debug("normalize the 100k train data")
-                    all_embeddings = (emb_np / np.linalg.norm(emb_np, axis=1)[:, np.newaxis]).tolist()
-                else:
-                    all_embeddings = emb_np.tolist()
-                del emb_np
-                log.debug(f"batch dataset size: {len(all_embeddings)}, {len(all_metadata)}")
-
-                labels_data = None
-                if self.filters.type == FilterOp.StrEqual:
-                    if self.dataset.data.scalar_labels_file_separated:
-                        labels_data = self.dataset.scalar_labels[self.filters.label_field][all_metadata].to_list()
-                    else:
-                        labels_data = data_df[self.filters.label_field].tolist()
+        labels_data = None
+        if self.filters.type == FilterOp.StrEqual:
+            if self.dataset.data.scalar_labels_file_separated:
+                labels_data = self.dataset.scalar_labels[self.filters.label_field][all_metadata].to_list()
+            else:
+                labels_data = data_df[self.filters.label_field].tolist()
+        return all_metadata, all_embeddings, labels_data
 
+    def _prepare_load_batch(
+        self,
+        data_df: pd.DataFrame,
+    ) -> tuple[int, list[int] | np.ndarray, list[list[float]] | np.ndarray, list | None]:
+        """rows read, and the prepared batch without the rows already inserted by calibrate, maybe empty"""
+        rows = len(data_df)
+        if self._calibrated_ids is not None:
+            data_df = data_df[~data_df[self.dataset.data.train_id_field].isin(self._calibrated_ids)]
+            if len(data_df) == 0:
+                return rows, [], [], None
+        return rows, *self._prepare_batch(data_df)
+
+    def task(self, worker: int = 0, workers: int = 1) -> int:
+        """Insert the train data, only the row groups of partition `worker` if `workers` > 1.
+
+        The record batches are read and prepared by a Prefetcher of config.LOAD_PREFETCH_DEPTH batches, its stats
+        and the time spent inserting are kept in self.prefetch_stats, the latency of every batch in
+        self.insert_latencies and self.insert_timeline.
+        With a checkpoint, the rows of the partition acknowledged in an earlier run are skipped, and the progress
+        is saved after every acknowledged batch, so that a resumed load sends no row twice.
+
+        Returns:
+            int: the number of rows inserted by this call
+        """
+        saved = {"rows": 0, "count": 0, "duration": 0.0} if self.checkpoint is None else self.checkpoint.worker(worker)
+        rows, count, insert_time = saved["rows"], 0, 0.0
+        dataset = DataSetIterator(self.dataset, worker, workers, batch_size=self.batch_size, skip_rows=rows)
+        batches = Prefetcher(dataset, self._prepare_load_batch, config.LOAD_PREFETCH_DEPTH)
+
+        def save_checkpoint():
+            duration = saved["duration"] + time.perf_counter() - start
+            self.checkpoint.save_worker(worker, rows, saved["count"] + count, duration)
+
+        with self.db.init():
+            log.info(f"({mp.current_process().name:16}) Start inserting embeddings in batch {self.batch_size}")
+            start = time.perf_counter()
+            self.insert_latencies = LatencyHistogram()
+            self.insert_timeline = InsertTimeline(self._load_start or start)
+            for batch_rows, all_metadata, all_embeddings, labels_data in batches:
+                rows += batch_rows
+                if len(all_metadata) == 0:
+                    continue
+                s = time.perf_counter()
                 insert_count, error = self.db.insert_embeddings(
                     embeddings=all_embeddings,
                     metadata=all_metadata,
@@ -86,22 +163,137 @@ class SerialInsertRunner:
                         metadata=all_metadata,
                         labels_data=labels_data,
                     )
+                end = time.perf_counter()
+                insert_time += end - s
+                self.insert_latencies.record(end - s)
+                self.insert_timeline.record(end, end - s, len(all_metadata))
 
                 assert insert_count == len(all_metadata)
                 count += insert_count
                 if count % 100_000 == 0:
                     log.info(f"({mp.current_process().name:16}) Loaded {count} embeddings into VectorDB")
+                if self.checkpoint is not None:
+                    save_checkpoint()
 
+            if self.checkpoint is not None:
+                save_checkpoint()
+            self.prefetch_stats = {**batches.stats, "insert_time": round(insert_time, 4)}
             log.info(
                 f"({mp.current_process().name:16}) Finish loading all dataset into VectorDB, "
-                f"dur={time.perf_counter() - start}"
+                f"dur={time.perf_counter() - start}, prefetch: {self.prefetch_stats}"
             )
             return count
 
-    def endless_insert_data(self, all_embeddings: list, all_metadata: list, left_id: int = 0) -> int:
+    def _calibration_sizes(self) -> list[int]:
+        sizes, size = [], max(config.LOAD_CALIBRATION_MIN_BATCH_SIZE, 1)
+        while size <= config.LOAD_CALIBRATION_MAX_BATCH_SIZE:
+            sizes.append(size)
+            size *= 2
+        return sizes
+
+    def calibrate(self) -> int:
+        """Time the insert throughput of a geometric sweep of batch sizes on the first train rows, and keep the
+        fastest size as self.batch_size for the load.
+
+        Every size inserts config.LOAD_CALIBRATION_BATCHES batches of its own rows out of a sample of at most
+        config.LOAD_CALIBRATION_ROWS rows, half the dataset at most. These rows are part of the load and are
+        skipped by task. The sweep stops when the sample runs out, or after two sizes in a row slower than the
+        best one. With load_concurrency > 1, the sizes are still timed on one connection.
+
+        Returns:
+            int: the number of rows inserted
+        """
+        sample_rows = min(config.LOAD_CALIBRATION_ROWS, self.dataset.data.size // 2)
+        sample = next(DataSetIterator(self.dataset, batch_size=max(sample_rows, 1)), None)
+        if sample is None or sample_rows == 0:
+            return 0
+        all_metadata, all_embeddings, labels_data = self._prepare_batch(sample)
+        del sample
+
+        def insert(start: int, end: int):
+            kwargs = {
+                "embeddings": all_embeddings[start:end],
+                "metadata": all_metadata[start:end],
+                "labels_data": None if labels_data is None else labels_data[start:end],
+            }
+            _, error = self.db.insert_embeddings(**kwargs)
+            if error is not None:
+                self.retry_insert(self.db, **kwargs)
+
+        sizes = self._calibration_sizes()
+        best_size, best, slower = self.batch_size, 0.0, 0
+        with self.db.init():
+            # untimed, the first insert may also create the collection or warm up the connection
+            offset = min(sizes[0], len(all_metadata))
+            insert(0, offset)
+            for size in sizes:
+                rows = size * config.LOAD_CALIBRATION_BATCHES
+                if offset + rows > len(all_metadata):
+                    break
+                s = time.perf_counter()
+                for start in range(offset, offset + rows, size):
+                    insert(start, start + size)
+                throughput = rows / (time.perf_counter() - s)
+                self.batch_calibration[str(size)] = round(throughput, 4)
+                offset += rows
+
+                if throughput > best:
+                    best_size, best, slower = size, throughput, 0
+                else:
+                    slower += 1
+                    if slower >= 2:
+                        break
+
+        self.batch_size = best_size
+        self._calibrated_ids = np.asarray(all_metadata[:offset], dtype=np.int64)
+        log.info(
+            f"Calibrated the insert batch size on {offset} rows, batch_size={self.batch_size}, "
+            f"rows/s of each batch size: {self.batch_calibration}"
+        )
+        return offset
+
+    def _start_load(self) -> int:
+        """Calibrate the batch size if needed and start the checkpoint, or take the batch size and the calibration
+        of the earlier run if the checkpoint has a state.
+
+        Returns:
+            int: the number of rows already inserted, by the calibration or the earlier runs
+        """
+        if self.checkpoint is not None and self.checkpoint.state:
+            state = self.checkpoint.state
+            self.batch_size = state["batch_size"]
+            self.batch_calibration = state["batch_calibration"]
+            if state["calibrated"] > 0:
+                # calibrate inserted the first rows of the first train file
+                first = next(DataSetIterator(self.dataset, batch_size=state["calibrated"]))
+                self._calibrated_ids = first[self.dataset.data.train_id_field].to_numpy(dtype=np.int64)
+            self.resumed = {"count": self.checkpoint.count, "duration": round(self.checkpoint.duration, 4)}
+            log.info(f"Resume the load from checkpoint {self.checkpoint.path}: {self.resumed}")
+            return self.checkpoint.count
+
+        start = time.perf_counter()
+        calibrated = self.calibrate() if self.calibrate_batch_size else 0
+        if self.checkpoint is not None:
+            self.checkpoint.start(
+                batch_size=self.batch_size,
+                batch_calibration=self.batch_calibration,
+                calibrated=calibrated,
+                calibration_duration=round(time.perf_counter() - start, 4),
+            )
+        return calibrated
+
+    def endless_insert_data(
+        self,
+        all_embeddings: list | np.ndarray,
+        all_metadata: list | np.ndarray,
+        left_id: int = 0,
+    ) -> int:
         with self.db.init():
             # unique id for endlessness insertion
-            all_metadata = [i + left_id for i in all_metadata]
+            if isinstance(all_metadata, np.ndarray):
+                all_metadata = all_metadata + left_id
+            else:
+                all_metadata = [i + left_id for i in all_metadata]
 
             num_batches = math.ceil(len(all_embeddings) / NUM_PER_BATCH)
             log.info(
@@ -147,36 +339,77 @@ class SerialInsertRunner:
             )
         return count
 
+    def _worker_task(
+        self,
+        worker: int,
+        workers: int,
+    ) -> tuple[int, float, dict[str, float], LatencyHistogram, InsertTimeline]:
+        start = time.perf_counter()
+        count = self.task(worker, workers)
+        return count, time.perf_counter() - start, self.prefetch_stats, self.insert_latencies, self.insert_timeline
+
+    @staticmethod
+    def _kill_workers(executor: concurrent.futures.ProcessPoolExecutor):
+        for pid in list(executor._processes):
+            with contextlib.suppress(psutil.NoSuchProcess):
+                psutil.Process(pid).kill()
+
     @utils.time_it
     def _insert_all_batches(self) -> int:
-        """Performance case only"""
+        """Performance case only, insert by `workers` processes in parallel, after calibrate if calibrate_batch_size
+
+        Returns:
+            int: the number of rows in the db, including the rows of the earlier runs if resumed
+        """
+        inserted = self._start_load()
+        # perf_counter is system-wide, the timelines of the processes share this start
+        self._load_start = time.perf_counter()
         with concurrent.futures.ProcessPoolExecutor(
             mp_context=mp.get_context("spawn"),
-            max_workers=1,
+            max_workers=self.workers,
         ) as executor:
-            future = executor.submit(self.task)
+            futures = [executor.submit(self._worker_task, i, self.workers) for i in range(self.workers)]
+            deadline = None if self.timeout is None else time.perf_counter() + self.timeout
             try:
-                count = future.result(timeout=self.timeout)
+                results = [
+                    f.result(timeout=None if deadline is None else max(deadline - time.perf_counter(), 0))
+                    for f in futures
+                ]
             except TimeoutError as e:
                 msg = f"VectorDB load dataset timeout in {self.timeout}"
                 log.warning(msg)
-                for pid, _ in executor._processes.items():
-                    psutil.Process(pid).kill()
+                self._kill_workers(executor)
                 raise PerformanceTimeoutError(msg) from e
             except Exception as e:
                 log.warning(f"VectorDB load dataset error: {e}")
+                # the other processes would keep inserting
+                self._kill_workers(executor)
                 raise e from e
-            else:
-                return count
+
+        count = inserted + sum(r[0] for r in results)
+        self.worker_throughputs = [round(c / dur, 4) if dur > 0 else 0.0 for c, dur, *_ in results]
+        # summed over the processes, but the average queue depth
+        self.prefetch_stats = {name: round(sum(r[2][name] for r in results), 4) for name in results[0][2]}
+        self.prefetch_stats["queue_depth_avg"] = round(self.prefetch_stats["queue_depth_avg"] / len(results), 4)
+        self.insert_latencies = LatencyHistogram.merge_all([r[3] for r in results])
+        self.insert_timeline = InsertTimeline.merge_all([r[4] for r in results])
+        if self.workers > 1:
+            log.info(
+                f"Loaded {count} embeddings by {self.workers} processes, "
+                f"insert throughput of each process: {self.worker_throughputs}"
+            )
+        return count
 
     def run_endlessness(self) -> int:
         """run forever util DB raises exception or crash"""
         # datasets for load tests are quite small, can fit into memory
         # only 1 file
         data_df = next(iter(self.dataset))
+        ids = data_df[self.dataset.data.train_id_field]
+        ndarray = self.db.ndarray_insert_supported
         all_embeddings, all_metadata = (
-            np.stack(data_df[self.dataset.data.train_vector_field]).tolist(),
-            data_df[self.dataset.data.train_id_field].tolist(),
+            prepare_embeddings(np.stack(data_df[self.dataset.data.train_vector_field]), False, ndarray),
+            ids.to_numpy(dtype=np.int64) if ndarray else ids.tolist(),
         )
 
         start_time = time.perf_counter()
@@ -208,6 +441,21 @@ class SerialInsertRunner:
         count, _ = self._insert_all_batches()
         return count
 
+    @property
+    def load_metrics(self) -> dict:
+        """The Metric fields of the load after run, besides its count and duration"""
+        return {
+            "insert_worker_throughput_list": self.worker_throughputs,
+            "insert_prefetch": self.prefetch_stats,
+            "insert_batch_size": self.batch_size,
+            "insert_batch_calibration": self.batch_calibration,
+            "insert_resumed": self.resumed,
+            "insert_latency_p99": self.insert_latencies.percentile(99),
+            "insert_latency_p95": self.insert_latencies.percentile(95),
+            "insert_latency_p50": self.insert_latencies.percentile(50),
+            "insert_timeline": {} if self.insert_timeline is None else self.insert_timeline.to_dict(),
+        }
+
 
 class SerialSearchRunner:
     def __init__(
@@ -217,10 +465,29 @@ class SerialSearchRunner:
         ground_truth: list[list[int]],
         k: int = 100,
         filters: Filter = non_filter,
+        batch_size: int = 1,
+        k_list: list[int] | None = None,
+        results_file: pathlib.Path | None = None,
+        results_metadata: dict | None = None,
     ):
         self.db = db
         self.k = k
         self.filters = filters
+        # queries per request, batch search by db.search_embeddings if larger than 1
+        self.batch_size = max(batch_size, 1)
+        # also score at each of these k, searching max(k, *k_list) results once, the latencies are of that search
+        self.k_list = sorted(set(k_list or []))
+        self.search_k = max([k, *self.k_list])
+        if ground_truth and self.k_list:
+            # the ground truth is padded with -1 above its width, which would lower the recall at those k
+            gt_width = min(len(ids) for ids in ground_truth)
+            too_large = [v for v in self.k_list if v > gt_width]
+            if too_large:
+                msg = f"k_list values {too_large} exceed the ground truth width {gt_width}"
+                raise ValueError(msg)
+        # write the per-query result ids and latencies to this Parquet file, with results_metadata in its schema
+        self.results_file = results_file
+        self.results_metadata = results_metadata or {}
 
         if isinstance(test_data[0], np.ndarray):
             self.test_data = [query.tolist() for query in test_data]
@@ -228,9 +495,12 @@ class SerialSearchRunner:
             self.test_data = test_data
         self.ground_truth = ground_truth
 
-    def _get_db_search_res(self, emb: list[float], retry_idx: int = 0) -> list[int]:
+    def _get_db_search_res(self, emb: list[float] | np.ndarray, retry_idx: int = 0) -> list[int] | list[list[int]]:
         try:
-            results = self.db.search_embedding(emb, self.k)
+            if self.batch_size > 1:
+                results = self.db.search_embeddings(emb, self.search_k)
+            else:
+                results = self.db.search_embedding(emb, self.search_k)
         except Exception as e:
             log.warning(f"Serial search failed, retry_idx={retry_idx}, Exception: {e}")
             if retry_idx < config.MAX_SEARCH_RETRY:
@@ -241,66 +511,123 @@ class SerialSearchRunner:
 
         return results
 
-    def search(self, args: tuple[list, list[list[int]]]) -> tuple[float, float, float, float]:
+    def search(
+        self,
+        args: tuple[list, list[list[int]]],
+    ) -> tuple[float, float, float, float, dict, float, float, dict]:
+        """Search the entire test data once, batch_size queries per request.
+
+        The result ids are only collected while searching, all of them are scored after the last query. With
+        k_list, max(k, *k_list) results are searched, and the scores at k and at every k of k_list are computed
+        from the top results of the same search, whose latencies are the ones returned. With results_file, the
+        result ids and per-query latencies are written to it after scoring.
+
+        Returns:
+            tuple[float, float, float, float, dict, float, float, dict]: avg_recall, avg_ndcg, p99 and p95 of
+                the per-query latency, in batch mode the per-request latencies and vectors/s, avg_mrr,
+                avg_precision, then the scores at each k of k_list: {"1": {"recall": ..., "ndcg": ...}, ...}.
+                Latencies are per request in the batch dict while the per-query latency is the request latency
+                divided by its queries
+        """
         log.info(f"{mp.current_process().name:14} start search the entire test_data to get recall and latency")
         with self.db.init():
             self.db.prepare_filter(self.filters)
             test_data, ground_truth = args
-            ideal_dcg = get_ideal_dcg(self.k)
 
             log.debug(f"test dataset size: {len(test_data)}")
             log.debug(f"ground truth size: {len(ground_truth)}")
 
-            latencies, recalls, ndcgs = [], [], []
-            for idx, emb in enumerate(test_data):
+            latencies, batch_latencies = LatencyHistogram(), LatencyHistogram()
+            result_ids = np.full((len(test_data), self.search_k), -1, dtype=np.int64)
+            query_latencies = np.zeros(len(test_data), dtype=np.float64)
+            for start in range(0, len(test_data), self.batch_size):
+                if self.batch_size > 1:
+                    emb = np.asarray(test_data[start : start + self.batch_size], dtype=np.float32)
+                else:
+                    emb = test_data[start]
                 s = time.perf_counter()
                 try:
-                    results = self._get_db_search_res(emb)
+                    batch_results = self._get_db_search_res(emb)
                 except Exception as e:
                     log.warning(f"VectorDB search_embedding error: {e}")
                     raise e from None
 
-                latencies.append(time.perf_counter() - s)
+                latency = time.perf_counter() - s
+                batch_latencies.record(latency)
+                if self.batch_size == 1:
+                    batch_results = [batch_results]
 
-                if ground_truth is not None:
-                    gt = ground_truth[idx]
-                    recalls.append(calc_recall(self.k, gt[: self.k], results))
-                    ndcgs.append(calc_ndcg(gt[: self.k], results, ideal_dcg))
-                else:
-                    recalls.append(0)
-                    ndcgs.append(0)
+                for idx, results in enumerate(batch_results, start=start):
+                    latencies.record(latency / len(batch_results))
+                    query_latencies[idx] = latency / len(batch_results)
+                    top_k = results[: self.search_k]
+                    result_ids[idx, : len(top_k)] = top_k
 
                 if len(latencies) % 100 == 0:
                     log.debug(
                         f"({mp.current_process().name:14}) search_count={len(latencies):3}, "
-                        f"latest_latency={latencies[-1]}, latest recall={recalls[-1]}"
+                        f"latest_latency={latency}"
                     )
 
-        avg_latency = round(np.mean(latencies), 4)
-        avg_recall = round(np.mean(recalls), 4)
-        avg_ndcg = round(np.mean(ndcgs), 4)
-        cost = round(np.sum(latencies), 4)
-        p99 = round(np.percentile(latencies, 99), 4)
-        p95 = round(np.percentile(latencies, 95), 4)
+        quality, quality_at_k = {"recall": 0.0, "ndcg": 0.0, "mrr": 0.0, "precision": 0.0}, {}
+        if ground_truth is not None:
+            gt_ids = id_matrix(ground_truth, self.search_k)
+            quality = calc_search_quality(result_ids, gt_ids, self.k)
+            for k in self.k_list:
+                quality_at_k[str(k)] = {
+                    name: round(value, 4) for name, value in calc_search_quality(result_ids, gt_ids, k).items()
+                }
+        avg_recall, avg_ndcg, avg_mrr, avg_precision = (round(quality[name], 4) for name in quality)
+
+        avg_latency = round(latencies.mean(), 4)
+        cost = round(latencies.sum(), 4)
+        p99 = round(latencies.percentile(99), 4)
+        p95 = round(latencies.percentile(95), 4)
         log.info(
             f"{mp.current_process().name:14} search entire test_data: "
             f"cost={cost}s, "
             f"queries={len(latencies)}, "
             f"avg_recall={avg_recall}, "
             f"avg_ndcg={avg_ndcg}, "
+            f"avg_mrr={avg_mrr}, "
+            f"avg_precision={avg_precision}, "
             f"avg_latency={avg_latency}, "
+            f"p50={round(latencies.percentile(50), 4)}, "
+            f"p90={round(latencies.percentile(90), 4)}, "
             f"p99={p99}, "
-            f"p95={p95}"
+            f"p95={p95}, "
+            f"p99.9={round(latencies.percentile(99.9), 4)}, "
+            f"p99.99={round(latencies.percentile(99.99), 4)}"
         )
-        return (avg_recall, avg_ndcg, p99, p95)
 
-    def _run_in_subprocess(self) -> tuple[float, float, float, float]:
+        batch = {}
+        if self.batch_size > 1:
+            batch = {
+                "batch_size": self.batch_size,
+                "latency_p99": round(batch_latencies.percentile(99), 4),
+                "latency_p95": round(batch_latencies.percentile(95), 4),
+                "latency_avg": round(batch_latencies.mean(), 4),
+                "vectors_per_second": round(len(latencies) / batch_latencies.sum(), 4),
+            }
+            log.info(f"{mp.current_process().name:14} batch search: {batch}")
+        if quality_at_k:
+            log.info(f"{mp.current_process().name:14} search quality at k: {quality_at_k}")
+        if self.results_file is not None:
+            write_search_results(
+                self.results_file,
+                result_ids,
+                query_latencies,
+                {"k": self.k, "k_list": self.k_list, **self.results_metadata},
+            )
+        return (avg_recall, avg_ndcg, p99, p95, batch, avg_mrr, avg_precision, quality_at_k)
+
+    def _run_in_subprocess(self) -> tuple[float, float, float, float, dict, float, float, dict]:
         with concurrent.futures.ProcessPoolExecutor(max_workers=1) as executor:
             future = executor.submit(self.search, (self.test_data, self.ground_truth))
             return future.result()
 
     @utils.time_it
-    def run(self) -> tuple[float, float, float, float]:
+    def run(self) -> tuple[float, float, float, float, dict, float, float, dict]:
         log.info(f"{mp.current_process().name:14} start serial search")
         if self.test_data is None:
             msg = "empty test_data"
@@ -309,11 +636,12 @@ class SerialSearchRunner:
         return self._run_in_subprocess()
 
     @utils.time_it
-    def run_with_cost(self) -> tuple[tuple[float, float, float, float], float]:
+    def run_with_cost(self) -> tuple[tuple[float, float, float, float, dict, float, float, dict], float]:
         """
         Search all test data in serial.
         Returns:
-            tuple[tuple[float, float, float, float], float]: (avg_recall, avg_ndcg, p99_latency, p95_latency), cost
+            tuple[tuple[float, float, float, float, dict, float, float, dict], float]: (avg_recall, avg_ndcg,
+                p99_latency, p95_latency, batch, avg_mrr, avg_precision, quality_at_k), cost
         """
         log.info(f"{mp.current_process().name:14} start serial search")
         if self.test_data is None:
@@ -0,0 +1,65 @@
+import logging
+import weakref
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+def _release(shm: SharedMemory, unlink: bool):
+    try:
+        shm.close()
+    except BufferError:
+        # row views still alive, the mapping goes away with the process
+        log.debug(f"shared memory {shm.name} still referenced, skip close")
+    if unlink:
+        shm.unlink()
+
+
+class SharedQueryMatrix:
+    """Test queries stored once as a contiguous float32 matrix.
+
+    The matrix is moved into shared memory the first time it is pickled, after that only the shared memory
+    name and the shape are sent to the spawned search processes, which attach to the same buffer zero-copy.
+    The process that created the shared memory unlinks it when the matrix is garbage collected.
+
+    Examples:
+        >>> queries = SharedQueryMatrix(test_data)
+        >>> executor.submit(search, queries)
+        >>> queries[0]  # row view, np.ndarray
+    """
+
+    def __init__(self, data: list[list[float]] | np.ndarray):
+        self.matrix = np.ascontiguousarray(data, dtype=np.float32)
+        self._shm: SharedMemory | None = None
+
+    def _share(self) -> str:
+        if self._shm is None:
+            shm = SharedMemory(create=True, size=max(self.matrix.nbytes, 1))
+            shared = np.ndarray(self.matrix.shape, dtype=np.float32, buffer=shm.buf)
+            shared[:] = self.matrix
+            self.matrix, self._shm = shared, shm
+            weakref.finalize(self, _release, shm, True)
+            log.debug(f"Share test queries {self.matrix.shape} in shared memory {shm.name}")
+        return self._shm.name
+
+    def __getstate__(self) -> dict:
+        return {"name": self._share(), "shape": self.matrix.shape}
+
+    def __setstate__(self, state: dict):
+        self._shm = SharedMemory(name=state["name"])
+        self.matrix = np.ndarray(state["shape"], dtype=np.float32, buffer=self._shm.buf)
+        weakref.finalize(self, _release, self._shm, False)
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def __getitem__(self, idx: int) -> np.ndarray:
+        return self.matrix[idx]
+
+    def batch(self, idx: int, size: int) -> np.ndarray:
+        """`size` rows from idx, wrapping around the end. A view unless it wraps"""
+        if idx + size <= len(self):
+            return self.matrix[idx : idx + size]
+        return np.take(self.matrix, range(idx, idx + size), axis=0, mode="wrap")
@@ -0,0 +1,77 @@
+import logging
+from collections.abc import Iterator
+
+log = logging.getLogger(__name__)
+
+
+class RateRamp:
+    """Open-loop rates looking for the highest rate served within a latency budget.
+
+    The rate grows geometrically from `start` until a level breaks the SLO: its latency exceeds `latency_budget`,
+    or the achieved QPS falls short of the offered rate by more than `max_shortfall`. Then the interval between the
+    best rate within the SLO and the lowest rate above it is bisected, until it is narrower than `resolution` of
+    the best rate.
+
+    Args:
+        start(float): first offered rate, queries per second
+        latency_budget(float): latency limit in seconds, of the percentile chosen by the caller
+        growth(float): rate multiplier of each step before the SLO is broken
+        resolution(float): stop bisecting when the interval is narrower than this ratio of the best rate
+        max_shortfall(float): a rate is not sustained if the achieved QPS is lower than (1 - max_shortfall) of it
+
+    Examples:
+        >>> rates = RateRamp(start=100, latency_budget=0.02)
+        >>> for rate in rates:
+        >>>     rates.record(rate, qps, p99)
+        >>> rates.best
+    """
+
+    def __init__(
+        self,
+        start: float,
+        latency_budget: float,
+        growth: float = 2,
+        resolution: float = 0.05,
+        max_shortfall: float = 0.05,
+    ):
+        self.start = start
+        self.latency_budget = latency_budget
+        self.growth = growth
+        self.resolution = resolution
+        self.max_shortfall = max_shortfall
+        self.results: dict[float, tuple[float, float]] = {}
+
+    def record(self, rate: float, qps: float, latency: float):
+        self.results[rate] = (qps, latency)
+
+    def within_slo(self, rate: float) -> bool:
+        qps, latency = self.results[rate]
+        return latency <= self.latency_budget and qps >= rate * (1 - self.max_shortfall)
+
+    def __iter__(self) -> Iterator[float]:
+        rate = self.start
+        while True:
+            yield rate
+            if rate not in self.results:
+                return
+            if not self.within_slo(rate):
+                break
+            rate = round(rate * self.growth, 4)
+
+        while (best := self.best) is not None:
+            upper = min(r for r in self.results if r > best)
+            if upper - best <= best * self.resolution:
+                break
+
+            mid = round((best + upper) / 2, 4)
+            yield mid
+            if mid not in self.results:
+                break
+        log.info(f"Rate ramp explored rates {list(self.results)}, best rate within the SLO={self.best}")
+
+    @property
+    def best(self) -> float | None:
+        """highest rate within the SLO below all the rates breaking it, None if the start rate breaks it"""
+        broken = [r for r in self.results if not self.within_slo(r)]
+        within = [r for r in self.results if self.within_slo(r) and (len(broken) == 0 or r < min(broken))]
+        return max(within) if len(within) > 0 else None
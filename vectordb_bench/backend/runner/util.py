@@ -6,12 +6,22 @@ from pandas import DataFrame
 log = logging.getLogger(__name__)
 
 
-def get_data(data_df: DataFrame, normalize: bool) -> tuple[list[list[float]], list[str]]:
-    all_metadata = data_df["id"].tolist()
-    emb_np = np.stack(data_df["emb"])
+def prepare_embeddings(emb_np: np.ndarray, normalize: bool, ndarray: bool = False) -> list[list[float]] | np.ndarray:
+    """Normalized if needed, as a C-contiguous float32 array if ndarray, otherwise as lists"""
     if normalize:
         log.debug("normalize the 100k train data")
-        all_embeddings = (emb_np / np.linalg.norm(emb_np, axis=1)[:, np.newaxis]).tolist()
-    else:
-        all_embeddings = emb_np.tolist()
+        emb_np = emb_np / np.linalg.norm(emb_np, axis=1)[:, np.newaxis]
+    if ndarray:
+        return np.ascontiguousarray(emb_np, dtype=np.float32)
+    return emb_np.tolist()
+
+
+def get_data(
+    data_df: DataFrame,
+    normalize: bool,
+    ndarray: bool = False,
+) -> tuple[list[list[float]] | np.ndarray, list[int] | np.ndarray]:
+    """embeddings and ids of a record batch, as float32 and int64 arrays if ndarray, otherwise as lists"""
+    all_metadata = data_df["id"].to_numpy(dtype=np.int64) if ndarray else data_df["id"].tolist()
+    all_embeddings = prepare_embeddings(np.stack(data_df["emb"]), normalize, ndarray)
     return all_embeddings, all_metadata
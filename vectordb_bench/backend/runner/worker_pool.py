@@ -0,0 +1,149 @@
+import logging
+import multiprocessing as mp
+import queue
+import threading
+import time
+import traceback
+from multiprocessing.context import BaseContext
+from typing import Any
+
+from ...models import ConcurrencySlotTimeoutError
+
+log = logging.getLogger(__name__)
+
+# task of a worker which is not part of the current concurrency level
+PARKED = (None, ())
+
+
+def _work(runner: Any, idx: int, tasks: mp.SimpleQueue, results: mp.Queue, barrier: threading.Barrier):
+    """Loop of one pool process: connect once, then run one task per concurrency level until None is received."""
+    try:
+        with runner.init_worker():
+            results.put((idx, None))
+
+            while (task := tasks.get()) is not None:
+                method, args = task
+                barrier.wait()
+                if method is None:
+                    continue
+
+                try:
+                    res = getattr(runner, method)(*args)
+                except Exception as e:
+                    log.warning(f"{mp.current_process().name:16} {method} failed: {e}\n{traceback.format_exc()}")
+                    res = RuntimeError(f"{mp.current_process().name} {method} failed: {e}")
+                results.put((idx, res))
+    except Exception as e:
+        log.warning(f"{mp.current_process().name:16} exits: {e}")
+        results.put((idx, RuntimeError(f"{mp.current_process().name} exits: {e}")))
+
+
+class SearchWorkerPool:
+    """Long-lived search processes reused by all the concurrency levels of a case.
+
+    Each process enters `runner.init_worker()` once and keeps the connections until shutdown. For every level
+    the first `conc` processes are given a task and the others are parked, then all processes and the caller
+    meet at a barrier, so the active processes start searching at the same time.
+
+    Args:
+        runner: pickled into each process, `init_worker()` is entered there and `method` is called on it
+        size(int): number of processes
+        mp_context(BaseContext): multiprocessing context to start the processes
+        timeout(int): seconds to wait for the processes to be ready, 0 or negative waits forever
+
+    Examples:
+        >>> pool = SearchWorkerPool(runner, 10, mp.get_context("spawn"), 60)
+        >>> results = pool.run(5, "search_by_dur", 30)
+        >>> pool.shutdown()
+    """
+
+    def __init__(self, runner: Any, size: int, mp_context: BaseContext, timeout: int):
+        self.size = size
+        self.timeout = timeout if timeout > 0 else None
+        self.closed = False
+
+        self._barrier = mp_context.Barrier(size + 1)
+        self._tasks = [mp_context.SimpleQueue() for _ in range(size)]
+        self._results = mp_context.Queue()
+        self._processes = [
+            mp_context.Process(
+                target=_work,
+                args=(runner, i, self._tasks[i], self._results, self._barrier),
+                name=f"SearchWorker-{i}",
+                daemon=True,
+            )
+            for i in range(size)
+        ]
+
+        start = time.perf_counter()
+        for p in self._processes:
+            p.start()
+        try:
+            self._collect(size, timeout_error=ConcurrencySlotTimeoutError)
+        except Exception:
+            self.shutdown(terminate=True)
+            raise
+        log.info(f"Start {size} search processes, cost={time.perf_counter() - start:.4f}s")
+
+    def run(self, conc: int, method: str, *args) -> list:
+        """Call `runner.method(*args)` in `conc` processes at the same time, and wait for all of them.
+
+        Returns:
+            list: the return values of the `conc` processes
+        """
+        return self.run_each(method, [args] * conc)
+
+    def run_each(self, method: str, args_list: list[tuple]) -> list:
+        """Call `runner.method(*args_list[i])` in the i-th process, one process for each args."""
+        conc = len(args_list)
+        if conc > self.size:
+            msg = f"concurrency {conc} is larger than the pool size {self.size}"
+            raise ValueError(msg)
+
+        for i, tasks in enumerate(self._tasks):
+            tasks.put((method, args_list[i]) if i < conc else PARKED)
+        try:
+            self._barrier.wait(timeout=self.timeout)
+            return self._collect(conc)
+        except Exception:
+            self.shutdown(terminate=True)
+            raise
+
+    def _collect(self, count: int, timeout_error: type[Exception] | None = None) -> list:
+        """Get `count` results, raise if any process failed or died"""
+        deadline = None if self.timeout is None or timeout_error is None else time.perf_counter() + self.timeout
+        results = []
+        while len(results) < count:
+            try:
+                _, res = self._results.get(timeout=1)
+            except queue.Empty:
+                if any(not p.is_alive() for p in self._processes):
+                    msg = "search process exited unexpectedly"
+                    raise RuntimeError(msg) from None
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise timeout_error from None
+                continue
+
+            if isinstance(res, Exception):
+                raise res
+            results.append(res)
+        return results
+
+    def shutdown(self, terminate: bool = False):
+        if self.closed:
+            return
+        self.closed = True
+
+        if terminate:
+            for p in self._processes:
+                p.terminate()
+        else:
+            for tasks in self._tasks:
+                tasks.put(None)
+        for p in self._processes:
+            p.join(timeout=10)
+            if p.is_alive():
+                p.terminate()
+                p.join()
+        self._results.close()
+        log.debug(f"Shutdown {self.size} search processes, terminate={terminate}")
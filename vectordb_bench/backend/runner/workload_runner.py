@@ -0,0 +1,320 @@
+import concurrent
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from copy import deepcopy
+
+import numpy as np
+
+from vectordb_bench import config
+from vectordb_bench.backend.clients import api
+from vectordb_bench.backend.dataset import DatasetManager
+from vectordb_bench.backend.workload import KeyChooser, WorkloadOp, WorkloadSpec
+
+from .histogram import LatencyHistogram
+from .mp_runner import MultiProcessingSearchRunner
+from .rate_runner import TokenBucket
+from .shared_query import SharedQueryMatrix
+from .util import get_data
+
+log = logging.getLogger(__name__)
+
+
+class LiveIds:
+    """Ids in the db that updates and deletes pick from, roughly in insertion order.
+
+    A delete moves the last id into the slot of the deleted one, the latest inserted ids stay at the end.
+    """
+
+    def __init__(self, ids: np.ndarray):
+        self.ids = np.array(ids, dtype=np.int64)
+        self.count = len(self.ids)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def add(self, ids: np.ndarray):
+        if self.count + len(ids) > len(self.ids):
+            grown = np.empty(max(2 * len(self.ids), self.count + len(ids)), dtype=np.int64)
+            grown[: self.count] = self.ids[: self.count]
+            self.ids = grown
+        self.ids[self.count : self.count + len(ids)] = ids
+        self.count += len(ids)
+
+    def get(self, idx: np.ndarray) -> np.ndarray:
+        return self.ids[idx]
+
+    def remove(self, idx: np.ndarray):
+        """remove the ids at the distinct indices idx"""
+        for i in np.sort(idx)[::-1]:
+            self.count -= 1
+            self.ids[i] = self.ids[self.count]
+
+
+class TrainRows:
+    """Embeddings of the train data for inserts and updates, read batch by batch and cycled through"""
+
+    def __init__(self, dataset: DatasetManager, normalize: bool):
+        self.dataset = dataset
+        self.normalize = normalize
+        self._batches = iter(dataset)
+        self._buffer: np.ndarray | None = None
+
+    def _read(self) -> np.ndarray:
+        data = next(self._batches, None)
+        if data is None:
+            self._batches = iter(self.dataset)
+            data = next(self._batches)
+        emb, _ = get_data(data, self.normalize, ndarray=True)
+        return emb
+
+    def take(self, n: int) -> np.ndarray:
+        parts, left = [], n
+        while left > 0:
+            if self._buffer is None or len(self._buffer) == 0:
+                self._buffer = self._read()
+            part, self._buffer = self._buffer[:left], self._buffer[left:]
+            parts.append(part)
+            left -= len(part)
+        return np.concatenate(parts)
+
+
+class WorkloadSearchRunner(MultiProcessingSearchRunner):
+    """Open-loop search of the test queries picked by the key distribution of the workload"""
+
+    def __init__(self, key_chooser: KeyChooser, **kwargs):
+        super().__init__(**kwargs)
+        self.key_chooser = key_chooser
+        # created by each search thread on first use, the thread runners are copies of this one
+        self._rng: np.random.Generator | None = None
+
+    def _get_request(self, test_data: SharedQueryMatrix, idx: int) -> np.ndarray | list[float]:
+        if self._rng is None:
+            self._rng = np.random.default_rng()
+        idx = int(self.key_chooser.choose(len(test_data), 1, self._rng)[0])
+        return super()._get_request(test_data, idx)
+
+
+class WorkloadRunner:
+    """Read/write mix of a WorkloadSpec on the loaded collection for spec.duration seconds.
+
+    Searches are sent open-loop by the search processes at their share of target_ops. Writes are picked by their
+    relative ratios and paced by a TokenBucket at their share of target_ops, from a writer thread that sends them
+    by spec.write_concurrency threads. Inserts add new ids after the train ids with embeddings of the train data,
+    updates upsert live ids with other train embeddings, deletes remove live ids; updates and deletes pick the ids
+    by the key distribution. The latencies of each operation type are recorded in their own histogram, measured
+    from the scheduled send time.
+    """
+
+    def __init__(
+        self,
+        db: api.VectorDB,
+        dataset: DatasetManager,
+        spec: WorkloadSpec,
+        normalize: bool = False,
+        k: int = config.K_DEFAULT,
+        seed: int = 42,
+    ):
+        self.db = db
+        self.dataset = dataset
+        self.spec = spec
+        self.normalize = normalize
+        self.seed = seed
+        self.key_chooser = KeyChooser(spec.key_distribution, spec.zipfian_constant)
+
+        test_emb = np.asarray(dataset.test_data, dtype=np.float32)
+        if normalize:
+            test_emb = test_emb / np.linalg.norm(test_emb, axis=1)[:, np.newaxis]
+        self.search_runner = WorkloadSearchRunner(
+            key_chooser=self.key_chooser,
+            db=db,
+            test_data=test_emb,
+            k=k,
+            concurrencies=[spec.search_concurrency],
+            duration=spec.duration,
+            batch_size=spec.batch_size(WorkloadOp.SEARCH),
+        )
+
+        self.live = LiveIds(np.arange(dataset.data.size))
+        self.next_id = dataset.data.size
+        self.latencies = {op: LatencyHistogram() for op in WorkloadOp}
+        self.counts = dict.fromkeys(WorkloadOp, 0)
+        self.failed = dict.fromkeys(WorkloadOp, 0)
+        self._stop = threading.Event()
+        self._error: Exception | None = None
+
+    def _next_write(self, rng: np.random.Generator) -> WorkloadOp:
+        ops = self.spec.write_ops
+        ratios = np.array([self.spec.ratio(op) for op in ops])
+        op = ops[rng.choice(len(ops), p=ratios / ratios.sum())]
+        # updates and deletes need live ids
+        return WorkloadOp.INSERT if op != WorkloadOp.INSERT and len(self.live) == 0 else op
+
+    def _prepare(self, op: WorkloadOp, rows: TrainRows, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+        """ids and embeddings of the next write, the ids of a delete leave the live ids right away"""
+        size = self.spec.batch_size(op)
+        if op == WorkloadOp.INSERT:
+            ids = np.arange(self.next_id, self.next_id + size, dtype=np.int64)
+            self.next_id += size
+            return ids, rows.take(size)
+        idx = np.unique(self.key_chooser.choose(len(self.live), size, rng))
+        ids = self.live.get(idx)
+        if op == WorkloadOp.DELETE:
+            self.live.remove(idx)
+            return ids, None
+        return ids, rows.take(len(ids))
+
+    @staticmethod
+    def _send(
+        db: api.VectorDB,
+        op: WorkloadOp,
+        ids: np.ndarray,
+        emb: np.ndarray | None,
+        scheduled: float,
+    ) -> tuple[WorkloadOp, np.ndarray, float, bool]:
+        """Returns: op, ids, latency from the scheduled send time, whether it succeeded"""
+        ids_arg = ids if db.ndarray_insert_supported else ids.tolist()
+        emb_arg = emb if emb is None or db.ndarray_insert_supported else emb.tolist()
+
+        def _call(db: api.VectorDB) -> Exception | None:
+            if op == WorkloadOp.DELETE:
+                _, error = db.delete_embeddings(ids_arg)
+            elif op == WorkloadOp.UPDATE:
+                _, error = db.upsert_embeddings(emb_arg, ids_arg)
+            else:
+                _, error = db.insert_embeddings(emb_arg, ids_arg)
+            return error
+
+        try:
+            if db.name == "PgVector":
+                # pgvector is not thread-safe, each write has its own connection
+                db_copy = deepcopy(db)
+                with db_copy.init():
+                    error = _call(db_copy)
+            else:
+                error = _call(db)
+        except Exception as e:
+            error = e
+        if error is not None:
+            log.warning(f"Workload {op.value} of {len(ids)} rows failed: {error}")
+        return op, ids, time.perf_counter() - scheduled, error is None
+
+    def _collect(self, futures: list[Future], timeout: float) -> list[Future]:
+        """record the finished writes within timeout seconds, returns the unfinished ones"""
+        done, not_done = concurrent.futures.wait(
+            futures,
+            timeout=timeout,
+            return_when=concurrent.futures.FIRST_COMPLETED,
+        )
+        for fut in done:
+            op, ids, latency, ok = fut.result()
+            if not ok:
+                self.failed[op] += 1
+                continue
+            self.latencies[op].record(latency)
+            self.counts[op] += 1
+            if op == WorkloadOp.INSERT:
+                self.live.add(ids)
+        return list(not_done)
+
+    def _write(self, start: float, end: float):
+        rng = np.random.default_rng(self.seed)
+        rows = TrainRows(self.dataset, self.normalize)
+        bucket = TokenBucket(sum(self.spec.rate(op) for op in self.spec.write_ops), 1, start)
+        futures = []
+        # the search processes are started from the original db object, the writer thread has its own connection
+        db = deepcopy(self.db)
+        try:
+            with db.init(), ThreadPoolExecutor(max_workers=self.spec.write_concurrency) as executor:
+                while not self._stop.is_set():
+                    op = self._next_write(rng)
+                    ids, emb = self._prepare(op, rows, rng)
+                    scheduled = time.perf_counter() + bucket.delay()
+                    if scheduled >= end:
+                        break
+                    while (left := scheduled - time.perf_counter()) > 0:
+                        if futures:
+                            futures = self._collect(futures, left)
+                        else:
+                            time.sleep(left)
+                    while len(futures) >= config.STREAMING_MAX_BACKLOG:
+                        futures = self._collect(futures, 1)
+                    bucket.take()
+                    futures.append(executor.submit(self._send, db, op, ids, emb, scheduled))
+                while futures:
+                    futures = self._collect(futures, 1)
+        except Exception as e:
+            log.warning(f"Workload writer failed: {e}")
+            self._error = e
+
+    def _search(self) -> tuple[int, LatencyHistogram]:
+        """searched queries and request latencies, for spec.duration seconds"""
+        rate = self.spec.rate(WorkloadOp.SEARCH) * self.spec.batch_size(WorkloadOp.SEARCH)
+        pool = self.search_runner._get_pool(self.spec.search_concurrency)
+        res = self.search_runner._run_search(pool, self.spec.search_concurrency, rate)
+        return sum(r[0] for r in res), LatencyHistogram.merge_all([r[2] for r in res])
+
+    def run(self) -> dict:
+        """Returns: the workload_* Metric fields"""
+        spec = self.spec
+        log.info(
+            f"Start workload {spec.duration}s at {spec.target_ops} ops/s: "
+            f"{', '.join(f'{op.value}={spec.ratio(op):.1%}' for op in WorkloadOp if spec.ratio(op) > 0)}, "
+            f"key distribution={spec.key_distribution.value}"
+        )
+        writer = None
+        try:
+            if spec.ratio(WorkloadOp.SEARCH) > 0:
+                # the search processes connect and warm up before the writes start
+                self.search_runner._get_pool(spec.search_concurrency)
+            start = time.perf_counter()
+            if spec.write_ops:
+                writer = threading.Thread(
+                    target=self._write,
+                    args=(start, start + spec.duration),
+                    name="workload-writer",
+                    daemon=True,
+                )
+                writer.start()
+            if spec.ratio(WorkloadOp.SEARCH) > 0:
+                queries, latencies = self._search()
+                self.counts[WorkloadOp.SEARCH] = queries // spec.batch_size(WorkloadOp.SEARCH)
+                self.latencies[WorkloadOp.SEARCH] = latencies
+            else:
+                time.sleep(spec.duration)
+        finally:
+            self.search_runner.stop()
+            self._stop.set()
+            if writer is not None:
+                writer.join()
+        if self._error is not None:
+            raise self._error
+        dur = time.perf_counter() - start
+        return self._result(dur)
+
+    def _result(self, dur: float) -> dict:
+        ops = {}
+        for op in WorkloadOp:
+            if self.spec.ratio(op) == 0:
+                continue
+            latencies = self.latencies[op]
+            ops[op.value] = {
+                "count": self.counts[op],
+                "ops": round(self.counts[op] / dur, 4),
+                "latency_p99": latencies.percentile(99),
+                "latency_p95": latencies.percentile(95),
+                "latency_p50": latencies.percentile(50),
+                "latency_avg": latencies.mean(),
+            }
+            if op != WorkloadOp.SEARCH:
+                # failed searches are only logged by the search processes
+                ops[op.value]["failed"] = self.failed[op]
+            log.info(f"Workload {op.value}: {ops[op.value]}")
+        achieved = round(sum(self.counts.values()) / dur, 4)
+        log.info(f"Workload done in {round(dur, 4)}s, achieved {achieved} ops/s of {self.spec.target_ops}")
+        return {
+            "workload_ops": ops,
+            "workload_target_ops": self.spec.target_ops,
+            "workload_achieved_ops": achieved,
+        }
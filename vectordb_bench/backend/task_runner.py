@@ -1,19 +1,32 @@
 import concurrent
 import logging
+import pathlib
 import traceback
+import uuid
+from datetime import date
 from enum import Enum, auto
 
 import numpy as np
 import psutil
 
+from .. import config
 from ..base import BaseModel
-from ..metric import Metric
+from ..metric import Metric, set_slo_metric
 from ..models import PerformanceTimeoutError, TaskConfig, TaskStage
 from . import utils
-from .cases import Case, CaseLabel, StreamingPerformanceCase
+from .cases import Case, CaseLabel, StreamingChurnCase, StreamingPerformanceCase, WorkloadCase
 from .clients import MetricType, api
 from .data_source import DatasetSource
-from .runner import MultiProcessingSearchRunner, ReadWriteRunner, SerialInsertRunner, SerialSearchRunner
+from .runner import (
+    AsyncSearchRunner,
+    ChurnRunner,
+    MultiProcessingSearchRunner,
+    ReadWriteRunner,
+    SerialInsertRunner,
+    SerialSearchRunner,
+    WorkloadRunner,
+)
+from .runner.checkpoint import LoadCheckpoint
 
 log = logging.getLogger(__name__)
 
@@ -48,11 +61,17 @@ class CaseRunner(BaseModel):
     search_runner: MultiProcessingSearchRunner | None = None
     final_search_runner: MultiProcessingSearchRunner | None = None
     read_write_runner: ReadWriteRunner | None = None
+    churn_runner: ChurnRunner | None = None
+    workload_runner: WorkloadRunner | None = None
+    load_checkpoint: LoadCheckpoint | None = None
 
     def __eq__(self, obj: any):
         if isinstance(obj, CaseRunner):
+            # a workload case writes into the collection, it is neither reused nor left for the next case
             return (
                 self.ca.label == CaseLabel.Performance
+                and not isinstance(self.ca, WorkloadCase)
+                and not isinstance(obj.ca, WorkloadCase)
                 and self.config.db == obj.config.db
                 and self.config.db_case_config == obj.config.db_case_config
                 and self.ca.dataset == obj.ca.dataset
@@ -117,7 +136,11 @@ class CaseRunner(BaseModel):
     def run(self, drop_old: bool = True) -> Metric:
         log.info("Starting run")
 
-        self._pre_run(drop_old)
+        self.load_checkpoint = self._resumable_checkpoint() if drop_old else None
+        self._pre_run(drop_old and self.load_checkpoint is None)
+        if self.load_checkpoint is not None and not self._verify_checkpoint():
+            self.load_checkpoint = None
+            self.init_db(drop_old=True)
 
         if self.ca.label == CaseLabel.Load:
             return self._run_capacity_case()
@@ -129,6 +152,46 @@ class CaseRunner(BaseModel):
         log.warning(msg)
         raise ValueError(msg)
 
+    def _load_checkpoint_key(self) -> str:
+        """Everything that decides which rows the load inserts where"""
+        return LoadCheckpoint.make_key(
+            db=self.config.db.value,
+            db_config=self.config.db_config.to_dict(),
+            index_param=self.config.db_case_config.index_param(),
+            dataset=self.ca.dataset.data.full_name,
+            groundtruth_file=self.ca.filters.groundtruth_file,
+            load_concurrency=self.config.case_config.load_concurrency,
+            calibrate_batch_size=self.config.case_config.calibrate_batch_size,
+            num_per_batch=config.NUM_PER_BATCH,
+        )
+
+    def _resumable_checkpoint(self) -> LoadCheckpoint | None:
+        """The checkpoint of an earlier load of this case to continue with --resume-load, None to load from scratch"""
+        if self.ca.label != CaseLabel.Performance or not self.config.case_config.resume_load:
+            return None
+        checkpoint = LoadCheckpoint(self._load_checkpoint_key())
+        if not checkpoint.exists():
+            log.info(f"No load checkpoint {checkpoint.path} to resume, load from scratch")
+            return None
+        return checkpoint.read()
+
+    def _verify_checkpoint(self) -> bool:
+        """Whether the collection has exactly the rows of the load checkpoint"""
+        with self.db.init():
+            count = self.db.count_embeddings()
+        expected = self.load_checkpoint.count
+        if count is None:
+            log.info(f"{self.config.db_name} cannot count its embeddings, trust the {expected} rows of the checkpoint")
+            return True
+        if count < expected:
+            log.warning(f"{count} embeddings in the collection, the checkpoint has {expected}, load from scratch")
+            return False
+        if count > expected:
+            # acknowledged after the last save, inserting them again would fail on a primary key or duplicate them
+            log.warning(f"{count - expected} embeddings in the collection are not in the checkpoint, load from scratch")
+            return False
+        return True
+
     def _run_capacity_case(self) -> Metric:
         """run capacity cases
 
@@ -165,9 +228,14 @@ class CaseRunner(BaseModel):
             m = Metric()
             if drop_old:
                 if TaskStage.LOAD in self.config.stages:
-                    _, load_dur = self._load_train_data()
+                    (count, load_metrics), load_dur = self._load_train_data()
+                    # the insert seconds of the earlier runs of a resumed load
+                    load_dur += load_metrics["insert_resumed"].get("duration", 0.0)
                     build_dur = self._optimize()
+                    for name, value in load_metrics.items():
+                        setattr(m, name, value)
                     m.insert_duration = round(load_dur, 4)
+                    m.insert_throughput = round(count / load_dur, 4) if load_dur > 0 else 0.0
                     m.optimize_duration = round(build_dur, 4)
                     m.load_duration = round(load_dur + build_dur, 4)
                     log.info(
@@ -177,7 +245,11 @@ class CaseRunner(BaseModel):
                     )
                 else:
                     log.info("Data loading skipped")
-            if TaskStage.SEARCH_SERIAL in self.config.stages or TaskStage.SEARCH_CONCURRENT in self.config.stages:
+            if isinstance(self.ca, WorkloadCase):
+                self._init_workload_runner()
+                for name, value in self.workload_runner.run().items():
+                    setattr(m, name, value)
+            elif TaskStage.SEARCH_SERIAL in self.config.stages or TaskStage.SEARCH_CONCURRENT in self.config.stages:
                 self._init_search_runner()
                 if TaskStage.SEARCH_CONCURRENT in self.config.stages:
                     search_results = self._conc_search()
@@ -188,10 +260,33 @@ class CaseRunner(BaseModel):
                         m.conc_latency_p99_list,
                         m.conc_latency_p95_list,
                         m.conc_latency_avg_list,
+                        m.conc_offered_qps_list,
+                        m.conc_missed_list,
+                        m.conc_latency_p50_list,
+                        m.conc_latency_p90_list,
+                        m.conc_latency_p999_list,
+                        m.conc_latency_p9999_list,
+                        m.conc_timeline,
+                        m.conc_knee,
+                        m.conc_warmup,
                     ) = search_results
+                    search_config = self.config.case_config.concurrency_search_config
+                    if search_config.slo_latency is not None:
+                        set_slo_metric(m, search_config.slo_latency, search_config.slo_percentile)
                 if TaskStage.SEARCH_SERIAL in self.config.stages:
                     search_results = self._serial_search()
-                    m.recall, m.ndcg, m.serial_latency_p99, m.serial_latency_p95 = search_results
+                    (
+                        m.recall,
+                        m.ndcg,
+                        m.serial_latency_p99,
+                        m.serial_latency_p95,
+                        m.serial_batch,
+                        m.mrr,
+                        m.precision,
+                        m.quality_at_k,
+                    ) = search_results
+                    if self.serial_search_runner.results_file is not None:
+                        m.search_results_file = str(self.serial_search_runner.results_file)
 
         except Exception as e:
             log.warning(f"Failed to run performance case, reason = {e}")
@@ -204,8 +299,12 @@ class CaseRunner(BaseModel):
     def _run_streaming_case(self) -> Metric:
         log.info("Start streaming case")
         try:
-            self._init_read_write_runner()
-            m = self.read_write_runner.run_read_write()
+            if isinstance(self.ca, StreamingChurnCase):
+                self._init_churn_runner()
+                m = self.churn_runner.run_churn()
+            else:
+                self._init_read_write_runner()
+                m = self.read_write_runner.run_read_write()
         except Exception as e:
             log.warning(f"Failed to run streaming case, reason = {e}")
             traceback.print_exc()
@@ -215,8 +314,13 @@ class CaseRunner(BaseModel):
             return m
 
     @utils.time_it
-    def _load_train_data(self):
-        """Insert train data and get the insert_duration"""
+    def _load_train_data(self) -> tuple[int, dict]:
+        """Insert train data and get the insert_duration, continue the load of the checkpoint if resumed
+
+        Returns:
+            tuple[int, dict]: inserted count, the other Metric fields of the load, see SerialInsertRunner.load_metrics
+        """
+        checkpoint = self.load_checkpoint or LoadCheckpoint(self._load_checkpoint_key())
         try:
             runner = SerialInsertRunner(
                 self.db,
@@ -224,19 +328,27 @@ class CaseRunner(BaseModel):
                 self.normalize,
                 self.ca.filters,
                 self.ca.load_timeout,
+                workers=self.config.case_config.load_concurrency,
+                calibrate_batch_size=self.config.case_config.calibrate_batch_size,
+                checkpoint=checkpoint,
             )
-            runner.run()
+            count = runner.run()
         except Exception as e:
             raise e from None
+        else:
+            # the checkpoint is kept for --resume-load only if the load failed
+            checkpoint.remove()
+            return count, runner.load_metrics
         finally:
             runner = None
 
-    def _serial_search(self) -> tuple[float, float, float, float]:
+    def _serial_search(self) -> tuple[float, float, float, float, dict, float, float, dict]:
         """Performance serial tests, search the entire test data once,
         calculate the recall, serial_latency_p99, serial_latency_p95
 
         Returns:
-            tuple[float, float, float, float]: recall, ndcg, serial_latency_p99, serial_latency_p95
+            tuple[float, float, float, float, dict, float, float, dict]: recall, ndcg, serial_latency_p99,
+                serial_latency_p95, serial_batch, mrr, precision, quality_at_k
         """
         try:
             results, _ = self.serial_search_runner.run()
@@ -298,17 +410,56 @@ class CaseRunner(BaseModel):
                 ground_truth=gt_df,
                 filters=self.ca.filters,
                 k=self.config.case_config.k,
+                batch_size=self.config.case_config.search_batch_size,
+                k_list=self.config.case_config.k_list,
+                results_file=self._search_results_file(),
+                results_metadata={
+                    "run_id": self.run_id,
+                    "db": self.config.db.value,
+                    "db_label": self.config.db_config.db_label,
+                    "case": self.ca.name,
+                    "ground_truth": str(self.ca.dataset.data_dir.joinpath(self.ca.filters.groundtruth_file)),
+                    "gt_neighbors_field": self.ca.dataset.data.gt_neighbors_field,
+                },
             )
         if TaskStage.SEARCH_CONCURRENT in self.config.stages:
-            self.search_runner = MultiProcessingSearchRunner(
-                db=self.db,
-                test_data=self.test_emb,
-                filters=self.ca.filters,
-                concurrencies=self.config.case_config.concurrency_search_config.num_concurrency,
-                duration=self.config.case_config.concurrency_search_config.concurrency_duration,
-                concurrency_timeout=self.config.case_config.concurrency_search_config.concurrency_timeout,
-                k=self.config.case_config.k,
-            )
+            search_config = self.config.case_config.concurrency_search_config
+            runner_kwargs = {
+                "db": self.db,
+                "test_data": self.test_emb,
+                "filters": self.ca.filters,
+                "concurrencies": search_config.num_concurrency,
+                "duration": search_config.concurrency_duration,
+                "concurrency_timeout": search_config.concurrency_timeout,
+                "target_qps": search_config.target_qps,
+                "arrival_pattern": search_config.arrival_pattern,
+                "k": self.config.case_config.k,
+                "adaptive": search_config.adaptive,
+                "adaptive_max_concurrency": search_config.adaptive_max_concurrency,
+                "adaptive_min_qps_gain": search_config.adaptive_min_qps_gain,
+                "adaptive_max_latency_p99": search_config.adaptive_max_latency_p99,
+                "slo_latency": search_config.slo_latency,
+                "slo_percentile": search_config.slo_percentile,
+                "warmup_duration": search_config.warmup_duration,
+                "warmup_queries": search_config.warmup_queries,
+                "batch_size": self.config.case_config.search_batch_size,
+            }
+            if search_config.async_search_processes and self.db.async_search_supported:
+                self.search_runner = AsyncSearchRunner(processes=search_config.async_search_processes, **runner_kwargs)
+            else:
+                if search_config.async_search_processes:
+                    log.warning(f"{self.config.db} doesn't support async search, search by processes instead")
+                self.search_runner = MultiProcessingSearchRunner(
+                    threads_per_process=search_config.threads_per_process,
+                    **runner_kwargs,
+                )
+
+    def _search_results_file(self) -> pathlib.Path | None:
+        """Parquet file of the per-query serial search results, next to the result json of the db"""
+        if not self.config.case_config.save_search_results:
+            return None
+        file_name = f"search_results_{date.today().strftime('%Y%m%d')}_{self.run_id}_{uuid.uuid4().hex[:8]}.parquet"
+        return config.RESULTS_LOCAL_DIR.joinpath(self.config.db.value, file_name)
 
     def _init_read_write_runner(self):
         ca: StreamingPerformanceCase = self.ca
@@ -322,6 +473,33 @@ class CaseRunner(BaseModel):
             concurrencies=ca.concurrencies,
             k=self.config.case_config.k,
             normalize=self.normalize,
+            continuous_search=ca.continuous_search,
+            continuous_search_qps=ca.continuous_search_qps,
+        )
+
+    def _init_churn_runner(self):
+        ca: StreamingChurnCase = self.ca
+        self.churn_runner = ChurnRunner(
+            db=self.db,
+            dataset=ca.dataset,
+            insert_rate=ca.insert_rate,
+            update_ratio=ca.update_ratio,
+            delete_ratio=ca.delete_ratio,
+            search_stages=ca.search_stages,
+            read_dur_after_write=ca.read_dur_after_write,
+            concurrencies=ca.concurrencies,
+            k=self.config.case_config.k,
+            normalize=self.normalize,
+        )
+
+    def _init_workload_runner(self):
+        ca: WorkloadCase = self.ca
+        self.workload_runner = WorkloadRunner(
+            db=self.db,
+            dataset=ca.dataset,
+            spec=ca.workload,
+            normalize=self.normalize,
+            k=self.config.case_config.k,
         )
 
     def stop(self):
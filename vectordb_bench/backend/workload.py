@@ -0,0 +1,137 @@
+import math
+import pathlib
+from enum import StrEnum
+
+import numpy as np
+import yaml
+from pydantic import root_validator, validator
+
+from ..base import BaseModel
+
+
+class WorkloadOp(StrEnum):
+    SEARCH = "search"
+    INSERT = "insert"
+    UPDATE = "update"  # upsert of live ids with new embeddings
+    DELETE = "delete"
+
+
+class KeyDistribution(StrEnum):
+    """Which test query a search sends, and which live ids an update or delete picks"""
+
+    UNIFORM = "uniform"
+    ZIPFIAN = "zipfian"  # the first keys are the hottest
+    LATEST = "latest"  # zipfian from the last keys, the latest inserted ids are the hottest
+
+
+class OperationSpec(BaseModel):
+    ratio: float = 0.0  # share of the operations
+    batch_size: int = 1  # queries of a search, batch search if larger than 1, or rows of a write
+
+    @validator("ratio")
+    def verify_ratio(cls, v: float):
+        if not 0 <= v <= 1:
+            msg = f"ratio(={v}) should be in [0, 1]"
+            raise ValueError(msg)
+        return v
+
+    @validator("batch_size")
+    def verify_batch_size(cls, v: int):
+        if v < 1:
+            msg = f"batch_size(={v}) should be at least 1"
+            raise ValueError(msg)
+        return v
+
+
+class WorkloadSpec(BaseModel):
+    """Operation mix of a workload case, usually read from a yaml or json file, see load_workload_spec.
+
+    An operation is one request: a search of batch_size queries, or an insert, update or delete of batch_size rows.
+    Operations are sent open-loop at target_ops operations per second in total, each type at its share.
+
+    Examples:
+        >>> WorkloadSpec(
+        >>>     target_ops=2000,
+        >>>     duration=3600,
+        >>>     operations={"search": {"ratio": 0.95}, "insert": {"ratio": 0.05, "batch_size": 100}},
+        >>> )
+    """
+
+    target_ops: float = 1000
+    duration: int = 300  # seconds
+    operations: dict[WorkloadOp, OperationSpec] = {
+        WorkloadOp.SEARCH: OperationSpec(ratio=0.95),
+        WorkloadOp.INSERT: OperationSpec(ratio=0.05, batch_size=100),
+    }
+    key_distribution: KeyDistribution = KeyDistribution.UNIFORM
+    zipfian_constant: float = 0.99
+    # search processes times threads, each thread searches at its share of the search rate
+    search_concurrency: int = 10
+    # threads sending the writes, writes sent and not finished are limited by config.STREAMING_MAX_BACKLOG
+    write_concurrency: int = 8
+
+    @root_validator(skip_on_failure=True)
+    def verify_spec(cls, values: dict) -> dict:
+        total = sum(op.ratio for op in values["operations"].values())
+        if not math.isclose(total, 1, abs_tol=1e-6):
+            msg = f"operation ratios should sum to 1, got {total}"
+            raise ValueError(msg)
+        for name in ("target_ops", "duration", "search_concurrency", "write_concurrency", "zipfian_constant"):
+            if values[name] <= 0:
+                msg = f"{name}(={values[name]}) should be positive"
+                raise ValueError(msg)
+        return values
+
+    def ratio(self, op: WorkloadOp) -> float:
+        return self.operations[op].ratio if op in self.operations else 0.0
+
+    def batch_size(self, op: WorkloadOp) -> int:
+        return self.operations[op].batch_size if op in self.operations else 1
+
+    def rate(self, op: WorkloadOp) -> float:
+        """operations/s of op"""
+        return self.target_ops * self.ratio(op)
+
+    @property
+    def write_ops(self) -> list[WorkloadOp]:
+        """write operations with a positive ratio"""
+        return [op for op in (WorkloadOp.INSERT, WorkloadOp.UPDATE, WorkloadOp.DELETE) if self.ratio(op) > 0]
+
+    @property
+    def with_deletes(self) -> bool:
+        """updates and deletes need delete_embeddings and upsert_embeddings of the client"""
+        return self.ratio(WorkloadOp.UPDATE) > 0 or self.ratio(WorkloadOp.DELETE) > 0
+
+
+def load_workload_spec(path: str | pathlib.Path) -> dict:
+    """The workload spec file, yaml or json, as a dict to build a WorkloadSpec"""
+    with pathlib.Path(path).open() as f:
+        return yaml.safe_load(f)
+
+
+class KeyChooser:
+    """Picks key indices in [0, n) by a KeyDistribution, n may change between calls, e.g. the live ids.
+
+    The zipfian ranks are drawn by inverting the continuous approximation of the bounded zipfian CDF, which needs
+    no precomputed table for a growing n.
+    """
+
+    def __init__(self, distribution: KeyDistribution, zipfian_constant: float = 0.99):
+        self.distribution = distribution
+        self.theta = zipfian_constant
+
+    def _zipfian_ranks(self, n: int, size: int, rng: np.random.Generator) -> np.ndarray:
+        u = rng.random(size)
+        if math.isclose(self.theta, 1):
+            x = np.power(n + 1, u)
+        else:
+            e = 1 - self.theta
+            x = np.power(1 + u * ((n + 1) ** e - 1), 1 / e)
+        return np.minimum(np.floor(x).astype(np.int64) - 1, n - 1)
+
+    def choose(self, n: int, size: int, rng: np.random.Generator) -> np.ndarray:
+        """size key indices, with repetitions"""
+        if self.distribution == KeyDistribution.UNIFORM:
+            return rng.integers(n, size=size)
+        ranks = self._zipfian_ranks(n, size, rng)
+        return ranks if self.distribution == KeyDistribution.ZIPFIAN else n - 1 - ranks
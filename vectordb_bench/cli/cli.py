@@ -20,8 +20,10 @@ from yaml import load
 from .. import config
 from ..backend.clients import DB
 from ..backend.clients.api import MetricType
+from ..backend.workload import load_workload_spec
 from ..interface import benchmark_runner, global_result_future
 from ..models import (
+    ArrivalPattern,
     CaseConfig,
     CaseType,
     ConcurrencySearchConfig,
@@ -164,6 +166,12 @@ are required """,
     return value
 
 
+def check_workload_spec(ctx: any, param: any, value: any):  # noqa: ARG001
+    if ctx.params.get("case_type") == "WorkloadCase" and value is None:
+        raise click.BadParameter("--workload-spec is required by WorkloadCase")
+    return value
+
+
 def get_custom_case_config(parameters: dict) -> dict:
     custom_case_config = {}
     if parameters["case_type"] == "PerformanceCustomDataset":
@@ -188,6 +196,12 @@ def get_custom_case_config(parameters: dict) -> dict:
             "dataset_with_size_type": parameters["dataset_with_size_type"],
             "filter_rate": parameters["filter_rate"],
         }
+    elif parameters["case_type"] == "WorkloadCase":
+        custom_case_config = {
+            "dataset_with_size_type": parameters["dataset_with_size_type"],
+            # the spec itself, so that the results keep it
+            "workload": load_workload_spec(parameters["workload_spec"]),
+        }
     return custom_case_config
 
 
@@ -286,6 +300,73 @@ class CommonTypedDict(TypedDict):
             help="K value for number of nearest neighbors to search",
         ),
     ]
+    load_concurrency: Annotated[
+        int,
+        click.option(
+            "--load-concurrency",
+            type=int,
+            default=1,
+            show_default=True,
+            help="Number of processes loading the train data in parallel, each with its own connection. The row "
+            "groups of the train files are split across them",
+        ),
+    ]
+    calibrate_batch_size: Annotated[
+        bool,
+        click.option(
+            "--calibrate-batch-size",
+            type=bool,
+            default=False,
+            is_flag=True,
+            help="Time the insert throughput of doubling batch sizes on the first train rows before the load, and "
+            "load the rest in the fastest one",
+        ),
+    ]
+    resume_load: Annotated[
+        bool,
+        click.option(
+            "--resume-load",
+            type=bool,
+            default=False,
+            is_flag=True,
+            help="Continue the load left by an earlier run of the same case from its last checkpoint instead of "
+            "dropping the collection, if the row count of the collection matches",
+        ),
+    ]
+    search_batch_size: Annotated[
+        int,
+        click.option(
+            "--search-batch-size",
+            type=int,
+            default=1,
+            show_default=True,
+            help="Queries per search request, batch search if larger than 1. Clients without native batch "
+            "search send them one by one",
+        ),
+    ]
+    k_list: Annotated[
+        list[int] | None,
+        click.option(
+            "--k-list",
+            type=str,
+            default=None,
+            help="Comma-separated list of k values, the serial search also scores recall and ndcg at each of them "
+            "from one search of max(k, k-list) results, whose latency is the serial latency reported. Values above "
+            "the ground truth width are rejected, e.g. 1,10,100",
+            callback=lambda *args: list(map(int, click_arg_split(*args))) or None,
+        ),
+    ]
+    save_search_results: Annotated[
+        bool,
+        click.option(
+            "--save-search-results",
+            type=bool,
+            default=False,
+            is_flag=True,
+            help="Write the per-query result ids and latencies of the serial search to a Parquet file next to "
+            "the result json, to be re-scored by `vectordbbench rescore`",
+        ),
+    ]
     concurrency_duration: Annotated[
         int,
         click.option(
@@ -318,6 +399,130 @@ class CommonTypedDict(TypedDict):
             "Set to a negative value to wait indefinitely.",
         ),
     ]
+    target_qps: Annotated[
+        float | None,
+        click.option(
+            "--target-qps",
+            type=float,
+            default=None,
+            help="Open-loop concurrent search: total queries per second dispatched across all processes of each "
+            "concurrency, latency is measured from the scheduled send time. Closed-loop search if not set",
+        ),
+    ]
+    arrival_pattern: Annotated[
+        str,
+        click.option(
+            "--arrival-pattern",
+            type=click.Choice([p.value for p in ArrivalPattern]),
+            default=ArrivalPattern.POISSON.value,
+            show_default=True,
+            help="Query send schedule for open-loop concurrent search",
+        ),
+    ]
+    async_search_processes: Annotated[
+        int | None,
+        click.option(
+            "--async-search-processes",
+            type=int,
+            default=None,
+            help="Concurrent search by asyncio coroutines in at most this many processes, each concurrency value "
+            "is the total number of coroutines. Only for clients supporting async search",
+        ),
+    ]
+    threads_per_process: Annotated[
+        int,
+        click.option(
+            "--threads-per-process",
+            type=int,
+            default=1,
+            show_default=True,
+            help="Concurrent search threads in each process, each concurrency value is split into processes of "
+            "at most this many threads, every thread with its own connection",
+        ),
+    ]
+    adaptive_concurrency: Annotated[
+        bool,
+        click.option(
+            "--adaptive-concurrency/--no-adaptive-concurrency",
+            type=bool,
+            default=False,
+            show_default=True,
+            help="Search the knee of the QPS curve instead of the concurrency list: start from the smallest "
+            "concurrency value, double it until QPS stops growing, then bisect",
+        ),
+    ]
+    adaptive_max_concurrency: Annotated[
+        int,
+        click.option(
+            "--adaptive-max-concurrency",
+            type=int,
+            default=config.ADAPTIVE_MAX_CONCURRENCY,
+            show_default=True,
+            help="Largest concurrency of the adaptive search, the search processes are started for it up front",
+        ),
+    ]
+    adaptive_min_qps_gain: Annotated[
+        float,
+        click.option(
+            "--adaptive-min-qps-gain",
+            type=float,
+            default=config.ADAPTIVE_MIN_QPS_GAIN,
+            show_default=True,
+            help="Relative QPS gain of one step below which the adaptive search considers QPS saturated",
+        ),
+    ]
+    adaptive_max_latency_p99: Annotated[
+        float | None,
+        click.option(
+            "--adaptive-max-latency-p99",
+            type=float,
+            default=None,
+            help="p99 latency limit (in seconds) of the adaptive search, levels above it stop the growth",
+        ),
+    ]
+    slo_latency: Annotated[
+        float | None,
+        click.option(
+            "--slo-latency",
+            type=float,
+            default=None,
+            help="Latency budget (in seconds) of the SLO metric: the largest qps whose latency percentile stays "
+            "within it. Closed-loop search stops at the first concurrency breaking it, with --target-qps the rate "
+            "is ramped from the target at the largest concurrency instead",
+        ),
+    ]
+    slo_percentile: Annotated[
+        str,
+        click.option(
+            "--slo-percentile",
+            type=click.Choice(["99", "99.9", "99.99"]),
+            default="99",
+            show_default=True,
+            help="Latency percentile checked against --slo-latency",
+        ),
+    ]
+    warmup_duration: Annotated[
+        float,
+        click.option(
+            "--warmup-duration",
+            type=float,
+            default=0,
+            show_default=True,
+            help="Seconds of warm-up search by every search thread or coroutine on its fresh connection before "
+            "the concurrent search, excluded from qps and latencies",
+        ),
+    ]
+    warmup_queries: Annotated[
+        int,
+        click.option(
+            "--warmup-queries",
+            type=int,
+            default=0,
+            show_default=True,
+            help="Warm-up queries sent by every search thread or coroutine before the concurrent search, "
+            "excluded from qps and latencies",
+        ),
+    ]
     custom_case_name: Annotated[
         str,
         click.option(
@@ -425,7 +630,8 @@ class CommonTypedDict(TypedDict):
         str,
         click.option(
             "--dataset-with-size-type",
-            help="Dataset with size type for NewIntFilterPerformanceCase, you can use Medium Cohere (768dim, 1M)|"
+            help="Dataset with size type for NewIntFilterPerformanceCase and WorkloadCase, you can use "
+            "Medium Cohere (768dim, 1M)|"
             "Large Cohere (768dim, 10M)|Medium Bioasq (1024dim, 1M)|Large Bioasq (1024dim, 10M)|"
             "Large OpenAI (1536dim, 5M)|Medium OpenAI (1536dim, 500K)",
             default="Medium Cohere (768dim, 1M)",
@@ -441,6 +647,16 @@ class CommonTypedDict(TypedDict):
             show_default=True,
         ),
     ]
+    workload_spec: Annotated[
+        str,
+        click.option(
+            "--workload-spec",
+            type=click.Path(exists=True, dir_okay=False),
+            help="Yaml or json file of the operation mix, batch sizes, key distribution and target ops/s of "
+            "WorkloadCase, see vectordb_bench/config-files/sample_workload.yml",
+            callback=check_workload_spec,
+        ),
+    ]
 
 
 class HNSWBaseTypedDict(TypedDict):
@@ -616,10 +832,28 @@ def run(
         case_config=CaseConfig(
             case_id=CaseType[parameters["case_type"]],
             k=parameters["k"],
+            load_concurrency=parameters["load_concurrency"],
+            calibrate_batch_size=parameters["calibrate_batch_size"],
+            resume_load=parameters["resume_load"],
+            search_batch_size=parameters["search_batch_size"],
+            k_list=parameters["k_list"],
+            save_search_results=parameters["save_search_results"],
             concurrency_search_config=ConcurrencySearchConfig(
                 concurrency_duration=parameters["concurrency_duration"],
                 num_concurrency=[int(s) for s in parameters["num_concurrency"]],
                 concurrency_timeout=parameters["concurrency_timeout"],
+                target_qps=parameters["target_qps"],
+                arrival_pattern=ArrivalPattern(parameters["arrival_pattern"]),
+                async_search_processes=parameters["async_search_processes"],
+                threads_per_process=parameters["threads_per_process"],
+                adaptive=parameters["adaptive_concurrency"],
+                adaptive_max_concurrency=parameters["adaptive_max_concurrency"],
+                adaptive_min_qps_gain=parameters["adaptive_min_qps_gain"],
+                adaptive_max_latency_p99=parameters["adaptive_max_latency_p99"],
+                slo_latency=parameters["slo_latency"],
+                slo_percentile=float(parameters["slo_percentile"]),
+                warmup_duration=parameters["warmup_duration"],
+                warmup_queries=parameters["warmup_queries"],
             ),
             custom_case=get_custom_case_config(parameters),
         ),
@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+from typing import Annotated, TypedDict, Unpack
+
+import click
+
+from ..backend.runner.search_results import rescore
+from .cli import cli, click_arg_split, click_parameter_decorators_from_typed_dict
+
+
+class RescoreTypedDict(TypedDict):
+    results_file: Annotated[
+        str,
+        click.option(
+            "--results-file",
+            type=click.Path(exists=True, dir_okay=False),
+            required=True,
+            help="Parquet file of the serial search results, written by --save-search-results",
+        ),
+    ]
+    ground_truth: Annotated[
+        str | None,
+        click.option(
+            "--ground-truth",
+            type=click.Path(exists=True, dir_okay=False),
+            default=None,
+            help="Parquet file of the ground truth neighbors, the one of the benchmark run by default",
+        ),
+    ]
+    k: Annotated[
+        int | None,
+        click.option(
+            "--k",
+            type=int,
+            default=None,
+            help="K value to score at, the k of the benchmark run by default",
+        ),
+    ]
+    k_list: Annotated[
+        list[int] | None,
+        click.option(
+            "--k-list",
+            type=str,
+            default=None,
+            help="Comma-separated list of k values to also score at, e.g. 1,10,100",
+            callback=lambda *args: list(map(int, click_arg_split(*args))) or None,
+        ),
+    ]
+    compare: Annotated[
+        str | None,
+        click.option(
+            "--compare",
+            type=click.Path(exists=True, dir_okay=False),
+            default=None,
+            help="Search results file of another run of the same queries, e.g. another database, "
+            "to report the overlap@k of the two",
+        ),
+    ]
+
+
+@cli.command()
+@click_parameter_decorators_from_typed_dict(RescoreTypedDict)
+def Rescore(**parameters: Unpack[RescoreTypedDict]):
+    """Recompute the search quality metrics from saved serial search results."""
+    scores = rescore(
+        Path(parameters["results_file"]),
+        ground_truth=Path(parameters["ground_truth"]) if parameters["ground_truth"] else None,
+        k=parameters["k"],
+        k_list=parameters["k_list"],
+        compare=Path(parameters["compare"]) if parameters["compare"] else None,
+    )
+    click.echo(json.dumps(scores, indent=2))
@@ -24,6 +24,7 @@ from ..backend.clients.zilliz_cloud.cli import ZillizAutoIndex
 from ..backend.clients.mssql.cli import MSSQL
 from .batch_cli import BatchCli
 from .cli import cli
+from .rescore import Rescore
 
 cli.add_command(PgVectorHNSW)
 cli.add_command(PgVectoRSHNSW)
@@ -51,6 +52,7 @@ cli.add_command(QdrantLocal)
 cli.add_command(BatchCli)
 cli.add_command(S3Vectors)
 cli.add_command(MSSQL)
+cli.add_command(Rescore)
 
 
 if __name__ == "__main__":
@@ -13,6 +13,8 @@ def drawCharts(st, allData, failedTasks, caseNames: list[str]):
         chartContainer = st.expander(caseName, True)
         data = [data for data in allData if data["case_name"] == caseName]
         drawChart(data, chartContainer, key_prefix=caseName)
+        drawQualityAtKChart(data, chartContainer, key=f"{caseName}-quality-at-k")
+        drawInsertTimelineChart(data, chartContainer, key=f"{caseName}-insert-timeline")
 
         errorDBs = failedTasks[caseName]
         showFailedDBs(chartContainer, errorDBs)
@@ -46,6 +48,69 @@ def drawChart(data, st, key_prefix: str):
         drawMetricChart(data, metric, container, key=key)
 
 
+def drawQualityAtKChart(data, st, key: str):
+    qualityData = [
+        {"db_name": d["db_name"], "k": int(k), "recall": scores["recall"], "ndcg": scores["ndcg"]}
+        for d in data
+        for k, scores in d.get("quality_at_k", {}).items()
+    ]
+    if len(qualityData) == 0:
+        return
+
+    qualityData.sort(key=lambda a: a["k"])
+    cols = st.columns(2)
+    for col, metric in zip(cols, ["recall", "ndcg"], strict=True):
+        fig = px.line(
+            qualityData,
+            x="k",
+            y=metric,
+            color="db_name",
+            markers=True,
+            log_x=True,
+            height=400,
+            title=f"{metric.capitalize()} at k (more is better)",
+        )
+        col.plotly_chart(fig, use_container_width=True, key=f"{key}-{metric}")
+
+
+def drawInsertTimelineChart(data, st, key: str):
+    timeline_data = [
+        {
+            "db_name": d["db_name"],
+            "time": timeline["time"][j],
+            "rows_per_second": timeline["rows_per_second"][j],
+            "latency_p99": timeline["latency_p99"][j] * 1000,
+        }
+        for d in data
+        if (timeline := d.get("insert_timeline", {}))
+        for j in range(len(timeline["time"]))
+    ]
+    # streaming inserts, rows/s sent at the rate of the case
+    timeline_data += [
+        {
+            "db_name": f"{d['db_name']} (offered)",
+            "time": timeline["time"][j],
+            "rows_per_second": timeline["offered_rows_per_second"][j],
+        }
+        for d in data
+        if "offered_rows_per_second" in (timeline := d.get("insert_timeline", {}))
+        for j in range(len(timeline["time"]))
+    ]
+    if len(timeline_data) == 0:
+        return
+
+    cols = st.columns(2)
+    for col, y, title in [
+        (cols[0], "rows_per_second", "Inserted rows/s"),
+        (cols[1], "latency_p99", "Insert batch latency p99 (ms)"),
+    ]:
+        points = [p for p in timeline_data if y in p]
+        fig = px.line(points, x="time", y=y, color="db_name", markers=True, height=400, title=title)
+        fig.update_xaxes(title_text="Time since the load started (s)")
+        fig.update_yaxes(title_text=title)
+        col.plotly_chart(fig, use_container_width=True, key=f"{key}-{y}")
+
+
 def getLabelToShapeMap(data):
     labelIndexMap = {}
 
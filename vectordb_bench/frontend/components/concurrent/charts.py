@@ -30,6 +30,15 @@ def drawChartsByCase(allData, showCaseNames: list[str], st, latency_type: str):
                     if 0 <= i < len(caseData["conc_latency_avg_list"])
                     else 0
                 ),
+                **{
+                    latency_type: (
+                        caseData[f"conc_{latency_type}_list"][i] * 1000
+                        if f"conc_{latency_type}_list" in caseData
+                        and 0 <= i < len(caseData[f"conc_{latency_type}_list"])
+                        else 0
+                    )
+                    for latency_type in ["latency_p50", "latency_p90", "latency_p999", "latency_p9999"]
+                },
                 "db_name": caseData["db_name"],
                 "db": caseData["db"],
             }
@@ -37,6 +46,19 @@ def drawChartsByCase(allData, showCaseNames: list[str], st, latency_type: str):
             for i in range(len(caseData["conc_num_list"]))
         ]
         drawChart(data, chartContainer, key=f"{caseName}-qps-p99", x_metric=latency_type)
+        for caseData in caseDataList:
+            if caseData.get("conc_knee", 0) > 0:
+                chartContainer.caption(
+                    f"{caseData['db_name']}: adaptive search knee at concurrency {caseData['conc_knee']}, "
+                    f"max qps {caseData['qps']}"
+                )
+            if caseData.get("conc_warmup"):
+                warmup = caseData["conc_warmup"]
+                chartContainer.caption(
+                    f"{caseData['db_name']}: {warmup['count']} warm-up queries excluded, "
+                    f"latency p99 {warmup['latency_p99'] * 1000:.4g}ms, max {warmup['latency_max'] * 1000:.4g}ms"
+                )
+        drawTimelineCharts(caseDataList, chartContainer, key=f"{caseName}-timeline", latency_type=latency_type)
 
 
 def getRange(metric, data, padding_multipliers):
@@ -95,3 +117,35 @@ def drawChart(data, st, key: str, x_metric: str = "latency_p99", y_metric: str =
     fig.update_traces(textposition="bottom right", texttemplate="conc-%{text:,.4~r}")
 
     st.plotly_chart(fig, use_container_width=True, key=key)
+
+
+def drawTimelineCharts(caseDataList, st, key: str, latency_type: str):
+    # timelines keep fewer percentiles, fall back to p99
+    latency_key = (
+        latency_type if latency_type in ["latency_p99", "latency_p95", "latency_p50", "latency_avg"] else "latency_p99"
+    )
+    data = [
+        {
+            "conc_num": conc_num,
+            "time": timeline["time"][j],
+            "qps": timeline["qps"][j],
+            "latency": timeline[latency_key][j] * 1000,
+            "db_name": caseData["db_name"],
+        }
+        for caseData in caseDataList
+        for conc_num, timeline in zip(caseData["conc_num_list"], caseData.get("conc_timeline", []), strict=False)
+        for j in range(len(timeline["time"]))
+    ]
+    if len(data) == 0:
+        return
+
+    conc_nums = sorted({d["conc_num"] for d in data})
+    conc_num = st.selectbox("Timeline of concurrency", conc_nums, index=len(conc_nums) - 1, key=f"{key}-conc")
+    data = [d for d in data if d["conc_num"] == conc_num]
+
+    cols = st.columns(2)
+    for col, y, title in [(cols[0], "qps", "QPS"), (cols[1], "latency", gen_title(latency_key))]:
+        fig = px.line(data, x="time", y=y, color="db_name", markers=True, height=400)
+        fig.update_xaxes(title_text="Time (s)")
+        fig.update_yaxes(title_text=title)
+        col.plotly_chart(fig, use_container_width=True, key=f"{key}-{y}")
@@ -60,10 +60,93 @@ def drawChartByMetric(
     )
     key = f"{case_name}-duration"
     drawBarChart(container, case_data, key=key, **kwargs)
+
+    chart_idx = len(line_chart_displayed_y_metrics) + 1
+
+    # freshness lag chart
+    if any(d.get("st_freshness_timeline", {}).get("time") for d in case_data):
+        container = columns[chart_idx % STREAMING_CHART_COLUMNS]
+        chart_idx += 1
+        container.markdown("#### Freshness Lag")
+        container.markdown(
+            "time from an acknowledged insert to the row being returned by search, during the insertion.",
+            help="a sentinel vector is inserted every few seconds and searched until found, see FRESHNESS_PROBE_*.",
+        )
+        key = f"{case_name}-freshness"
+        drawFreshnessChart(container, case_data, key=key)
+
+    # continuous search charts
+    if any(d.get("st_search_timeline", {}).get("time") for d in case_data):
+        for metric, title, note in [
+            ("qps", "Continuous Search QPS", "qps of the search running all along the insertion."),
+            ("latency_p99", "Continuous Search Latency_p99", "p99 latency (ms) of each window of the search."),
+            ("recall", "Continuous Search Recall", "recall of sampled queries against the rows inserted so far."),
+        ]:
+            container = columns[chart_idx % STREAMING_CHART_COLUMNS]
+            chart_idx += 1
+            container.markdown(f"#### {title}")
+            container.markdown(note)
+            key = f"{case_name}-continuous-{metric}"
+            drawSearchTimelineChart(container, case_data, metric=metric, key=key)
     # drawLineChart(container, data, line_x_displayed_label, label)
     # drawTestChart(container)
 
 
+def drawFreshnessChart(st, data, key: str):
+    fig = go.Figure()
+    data = [d for d in data if d.get("st_freshness_timeline", {}).get("time")]
+    for i, d in enumerate(sorted(data, key=lambda d: d["db_name"])):
+        timeline = d["st_freshness_timeline"]
+        color = COLORS_10[i % len(COLORS_10)]
+        for percentile, dash in [("p99", "solid"), ("p50", "dot")]:
+            fig.add_trace(
+                go.Scatter(
+                    x=timeline["time"],
+                    y=[round(lag * 1000, 2) for lag in timeline[f"lag_{percentile}"]],
+                    mode="lines",
+                    name=f"{d['db_name']} ({percentile})",
+                    line={"dash": dash, "width": SCATTER_LINE_WIDTH, "color": color},
+                    legendgroup=d["db_name"],
+                    hovertemplate=f"time=%{{x:.4g}}s<br>lag_{percentile}=%{{y:.4g}}ms",
+                )
+            )
+    fig.update_layout(
+        margin={"l": 0, "r": 0, "t": 40, "b": 0, "pad": 8},
+        legend={"orientation": "h", "yanchor": "bottom", "y": 1, "xanchor": "left", "x": 0, "title": ""},
+    )
+    fig.update_layout(xaxis_title="time (s)", yaxis_title="lag (ms)")
+    st.plotly_chart(fig, use_container_width=True, key=key)
+
+
+def drawSearchTimelineChart(st, data, metric: str, key: str):
+    fig = go.Figure()
+    data = [d for d in data if d.get("st_search_timeline", {}).get("time")]
+    unit = "ms" if "latency" in metric else ""
+    for i, d in enumerate(sorted(data, key=lambda d: d["db_name"])):
+        timeline = d["st_search_timeline"]
+        values = timeline[metric]
+        if "latency" in metric:
+            values = [round(v * 1000, 2) for v in values]
+        fig.add_trace(
+            go.Scatter(
+                x=timeline["time"],
+                y=values,
+                text=timeline["inserted_rows"],
+                mode="markers+lines",
+                name=d["db_name"],
+                marker={"color": COLORS_10[i % len(COLORS_10)], "size": SCATTER_MAKER_SIZE},
+                line={"width": SCATTER_LINE_WIDTH, "color": COLORS_10[i % len(COLORS_10)]},
+                hovertemplate=f"%{{text}} rows inserted.<br>time=%{{x:.4g}}s<br>{metric}=%{{y:.4g}}{unit}",
+            )
+        )
+    fig.update_layout(
+        margin={"l": 0, "r": 0, "t": 40, "b": 0, "pad": 8},
+        legend={"orientation": "h", "yanchor": "bottom", "y": 1, "xanchor": "left", "x": 0, "title": ""},
+    )
+    fig.update_layout(xaxis_title="time (s)")
+    st.plotly_chart(fig, use_container_width=True, key=key)
+
+
 def drawLineChart(
     st,
     streaming_data: list[StreamingData],
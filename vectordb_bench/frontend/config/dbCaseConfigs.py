@@ -205,6 +205,51 @@ custom_streaming_config: list[ConfigInput] = [
         inputConfig=dict(step=10, min=30, max=360_000, value=30),
         inputHelp="search test duration after inserting all data",
     ),
+    ConfigInput(
+        label=CaseConfigParamType.continuous_search,
+        inputType=InputType.Option,
+        inputConfig={"options": [False, True]},
+        inputHelp="search all along the insertion by max(concurrencies) workers instead of at the search stages",
+    ),
+    ConfigInput(
+        label=CaseConfigParamType.continuous_search_qps,
+        inputType=InputType.Number,
+        inputConfig={"step": 100, "min": 0, "max": 1_000_000, "value": 0},
+        inputHelp="total qps of the continuous search, 0 searches back to back; ignored without continuous_search",
+    ),
+]
+
+
+def generate_custom_streaming_churn_case() -> CaseConfig:
+    return CaseConfig(
+        case_id=CaseType.StreamingChurnCase,
+        custom_case={},
+    )
+
+
+custom_streaming_churn_config: list[ConfigInput] = [
+    *[
+        c
+        for c in custom_streaming_config
+        if c.label
+        not in (
+            CaseConfigParamType.optimize_after_write,
+            CaseConfigParamType.continuous_search,
+            CaseConfigParamType.continuous_search_qps,
+        )
+    ],
+    ConfigInput(
+        label=CaseConfigParamType.update_ratio,
+        inputType=InputType.Float,
+        inputConfig={"step": 0.05, "min": 0.0, "max": 0.9, "value": 0.1},
+        inputHelp="share of the batches upserting live ids with new embeddings",
+    ),
+    ConfigInput(
+        label=CaseConfigParamType.delete_ratio,
+        inputType=InputType.Float,
+        inputConfig={"step": 0.05, "min": 0.0, "max": 0.9, "value": 0.1},
+        inputHelp="share of the batches deleting live ids, the other batches insert",
+    ),
 ]
 
 
@@ -321,7 +366,18 @@ UI_CASE_CLUSTERS: list[UICaseItemCluster] = [
                 ),
                 cases=[generate_custom_streaming_case()],
                 extra_custom_case_config_inputs=custom_streaming_config,
-            )
+            ),
+            UICaseItem(
+                label="Customize Streaming Churn Test",
+                description=(
+                    "This case test the search performance and recall while inserting, updating and deleting. "
+                    "VDBB will send insert, upsert and delete requests to VectorDB at a fixed rate and ratios, "
+                    "and conduct a search test once the data read reaches the search_stages, the recall being "
+                    "scored against the exact neighbors of the rows live at that moment."
+                ),
+                cases=[generate_custom_streaming_churn_case()],
+                extra_custom_case_config_inputs=custom_streaming_churn_config,
+            ),
         ],
     ),
 ]
@@ -1723,7 +1779,7 @@ CaseConfigParamInput_R_MSSQL = CaseConfigInput(
         "min": 0,
         "max": 1000,
         "value": 0,
-    }
+    },
 )
 
 CaseConfigParamInput_L_MSSQL = CaseConfigInput(
@@ -1734,7 +1790,7 @@ CaseConfigParamInput_L_MSSQL = CaseConfigInput(
         "min": 0,
         "max": 1000,
         "value": 0,
-    }
+    },
 )
 
 CaseConfigParamInput_MAXDOP_MSSQL = CaseConfigInput(
@@ -1745,7 +1801,7 @@ CaseConfigParamInput_MAXDOP_MSSQL = CaseConfigInput(
         "min": 0,
         "max": 1024,
         "value": 0,
-    }
+    },
 )
 
 MilvusLoadConfig = [
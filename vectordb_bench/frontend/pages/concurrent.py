@@ -60,7 +60,18 @@ def main():
     getResults(resultesContainer, "vectordb_bench_concurrent")
 
     # main
-    latency_type = st.radio("Latency Type", options=["latency_p99", "latency_p95", "latency_avg"])
+    latency_type = st.radio(
+        "Latency Type",
+        options=[
+            "latency_p99",
+            "latency_p95",
+            "latency_avg",
+            "latency_p50",
+            "latency_p90",
+            "latency_p999",
+            "latency_p9999",
+        ],
+    )
     drawChartsByCase(shownData, showCaseNames, st.container(), latency_type=latency_type)
 
     # footer
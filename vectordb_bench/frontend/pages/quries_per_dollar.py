@@ -18,7 +18,7 @@ from vectordb_bench.frontend.components.check_results.filters import getshownDat
 from vectordb_bench.frontend.components.get_results.saveAsImage import getResults
 
 from vectordb_bench.interface import benchmark_runner
-from vectordb_bench.metric import QURIES_PER_DOLLAR_METRIC
+from vectordb_bench.metric import QPS_METRIC, QURIES_PER_DOLLAR_METRIC, SLO_QPS_METRIC
 
 
 def main():
@@ -55,16 +55,19 @@ def main():
     priceTableContainer = st.container()
     priceMap = priceTable(priceTableContainer, shownData)
 
+    # qps of QP$, the max qps or the max qps within the latency SLO
+    qpsMetric = st.radio("QP$ by", [QPS_METRIC, SLO_QPS_METRIC], horizontal=True)
+
     # charts
     for caseName in showCaseNames:
         data = [data for data in shownData if data["case_name"] == caseName]
         dataWithMetric = []
         metric = QURIES_PER_DOLLAR_METRIC
         for d in data:
-            qps = d.get("qps", 0)
+            qps = d.get(qpsMetric, 0)
             price = priceMap.get(d["db"], {}).get(d["db_label"], 0)
             if qps > 0 and price > 0:
-                d[metric] = d["qps"] / price * 3.6
+                d[metric] = qps / price * 3.6
                 dataWithMetric.append(d)
         if len(dataWithMetric) > 0:
             chartContainer = st.expander(caseName, True)
@@ -3,6 +3,7 @@ from vectordb_bench.frontend.components.check_results.headerIcon import drawHead
 from vectordb_bench.frontend.components.check_results.nav import NavToPages
 from vectordb_bench.frontend.components.tables.data import getNewResults
 from vectordb_bench.frontend.config.styles import FAVICON
+from vectordb_bench.metric import QPS_METRIC, SLO_QPS_METRIC
 
 
 def main():
@@ -21,6 +22,9 @@ def main():
     NavToPages(st)
 
     df = getNewResults()
+    rankMetric = st.radio("Rank by", [QPS_METRIC, SLO_QPS_METRIC], horizontal=True)
+    if rankMetric in df:
+        df = df.sort_values(rankMetric, ascending=False, ignore_index=True)
     st.dataframe(df, height=800)
 
 
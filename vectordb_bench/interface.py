@@ -12,7 +12,7 @@ from multiprocessing.connection import Connection
 import psutil
 
 from . import config
-from .backend.assembler import Assembler, FilterNotSupportedError
+from .backend.assembler import Assembler, DeleteNotSupportedError, FilterNotSupportedError
 from .backend.data_source import DatasetSource
 from .backend.result_collector import ResultCollector
 from .backend.task_runner import TaskRunner
@@ -92,7 +92,7 @@ class BenchMarkRunner:
             log.warning(msg)
             self.latest_error = msg
             return True
-        except FilterNotSupportedError as e:
+        except (FilterNotSupportedError, DeleteNotSupportedError) as e:
             log.warning(e.args[0])
             self.latest_error = e.args[0]
             return True
@@ -17,21 +17,79 @@ class Metric:
     insert_duration: float = 0.0
     optimize_duration: float = 0.0
     load_duration: float = 0.0  # insert + optimize
+    insert_throughput: float = 0.0  # rows/s of insert_duration
+    insert_worker_throughput_list: list[float] = field(default_factory=list)  # rows/s of each load process
+    # seconds reading and preparing the batches, waiting for them and inserting them, and the average number of
+    # ready batches: {"prepare_time": ..., "wait_time": ..., "insert_time": ..., "queue_depth_avg": ...}
+    insert_prefetch: dict[str, float] = field(default_factory=dict)
+    insert_batch_size: int = 0  # rows per insert_embeddings call of the load
+    # with calibrate_batch_size, rows/s of each batch size of the calibration: {"100": ..., "200": ...}
+    insert_batch_calibration: dict[str, float] = field(default_factory=dict)
+    # with resume_load, rows and insert seconds of the earlier runs, included in insert_duration and insert_throughput
+    insert_resumed: dict[str, float] = field(default_factory=dict)
+    # latency percentiles of the insert_embeddings calls, one batch each
+    insert_latency_p99: float = 0.0
+    insert_latency_p95: float = 0.0
+    insert_latency_p50: float = 0.0
+    # inserted rows/s and batch latencies per time window since the load started, the windows double on long loads:
+    # keys time, rows_per_second, latency_p99, latency_p50 and latency_avg, one value per window
+    insert_timeline: dict[str, list[float]] = field(default_factory=dict)
 
     # for performance cases
     qps: float = 0.0
+    # of the serial search of max(k, *k_list) results if the case has a k_list
     serial_latency_p99: float = 0.0
     serial_latency_p95: float = 0.0
     recall: float = 0.0
     ndcg: float = 0.0
+    mrr: float = 0.0
+    precision: float = 0.0  # of the results returned, lower than recall only if a query returns fewer than k
+    # scores at each k of the case's k_list, from the same serial search: {"10": {"recall": ..., "ndcg": ...}},
+    # the k_list values are at most the ground truth width
+    quality_at_k: dict[str, dict[str, float]] = field(default_factory=dict)
+    # Parquet file of the per-query result ids and latencies of the serial search, for `vectordbbench rescore`
+    search_results_file: str = ""
+    # batch search only, per-request latencies and vectors/s of the serial search, the serial latencies above are
+    # per query: {"batch_size": ..., "latency_p99": ..., "vectors_per_second": ...}
+    serial_batch: dict[str, float] = field(default_factory=dict)
     conc_num_list: list[int] = field(default_factory=list)
     conc_qps_list: list[float] = field(default_factory=list)
     conc_latency_p99_list: list[float] = field(default_factory=list)
     conc_latency_p95_list: list[float] = field(default_factory=list)
     conc_latency_avg_list: list[float] = field(default_factory=list)
+    conc_offered_qps_list: list[float] = field(default_factory=list)  # open-loop search only
+    conc_missed_list: list[int] = field(default_factory=list)  # open-loop queries scheduled and never sent
+    conc_latency_p50_list: list[float] = field(default_factory=list)
+    conc_latency_p90_list: list[float] = field(default_factory=list)
+    conc_latency_p999_list: list[float] = field(default_factory=list)
+    conc_latency_p9999_list: list[float] = field(default_factory=list)
+    # per concurrency, qps and latencies of each time window: {"time": [...], "qps": [...], "latency_p99": [...]}
+    conc_timeline: list[dict[str, list[float]]] = field(default_factory=list)
+    conc_knee: int = 0  # adaptive search only, conc_* lists are then in explored order
+    # largest qps of the concurrent search levels whose latency percentile is within the SLO budget
+    slo_qps: float = 0.0
+    slo_conc_num: int = 0
+    slo_offered_qps: float = 0.0  # open-loop rate ramp only
+    # latencies of the level of slo_qps: {"p50": ..., "p99": ..., "avg": ...}
+    slo_latency_curve: dict[str, float] = field(default_factory=dict)
+    # warm-up queries before the concurrent search, excluded from qps and latencies: {"count": ..., "latency_p99": ...}
+    conc_warmup: dict[str, float] = field(default_factory=dict)
 
     # for streaming cases
     st_ideal_insert_duration: int = 0
+    # rows/s sent to the db and inserted by it, lower than insert_rate when the db falls behind
+    st_offered_insert_rate: float = 0.0
+    st_achieved_insert_rate: float = 0.0
+    # largest number of insert batches sent and not finished, see config.STREAMING_MAX_BACKLOG
+    st_max_insert_backlog: int = 0
+    # seconds from an acknowledged insert to the row being returned by search, see FreshnessProbe
+    st_freshness_lag_p99: float = 0.0
+    st_freshness_lag_p95: float = 0.0
+    st_freshness_lag_p50: float = 0.0
+    st_freshness_probe_count: int = 0
+    st_freshness_timeout_count: int = 0  # sentinels not returned within config.FRESHNESS_PROBE_TIMEOUT
+    # lag percentiles of each time window: {"time": [...], "lag_p99": [...], "lag_p50": [...]}
+    st_freshness_timeline: dict[str, list[float]] = field(default_factory=dict)
     st_search_stage_list: list[int] = field(default_factory=list)
     st_search_time_list: list[float] = field(default_factory=list)
     st_max_qps_list_list: list[float] = field(default_factory=list)
@@ -40,6 +98,21 @@ class Metric:
     st_serial_latency_p99_list: list[float] = field(default_factory=list)
     st_serial_latency_p95_list: list[float] = field(default_factory=list)
     st_conc_failed_rate_list: list[float] = field(default_factory=list)
+    st_conc_latency_p99_list: list[float] = field(default_factory=list)
+    # continuous streaming search only, per window: {"time": [...], "inserted_rows": [...], "qps": [...],
+    # "latency_p99": [...], "latency_p95": [...], "latency_p50": [...], "recall": [...]}
+    st_search_timeline: dict[str, list[float]] = field(default_factory=dict)
+    # streaming churn case only, live ids and ids updated and deleted so far at each search stage
+    st_live_count_list: list[int] = field(default_factory=list)
+    st_update_count_list: list[int] = field(default_factory=list)
+    st_delete_count_list: list[int] = field(default_factory=list)
+
+    # for workload cases, per operation type of the spec: {"search": {"count": ..., "ops": ..., "latency_p99": ...,
+    # "latency_p95": ..., "latency_p50": ..., "latency_avg": ...}, "insert": {..., "failed": ...}}, the latencies
+    # are per request, measured from its scheduled send time
+    workload_ops: dict[str, dict[str, float]] = field(default_factory=dict)
+    workload_target_ops: float = 0.0  # requests/s of all the operation types
+    workload_achieved_ops: float = 0.0
 
 
 QURIES_PER_DOLLAR_METRIC = "QP$ (Quries per Dollar)"
@@ -48,6 +121,7 @@ SERIAL_LATENCY_P99_METRIC = "serial_latency_p99"
 SERIAL_LATENCY_P95_METRIC = "serial_latency_p95"
 MAX_LOAD_COUNT_METRIC = "max_load_count"
 QPS_METRIC = "qps"
+SLO_QPS_METRIC = "slo_qps"
 RECALL_METRIC = "recall"
 
 metric_unit_map = {
@@ -66,6 +140,7 @@ lower_is_better_metrics = [
 
 metric_order = [
     QPS_METRIC,
+    SLO_QPS_METRIC,
     RECALL_METRIC,
     LOAD_DURATION_METRIC,
     SERIAL_LATENCY_P99_METRIC,
@@ -78,6 +153,36 @@ def isLowerIsBetterMetric(metric: str) -> bool:
     return metric in lower_is_better_metrics
 
 
+# latency percentiles of the concurrent search levels, the ones an SLO budget can be checked against
+conc_latency_percentiles = {
+    50: "p50",
+    90: "p90",
+    95: "p95",
+    99: "p99",
+    99.9: "p999",
+    99.99: "p9999",
+}
+
+
+def set_slo_metric(metric: Metric, latency_budget: float, percentile: float) -> None:
+    """Set the slo_* fields from the level with the largest qps whose latency percentile is within the budget,
+    leave them unset if no level is."""
+    latencies = getattr(metric, f"conc_latency_{conc_latency_percentiles[percentile]}_list")
+    within = [i for i, latency in enumerate(latencies) if latency <= latency_budget]
+    if len(within) == 0:
+        log.warning(f"No concurrent search level has p{percentile} latency within {latency_budget}s")
+        return
+
+    i = max(within, key=lambda i: metric.conc_qps_list[i])
+    metric.slo_qps = metric.conc_qps_list[i]
+    metric.slo_conc_num = metric.conc_num_list[i]
+    metric.slo_offered_qps = metric.conc_offered_qps_list[i] if i < len(metric.conc_offered_qps_list) else 0.0
+    metric.slo_latency_curve = {
+        name: getattr(metric, f"conc_latency_{name}_list")[i] for name in conc_latency_percentiles.values()
+    }
+    metric.slo_latency_curve["avg"] = metric.conc_latency_avg_list[i]
+
+
 def calc_recall(count: int, ground_truth: list[int], got: list[int]) -> float:
     recalls = np.zeros(count)
     for i, result in enumerate(got):
@@ -103,3 +208,59 @@ def calc_ndcg(ground_truth: list[int], got: list[int], ideal_dcg: float) -> floa
             idx = ground_truth.index(got_id)
             dcg += 1 / np.log2(idx + 2)
     return dcg / ideal_dcg
+
+
+def id_matrix(ids: list[list[int]], k: int) -> np.ndarray:
+    """int64 matrix of the first k ids of each row, padded with -1"""
+    matrix = np.full((len(ids), k), -1, dtype=np.int64)
+    for i, row in enumerate(ids):
+        top_k = row[:k]
+        matrix[i, : len(top_k)] = top_k
+    return matrix
+
+
+def calc_search_quality(results: np.ndarray, ground_truth: np.ndarray, k: int) -> dict[str, float]:
+    """Average recall@k, NDCG@k, MRR and precision@k of all the queries in one vectorized pass.
+
+    Same scores as calc_recall and calc_ndcg, while every result id is looked up in a sorted array of
+    (query, ground truth id) keys instead of the ground truth list of its query.
+
+    Args:
+        results(np.ndarray): int64 result ids of shape (queries, >= k), padded with -1
+        ground_truth(np.ndarray): int64 ground truth ids of shape (queries, >= k), padded with -1
+        k(int): only the first k columns of both are scored
+
+    Returns:
+        dict[str, float]: {"recall": ..., "ndcg": ..., "mrr": ..., "precision": ...}
+    """
+    results, ground_truth = results[:, :k], ground_truth[:, :k]
+    nq = len(results)
+    if nq == 0:
+        return {"recall": 0.0, "ndcg": 0.0, "mrr": 0.0, "precision": 0.0}
+
+    # dense ids, so that (query, id) fits in one int64 key which sorts by query first
+    uniq, inverse = np.unique(np.concatenate([results.ravel(), ground_truth.ravel()]), return_inverse=True)
+    offsets = np.arange(nq, dtype=np.int64)[:, None] * len(uniq)
+    res_keys = (offsets + inverse[: results.size].reshape(results.shape)).ravel()
+    gt_keys = (offsets + inverse[results.size :].reshape(ground_truth.shape)).ravel()
+
+    gt_order = np.argsort(gt_keys, kind="stable")
+    sorted_gt_keys = gt_keys[gt_order]
+    pos = np.minimum(np.searchsorted(sorted_gt_keys, res_keys), len(sorted_gt_keys) - 1)
+    hits = ((sorted_gt_keys[pos] == res_keys) & (results.ravel() != -1)).reshape(results.shape)
+    gt_rank = (gt_order[pos] % ground_truth.shape[1]).reshape(results.shape)
+
+    # like calc_ndcg, a result id returned twice counts once
+    first = np.zeros(res_keys.size, dtype=bool)
+    first[np.unique(res_keys, return_index=True)[1]] = True
+    gains = np.where(hits & first.reshape(results.shape), 1 / np.log2(gt_rank + 2), 0)
+
+    hit_counts = hits.sum(axis=1)
+    returned = (results != -1).sum(axis=1)
+    reciprocal_ranks = np.where(hits.any(axis=1), 1 / (hits.argmax(axis=1) + 1), 0)
+    return {
+        "recall": float(np.mean(hit_counts / k)),
+        "ndcg": float(np.mean(gains.sum(axis=1) / get_ideal_dcg(k))),
+        "mrr": float(np.mean(reciprocal_ranks)),
+        "precision": float(np.mean(hit_counts / np.maximum(returned, 1))),
+    }
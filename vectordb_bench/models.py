@@ -136,16 +136,45 @@ class CaseConfigParamType(Enum):
     concurrencies = "concurrencies"
     optimize_after_write = "optimize_after_write"
     read_dur_after_write = "read_dur_after_write"
+    continuous_search = "continuous_search"
+    continuous_search_qps = "continuous_search_qps"
+    update_ratio = "update_ratio"
+    delete_ratio = "delete_ratio"
 
 
 class CustomizedCase(BaseModel):
     pass
 
 
+class ArrivalPattern(StrEnum):
+    """Schedule of query send times in open-loop concurrent search"""
+
+    POISSON = "poisson"
+    CONSTANT = "constant"
+
+
 class ConcurrencySearchConfig(BaseModel):
     num_concurrency: list[int] = config.NUM_CONCURRENCY
     concurrency_duration: int = config.CONCURRENCY_DURATION
     concurrency_timeout: int = config.CONCURRENCY_TIMEOUT
+    # open-loop search: dispatch queries at a fixed total rate instead of back-to-back
+    target_qps: float | None = None
+    arrival_pattern: ArrivalPattern = ArrivalPattern.POISSON
+    # asyncio search: each concurrency is split into coroutines across at most this many processes
+    async_search_processes: int | None = None
+    # each concurrency is split into processes of at most this many threads, one connection per thread
+    threads_per_process: int = 1
+    # adaptive search: grow concurrency geometrically from min(num_concurrency), then bisect the QPS knee
+    adaptive: bool = False
+    adaptive_max_concurrency: int = config.ADAPTIVE_MAX_CONCURRENCY
+    adaptive_min_qps_gain: float = config.ADAPTIVE_MIN_QPS_GAIN
+    adaptive_max_latency_p99: float | None = None  # seconds
+    # SLO: largest qps whose latency percentile stays within the budget, ramping the rate in open-loop search
+    slo_latency: float | None = None  # seconds
+    slo_percentile: float = 99
+    # warm-up of every search thread or coroutine on its fresh connection, excluded from the measurements
+    warmup_duration: float = 0  # seconds
+    warmup_queries: int = 0
 
 
 class CaseConfig(BaseModel):
@@ -154,6 +183,18 @@ class CaseConfig(BaseModel):
     case_id: CaseType
     custom_case: dict | None = None
     k: int | None = config.K_DEFAULT
+    # processes inserting disjoint parts of the train data in parallel, each with its own connection
+    load_concurrency: int = 1
+    # time a sweep of insert batch sizes on the first train rows, and load the rest in the fastest one
+    calibrate_batch_size: bool = False
+    # continue the load of the checkpoint left by an earlier run of the same case instead of reloading from scratch
+    resume_load: bool = False
+    # queries per search request, batch search by search_embeddings if larger than 1
+    search_batch_size: int = 1
+    # serial search also scores recall and ndcg at each of these k, from one search of max(k, *k_list) results
+    k_list: list[int] | None = None
+    # write the per-query serial search results to a Parquet file next to the result json
+    save_search_results: bool = False
     concurrency_search_config: ConcurrencySearchConfig = ConcurrencySearchConfig()
 
     '''